@@ -0,0 +1,11 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        COMMENT ON COLUMN "taskmodel"."status" IS 'new: new\npending: pending\nin_progress: in_progress\ncompleted: completed\nfailed: failed\npaused: paused\ncancelled: cancelled';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        COMMENT ON COLUMN "taskmodel"."status" IS 'new: new\npending: pending\nin_progress: in_progress\ncompleted: completed\nfailed: failed';"""
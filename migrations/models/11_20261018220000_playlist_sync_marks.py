@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "playlists" ADD "last_entry_id" VARCHAR(256);
+        ALTER TABLE "playlists" ADD "last_timestamp" BIGINT;
+        ALTER TABLE "playlists" ADD "last_upload_date" VARCHAR(8);
+        ALTER TABLE "playlists" ADD "sync_marks" JSONB NOT NULL DEFAULT '{}';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "playlists" DROP COLUMN "last_entry_id";
+        ALTER TABLE "playlists" DROP COLUMN "last_timestamp";
+        ALTER TABLE "playlists" DROP COLUMN "last_upload_date";
+        ALTER TABLE "playlists" DROP COLUMN "sync_marks";"""
@@ -0,0 +1,14 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "taskmodel" ADD "stage" VARCHAR(8) NOT NULL DEFAULT 'parse';
+        COMMENT ON COLUMN "taskmodel"."stage" IS 'parse: parse\nchunk: chunk\ndownload: download';
+        UPDATE "taskmodel" SET "stage" = 'chunk'
+            WHERE "id" IN (SELECT DISTINCT "parent_id" FROM "taskmodel" WHERE "parent_id" IS NOT NULL);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "taskmodel" DROP COLUMN "stage";"""
@@ -0,0 +1,20 @@
+from tools.media_downloader.urls import canonicalize_url
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # The key is computed in Python, tasks created before "url_key" existed would never be deduplicated.
+    # Chunks keep no key, they are never returned for a URL pasted again.
+    _, rows = await db.execute_query(
+        'SELECT "id", "url" FROM "taskmodel" WHERE "url_key" IS NULL AND "parent_id" IS NULL'
+    )
+    if rows:
+        await db.execute_many(
+            'UPDATE "taskmodel" SET "url_key" = $1 WHERE "id" = $2',
+            [[canonicalize_url(row["url"]), row["id"]] for row in rows],
+        )
+    return ""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return ""
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "channels" ADD "last_entry_id" VARCHAR(256);
+        ALTER TABLE "channels" ADD "last_timestamp" BIGINT;
+        ALTER TABLE "channels" ADD "last_upload_date" VARCHAR(8);
+        ALTER TABLE "channels" ADD "sync_marks" JSONB NOT NULL DEFAULT '{}';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "channels" DROP COLUMN "last_entry_id";
+        ALTER TABLE "channels" DROP COLUMN "last_timestamp";
+        ALTER TABLE "channels" DROP COLUMN "last_upload_date";
+        ALTER TABLE "channels" DROP COLUMN "sync_marks";"""
@@ -0,0 +1,13 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "taskmodel" ADD "url_key" VARCHAR(256);
+        CREATE INDEX IF NOT EXISTS "idx_taskmodel_url_key_5c1e2b" ON "taskmodel" ("url_key");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_taskmodel_url_key_5c1e2b";
+        ALTER TABLE "taskmodel" DROP COLUMN "url_key";"""
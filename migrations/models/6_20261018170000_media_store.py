@@ -0,0 +1,34 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "media_blobs" (
+    "id" UUID NOT NULL  PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "deleted_at" TIMESTAMPTZ,
+    "sha256" VARCHAR(64) NOT NULL UNIQUE,
+    "suffix" VARCHAR(16) NOT NULL,
+    "size" BIGINT NOT NULL,
+    "ext_key" VARCHAR(256),
+    "probe" JSONB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS "idx_media_blobs_ext_key_7b0d1c" ON "media_blobs" ("ext_key");
+        CREATE TABLE IF NOT EXISTS "media_files" (
+    "id" UUID NOT NULL  PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "deleted_at" TIMESTAMPTZ,
+    "name" VARCHAR(256) NOT NULL,
+    "path" VARCHAR(1024),
+    "blob_id" UUID NOT NULL REFERENCES "media_blobs" ("id") ON DELETE CASCADE,
+    "owner_id" UUID NOT NULL REFERENCES "usermodel" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_media_files_owner_i_2f6a8e" UNIQUE ("owner_id", "blob_id")
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "media_files";
+        DROP TABLE IF EXISTS "media_blobs";"""
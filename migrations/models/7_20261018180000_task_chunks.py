@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "taskmodel" ADD "parent_id" UUID;
+        ALTER TABLE "taskmodel" ADD "entries" JSONB;
+        ALTER TABLE "taskmodel" ADD CONSTRAINT "fk_taskmode_taskmode_3f9a1e" FOREIGN KEY ("parent_id") REFERENCES "taskmodel" ("id") ON DELETE CASCADE;
+        CREATE INDEX IF NOT EXISTS "idx_taskmodel_parent__8e2c4d" ON "taskmodel" ("parent_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_taskmodel_parent__8e2c4d";
+        ALTER TABLE "taskmodel" DROP CONSTRAINT IF EXISTS "fk_taskmode_taskmode_3f9a1e";
+        ALTER TABLE "taskmodel" DROP COLUMN "entries";
+        ALTER TABLE "taskmodel" DROP COLUMN "parent_id";"""
@@ -0,0 +1,26 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "subscriptions" (
+    "id" UUID NOT NULL  PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "deleted_at" TIMESTAMPTZ,
+    "url" VARCHAR(256) NOT NULL,
+    "url_key" VARCHAR(256) NOT NULL,
+    "interval" INT NOT NULL,
+    "enabled" BOOL NOT NULL  DEFAULT True,
+    "next_run_at" TIMESTAMPTZ NOT NULL,
+    "last_run_at" TIMESTAMPTZ,
+    "owner_id" UUID NOT NULL REFERENCES "usermodel" ("id") ON DELETE CASCADE,
+    "task_id" UUID NOT NULL REFERENCES "taskmodel" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_subscriptio_owner_i_4c7e1a" UNIQUE ("owner_id", "url_key")
+);
+CREATE INDEX IF NOT EXISTS "idx_subscriptio_next_ru_9d3b2f" ON "subscriptions" ("next_run_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "subscriptions";"""
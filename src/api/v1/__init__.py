@@ -3,15 +3,22 @@ __all__ = ["v1_router"]
 from fastapi import APIRouter
 
 from .auth_views import auth_router
+from .media_views import media_router
 from .sse_views import router_sse
+from .subscriptions_views import subscriptions_router
 from .tasks_views import tasks_router
 from .user_views import users_router
+from .workers_views import workers_router
 
 v1_router = APIRouter()
 v1_router.include_router(
     tasks_router,
     prefix="/tasks",
 )
+v1_router.include_router(
+    subscriptions_router,
+    prefix="/subscriptions",
+)
 v1_router.include_router(
     users_router,
     prefix="/users",
@@ -20,6 +27,14 @@ v1_router.include_router(
     auth_router,
     prefix="/auth",
 )
+v1_router.include_router(
+    media_router,
+    prefix="/media",
+)
+v1_router.include_router(
+    workers_router,
+    prefix="/workers",
+)
 v1_router.include_router(
     router_sse,
     prefix="/sse",
@@ -0,0 +1,48 @@
+from applications.users.auth.depens import superuser
+from applications.users.models import UserModel
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+from tools.media_downloader.admission import disk_admission
+from tools.media_downloader.cache import info_cache
+from tools.media_downloader.downloader import Url
+from tools.media_downloader.structs import (
+    DiskUsageStatus,
+    InfoCacheInvalidateResponse,
+    InfoCacheInvalidateStruct,
+    InfoCacheStats,
+)
+
+media_router = APIRouter(tags=["media"])
+
+
+@media_router.get("/info-cache", response_model=InfoCacheStats)
+async def get_info_cache_stats(
+    _: UserModel = Depends(superuser),
+) -> InfoCacheStats:
+    """
+    Get hit/miss counters of the extracted info cache.
+    """
+    return await run_in_threadpool(info_cache.stats)
+
+
+@media_router.post("/info-cache/invalidate", response_model=InfoCacheInvalidateResponse)
+async def invalidate_info_cache(
+    data: InfoCacheInvalidateStruct,
+    _: UserModel = Depends(superuser),
+) -> InfoCacheInvalidateResponse:
+    """
+    Drop the cached info of the URL, the next extraction goes to the network.
+    """
+    key = await run_in_threadpool(lambda: Url(data.url).ext_key)
+    invalidated = key is not None and await run_in_threadpool(info_cache.invalidate, key)
+    return InfoCacheInvalidateResponse(key=key, invalidated=invalidated)
+
+
+@media_router.get("/disk", response_model=DiskUsageStatus)
+async def get_disk_usage(
+    _: UserModel = Depends(superuser),
+) -> DiskUsageStatus:
+    """
+    Get the disk budget of downloads and the reservations of the downloads holding it.
+    """
+    return await run_in_threadpool(disk_admission.status)
@@ -1,6 +1,9 @@
 import asyncio
+import json
 
 from contants import TEMPLATES_FOLDER
+from core.config import settings
+from core.redis_utils import async_redis_client
 from fastapi import APIRouter
 from redis.commands.search.reducers import count
 from sse_starlette.sse import EventSourceResponse
@@ -65,6 +68,30 @@ async def second_stream(request: Request):  # Simulate a new message
     return EventSourceResponse(event_generator())
 
 
+@router_sse.get("/progress")
+async def progress_stream(request: Request, task_id: str | None = None):
+    """
+    Stream of sampled download progress published by the workers, optionally of one task.
+    """
+
+    async def event_generator():
+        pubsub = async_redis_client.pubsub()
+        await pubsub.subscribe(settings.progress_channel)
+        try:
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=STREAM_DELAY)
+                if message is None:
+                    continue
+                if task_id and json.loads(message["data"]).get("task_id") != task_id:
+                    continue
+                yield {"event": "progress", "retry": RETRY_TIMEOUT, "data": message["data"]}
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    return EventSourceResponse(event_generator())
+
+
 def dashboard_streams(request: Request):
     template_name = "sse_dashboard.html"
     templates = Jinja2Templates(directory=TEMPLATES_FOLDER)
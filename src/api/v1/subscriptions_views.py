@@ -0,0 +1,69 @@
+import uuid
+
+from applications.subscriptions.service import SubscriptionInteractor, SubscriptionSelector
+from applications.subscriptions.structs import SubscriptionCreateStruct, SubscriptionResponse
+from applications.users.auth.depens import current_user
+from applications.users.models import UserModel
+from fastapi import APIRouter, Depends
+
+subscriptions_router = APIRouter(tags=["subscriptions"])
+
+
+async def _get_subscription(subscription_id: uuid.UUID, user: UserModel) -> SubscriptionResponse:
+    if user.is_superuser:
+        return await SubscriptionSelector.get_by_id(subscription_id)
+    return await SubscriptionSelector.get_by_id_and_owner(subscription_id, user.id)
+
+
+@subscriptions_router.get("/", response_model=list[SubscriptionResponse])
+async def get_list_subscriptions(
+    user: UserModel = Depends(current_user),
+):
+    if user.is_superuser:
+        return await SubscriptionSelector.get_all()
+    else:
+        return await SubscriptionSelector.get_by_owner(user.pk)
+
+
+@subscriptions_router.post("/", response_model=SubscriptionResponse)
+async def create_subscription(
+    data: SubscriptionCreateStruct,
+    user: UserModel = Depends(current_user),
+):
+    data.owner_id = user.id
+    return await SubscriptionInteractor.create(data)
+
+
+@subscriptions_router.get("/{subscription_id}", response_model=SubscriptionResponse)
+async def get_subscription(
+    subscription_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    return await _get_subscription(subscription_id, user)
+
+
+@subscriptions_router.post("/{subscription_id}/pause", response_model=SubscriptionResponse)
+async def pause_subscription(
+    subscription_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    subscription = await _get_subscription(subscription_id, user)
+    return await SubscriptionInteractor.set_enabled(subscription.id, False)
+
+
+@subscriptions_router.post("/{subscription_id}/resume", response_model=SubscriptionResponse)
+async def resume_subscription(
+    subscription_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    subscription = await _get_subscription(subscription_id, user)
+    return await SubscriptionInteractor.set_enabled(subscription.id, True)
+
+
+@subscriptions_router.delete("/{subscription_id}", status_code=204)
+async def delete_subscription(
+    subscription_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    subscription = await _get_subscription(subscription_id, user)
+    await SubscriptionInteractor.delete(subscription.id)
@@ -1,9 +1,11 @@
 import uuid
 
+from applications.tasks.models import TaskStageEnum
 from applications.tasks.service import TaskInteractor, TaskSelector
-from applications.tasks.structs import TaskCreateStruct, TaskResponse
+from applications.tasks.structs import TaskCreateStruct, TaskProgressStruct, TaskResponse, TaskStatusStruct
 from applications.users.auth.depens import current_user
 from applications.users.models import UserModel
+from celery_tasks import parse_chunk, parse_url, submit_download
 from fastapi import APIRouter, Depends
 
 tasks_router = APIRouter(tags=["tasks"])
@@ -37,3 +39,77 @@ async def get_task(
         return await TaskSelector.get_by_id(task_id)
     else:
         return await TaskSelector.get_by_id_and_owner(task_id, user.id)
+
+
+@tasks_router.get("/{task_id}/progress", response_model=TaskProgressStruct)
+async def get_task_progress(
+    task_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    if not user.is_superuser:
+        await TaskSelector.get_by_id_and_owner(task_id, user.id)
+    return await TaskSelector.get_progress(task_id)
+
+
+@tasks_router.post("/{task_id}/download", response_model=TaskResponse)
+async def download_task(
+    task_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    """
+    Queue the download of the task. Downloads of all users share the workers in fair turns.
+    """
+    if user.is_superuser:
+        task = await TaskSelector.get_by_id(task_id)
+    else:
+        task = await TaskSelector.get_by_id_and_owner(task_id, user.id)
+    await submit_download(task)
+    return task
+
+
+@tasks_router.post("/{task_id}/cancel", response_model=TaskStatusStruct)
+async def cancel_task(
+    task_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    """
+    Cancel the task. A running download stops within seconds and its partial files are removed.
+    """
+    if not user.is_superuser:
+        await TaskSelector.get_by_id_and_owner(task_id, user.id)
+    return await TaskInteractor.cancel(task_id)
+
+
+@tasks_router.post("/{task_id}/pause", response_model=TaskStatusStruct)
+async def pause_task(
+    task_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    """
+    Pause the task. A running download stops within seconds and keeps its partial files for resume.
+    """
+    if not user.is_superuser:
+        await TaskSelector.get_by_id_and_owner(task_id, user.id)
+    return await TaskInteractor.pause(task_id)
+
+
+@tasks_router.post("/{task_id}/resume", response_model=TaskStatusStruct)
+async def resume_task(
+    task_id: uuid.UUID,
+    user: UserModel = Depends(current_user),
+):
+    """
+    Resume a paused task in the stage it was paused in: its parse, its unfinished chunks, or its
+    download from where it stopped.
+    """
+    if not user.is_superuser:
+        await TaskSelector.get_by_id_and_owner(task_id, user.id)
+    task, chunk_ids = await TaskInteractor.resume(task_id)
+    if task.stage == TaskStageEnum.parse:
+        parse_url.delay(task_id)
+    elif task.stage == TaskStageEnum.chunk:
+        for chunk_id in chunk_ids:
+            parse_chunk.delay(chunk_id)
+    else:
+        await submit_download(await TaskSelector.get_by_id(task_id))
+    return task
@@ -0,0 +1,29 @@
+from applications.users.auth.depens import superuser
+from applications.users.models import UserModel
+from core.autoscale import ScalingDecision, autoscale_decisions
+from core.fair_share import FairShareStatus, fair_scheduler
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+
+workers_router = APIRouter(tags=["workers"])
+
+
+@workers_router.get("/autoscale", response_model=list[ScalingDecision])
+async def get_autoscale_decisions(
+    _: UserModel = Depends(superuser),
+) -> list[ScalingDecision]:
+    """
+    Get the latest autoscaling decision of every worker: the backlog of its queues and its pool size.
+    """
+    return await run_in_threadpool(autoscale_decisions)
+
+
+@workers_router.get("/fair-share", response_model=FairShareStatus)
+async def get_fair_share_status(
+    _: UserModel = Depends(superuser),
+) -> FairShareStatus:
+    """
+    Get the download slots, the queued and running downloads of every user and host and the aggregate
+    throughput of the running downloads.
+    """
+    return await run_in_threadpool(fair_scheduler.status)
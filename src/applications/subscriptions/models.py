@@ -0,0 +1,20 @@
+from tools.base_db_model import BaseDBModel
+from tortoise import fields
+
+
+class SubscriptionModel(BaseDBModel):
+    class Meta:
+        table = "subscriptions"
+        unique_together = (("owner", "url_key"),)
+
+    owner = fields.ForeignKeyField("models.UserModel", related_name="subscriptions")
+    task = fields.ForeignKeyField("models.TaskModel", related_name="subscriptions")
+    url = fields.CharField(max_length=256)
+    url_key = fields.CharField(max_length=256)
+    interval = fields.IntField()  # seconds between polls
+    enabled = fields.BooleanField(default=True)
+    next_run_at = fields.DatetimeField(index=True)
+    last_run_at = fields.DatetimeField(null=True)
+
+    def __repr__(self) -> str:
+        return f"<SubscriptionModel id={self.id} url={self.url} interval={self.interval}>"
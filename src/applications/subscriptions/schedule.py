@@ -0,0 +1,47 @@
+import hashlib
+import random
+from datetime import UTC, datetime, timedelta
+
+
+def poll_offset(key: str, interval: int) -> int:
+    """
+    Returns the stable offset of a subscription within its interval, in seconds.
+
+    The offset is derived from a hash of the key, so subscriptions with the same interval are spread
+    evenly over it instead of all polling at the top of the interval, and a subscription keeps its
+    slot across restarts.
+    """
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % interval
+
+
+def next_poll_at(key: str, interval: int, after: datetime, jitter: float = 0.0) -> datetime:
+    """
+    Returns the next poll of a subscription after ``after``: the next slot at its offset in the
+    interval, moved by a random jitter of up to ``jitter`` times the interval in either direction.
+
+    Args:
+        key (str): Identity of the subscription, e.g. its id.
+        interval (int): Seconds between polls.
+        after (datetime): The poll time returned is later than this, even with jitter.
+        jitter (float): Fraction of the interval the poll is moved by at most.
+    """
+    now = after.timestamp()
+    offset = poll_offset(key, interval)
+    slot = (now - offset) // interval * interval + offset + interval
+    spread = interval * jitter
+    slot += random.uniform(-spread, spread)  # noqa: S311
+    if slot <= now:
+        slot += interval
+    return datetime.fromtimestamp(slot, UTC)
+
+
+def first_poll_at(key: str, interval: int, now: datetime | None = None) -> datetime:
+    """
+    Returns the first poll of a new subscription: its slot in the current interval, so it does not
+    wait for a full interval, or right away if that slot has passed.
+    """
+    now = now or datetime.now(UTC)
+    start = now.timestamp() // interval * interval
+    slot = datetime.fromtimestamp(start + poll_offset(key, interval), UTC)
+    return max(slot, now + timedelta(seconds=1))
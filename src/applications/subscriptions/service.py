@@ -0,0 +1,100 @@
+import uuid
+from datetime import UTC, datetime
+
+from applications.subscriptions.models import SubscriptionModel
+from applications.subscriptions.schedule import first_poll_at, next_poll_at
+from applications.subscriptions.structs import SubscriptionInBaseStruct, SubscriptionStruct
+from applications.tasks.service import TaskInteractor
+from applications.tasks.structs import TaskStruct
+from core.config import settings
+from tools.media_downloader.urls import canonicalize_url
+from tortoise.transactions import in_transaction
+
+
+class SubscriptionSelector:
+    @classmethod
+    async def get_by_id(cls, subscription_id: uuid.UUID) -> SubscriptionInBaseStruct:
+        return SubscriptionInBaseStruct.model_validate(await SubscriptionModel.get(pk=subscription_id))
+
+    @classmethod
+    async def get_by_id_and_owner(cls, subscription_id: uuid.UUID, owner_id: uuid.UUID) -> SubscriptionInBaseStruct:
+        return SubscriptionInBaseStruct.model_validate(
+            await SubscriptionModel.get(pk=subscription_id, owner_id=owner_id)
+        )
+
+    @classmethod
+    async def get_all(cls) -> list[SubscriptionInBaseStruct]:
+        subscriptions = await SubscriptionModel.all()
+        return [SubscriptionInBaseStruct.model_validate(subscription) for subscription in subscriptions]
+
+    @classmethod
+    async def get_by_owner(cls, owner_id: uuid.UUID) -> list[SubscriptionInBaseStruct]:
+        subscriptions = await SubscriptionModel.filter(owner_id=owner_id)
+        return [SubscriptionInBaseStruct.model_validate(subscription) for subscription in subscriptions]
+
+
+class SubscriptionInteractor:
+    @classmethod
+    async def create(cls, data: SubscriptionStruct) -> SubscriptionInBaseStruct:
+        """
+        Subscribes the owner to a channel or playlist, or returns the owner's existing subscription
+        for the same canonical URL. The subscription polls through the owner's task for the URL.
+        """
+        url = str(data.url)
+        url_key = canonicalize_url(url)
+        subscription = await SubscriptionModel.filter(owner_id=data.owner_id, url_key=url_key).first()
+        if subscription is None:
+            task = await TaskInteractor.create(TaskStruct(url=url, owner_id=data.owner_id))
+            interval = data.interval or settings.subscription_default_interval
+            subscription_id = uuid.uuid4()
+            subscription = await SubscriptionModel.create(
+                id=subscription_id,
+                owner_id=data.owner_id,
+                task_id=task.id,
+                url=url,
+                url_key=url_key,
+                interval=interval,
+                next_run_at=first_poll_at(str(subscription_id), interval),
+            )
+        return SubscriptionInBaseStruct.model_validate(subscription)
+
+    @classmethod
+    async def claim_due(cls, now: datetime | None = None, limit: int = 100) -> list[SubscriptionInBaseStruct]:
+        """
+        Claims the enabled subscriptions whose poll is due and moves each to its next slot.
+
+        The rows are locked while they are claimed, so concurrent schedulers never claim the same poll.
+
+        Returns:
+            list[SubscriptionInBaseStruct]: The claimed subscriptions, with their previous ``next_run_at``.
+        """
+        now = now or datetime.now(UTC)
+        async with in_transaction():
+            subscriptions = (
+                await SubscriptionModel.filter(enabled=True, next_run_at__lte=now)
+                .order_by("next_run_at")
+                .limit(limit)
+                .select_for_update(skip_locked=True)
+            )
+            claimed = [SubscriptionInBaseStruct.model_validate(subscription) for subscription in subscriptions]
+            for subscription in subscriptions:
+                subscription.last_run_at = now
+                subscription.next_run_at = next_poll_at(
+                    str(subscription.id), subscription.interval, now, settings.subscription_jitter
+                )
+                await subscription.save(update_fields=["last_run_at", "next_run_at"])
+        return claimed
+
+    @classmethod
+    async def set_enabled(cls, subscription_id: uuid.UUID, enabled: bool) -> SubscriptionInBaseStruct:
+        subscription = await SubscriptionModel.get(pk=subscription_id)
+        subscription.enabled = enabled
+        if enabled:
+            subscription.next_run_at = first_poll_at(str(subscription.id), subscription.interval)
+        await subscription.save(update_fields=["enabled", "next_run_at"])
+        return SubscriptionInBaseStruct.model_validate(subscription)
+
+    @classmethod
+    async def delete(cls, subscription_id: uuid.UUID) -> None:
+        subscription = await SubscriptionModel.get(pk=subscription_id)
+        await subscription.delete()
@@ -0,0 +1,52 @@
+from datetime import datetime
+from uuid import UUID
+
+from core.config import settings
+from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, field_validator
+from tools.media_downloader.downloader import Url, UrlHostEnum
+from tools.media_downloader.exceptions import UrlUnknownHostError
+
+
+class SubscriptionStruct(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+    url: AnyHttpUrl
+    owner_id: UUID
+    interval: int | None = None
+
+
+class SubscriptionInBaseStruct(SubscriptionStruct):
+    id: UUID
+    task_id: UUID
+    interval: int
+    enabled: bool
+    next_run_at: datetime
+    last_run_at: datetime | None = None
+
+
+class SubscriptionCreateStruct(SubscriptionStruct):
+    owner_id: None = None
+    interval: int | None = Field(None, description="Seconds between polls, defaults to settings")
+
+    @field_validator("url")
+    @classmethod
+    def validate_url(cls, value: AnyHttpUrl) -> AnyHttpUrl:
+        url = Url(value)
+        try:
+            if url.source is UrlHostEnum.youtube and (url.is_channel or url.is_playlist):
+                return value
+        except UrlUnknownHostError:
+            pass
+        raise ValueError("Only YouTube channels and playlists can be subscribed to")
+
+    @field_validator("interval")
+    @classmethod
+    def validate_interval(cls, value: int | None) -> int | None:
+        if value is not None and value < settings.subscription_min_interval:
+            raise ValueError(f"Interval must be at least {settings.subscription_min_interval} seconds")
+        return value
+
+
+class SubscriptionResponse(SubscriptionInBaseStruct):
+    pass
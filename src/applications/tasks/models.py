@@ -10,12 +10,26 @@ class TaskStatusEnum(Enum):
     in_progress = "in_progress"
     completed = "completed"
     failed = "failed"
+    paused = "paused"
+    cancelled = "cancelled"
+
+
+class TaskStageEnum(Enum):
+    parse = "parse"
+    chunk = "chunk"
+    download = "download"
 
 
 class TaskModel(BaseDBModel):
     url = fields.CharField(max_length=256, index=True)
+    url_key = fields.CharField(max_length=256, index=True, null=True)
     owner = fields.ForeignKeyField("models.UserModel", related_name="tasks")
     status = fields.CharEnumField(TaskStatusEnum, default=TaskStatusEnum.new)
+    stage = fields.CharEnumField(TaskStageEnum, default=TaskStageEnum.parse)  # the work a paused task resumes
+    profile = fields.CharField(max_length=32, default="default")
+    parent = fields.ForeignKeyField("models.TaskModel", related_name="chunks", null=True)
+    entries = fields.JSONField(null=True)  # entry URLs of a chunk
+    jobs = fields.JSONField(null=False, default={})  # queued jobs of the in-process task runner, by task name
 
     def __repr__(self) -> str:
         return f"<TaskModel id={self.id} url={self.url} status={self.status}>"
@@ -1,7 +1,15 @@
 import uuid
 
-from applications.tasks.models import TaskModel
-from applications.tasks.structs import TaskInBaseStruct, TaskStruct
+from applications.tasks.models import TaskModel, TaskStageEnum, TaskStatusEnum
+from applications.tasks.structs import TaskInBaseStruct, TaskProgressStruct, TaskStatusStruct, TaskStruct
+from core.config import settings
+from core.fair_share import fair_scheduler
+from fastapi import HTTPException
+from tools.media_downloader.control import ControlCommandEnum, task_control
+from tools.media_downloader.urls import canonicalize_url
+
+_ACTIVE_STATUSES = (TaskStatusEnum.new, TaskStatusEnum.pending, TaskStatusEnum.in_progress, TaskStatusEnum.paused)
+_FINAL_STATUSES = {TaskStatusEnum.completed, TaskStatusEnum.failed, TaskStatusEnum.cancelled}
 
 
 class TaskSelector:
@@ -15,22 +23,216 @@ class TaskSelector:
 
     @classmethod
     async def get_all(cls) -> list[TaskInBaseStruct]:
-        tasks = await TaskModel.all()
+        tasks = await TaskModel.filter(parent_id=None)
         return [TaskInBaseStruct.model_validate(task) for task in tasks]
 
     @classmethod
     async def get_by_owner(cls, owner_id: uuid.UUID) -> list[TaskInBaseStruct]:
-        tasks = await TaskModel.filter(owner_id=owner_id)
+        tasks = await TaskModel.filter(owner_id=owner_id, parent_id=None)
         return [TaskInBaseStruct.model_validate(task) for task in tasks]
 
+    @classmethod
+    async def get_parent(cls, chunk_id: uuid.UUID) -> TaskInBaseStruct:
+        task = await TaskModel.get(pk=chunk_id).prefetch_related("parent")
+        return TaskInBaseStruct.model_validate(task.parent)
+
+    @classmethod
+    async def get_chunk_entries(cls, chunk_id: uuid.UUID) -> list[str]:
+        task = await TaskModel.get(pk=chunk_id)
+        return task.entries or []
+
+    @classmethod
+    async def get_progress(cls, task_id: uuid.UUID) -> TaskProgressStruct:
+        """
+        Derives the progress of a task from the statuses of its chunks.
+        """
+        task = await TaskModel.get(pk=task_id)
+        statuses = await TaskModel.filter(parent_id=task_id).values_list("status", flat=True)
+        if not statuses:
+            statuses = [task.status]
+        completed = sum(status == TaskStatusEnum.completed for status in statuses)
+        failed = sum(status == TaskStatusEnum.failed for status in statuses)
+        cancelled = sum(status == TaskStatusEnum.cancelled for status in statuses)
+        finished = completed + failed + cancelled
+        return TaskProgressStruct(
+            total=len(statuses),
+            completed=completed,
+            failed=failed,
+            cancelled=cancelled,
+            remaining=len(statuses) - finished,
+            progress=finished / len(statuses),
+        )
+
+    @classmethod
+    async def get_queued_jobs(cls) -> dict[uuid.UUID, dict[str, dict]]:
+        """
+        Returns the jobs the in-process task runner had queued, by task id and task name, of the tasks
+        that are not finished or cancelled.
+        """
+        tasks = await TaskModel.exclude(status__in=_FINAL_STATUSES).only("id", "jobs")
+        return {task.id: task.jobs for task in tasks if task.jobs}
+
 
 class TaskInteractor:
     @classmethod
     async def create(cls, data: TaskStruct) -> TaskInBaseStruct:
+        """
+        Creates a task, or returns the owner's existing task for the same canonical URL and download
+        profile unless it failed or was cancelled, so a link pasted again does not trigger another
+        extraction. The same URL with another profile is another task.
+        """
         data = data.model_dump()
-        task = await TaskModel.create(url=str(data["url"]), owner_id=data["owner_id"])
+        url = str(data["url"])
+        url_key = canonicalize_url(url)
+        profile = data["profile"] or settings.download_default_profile
+        task = (
+            await TaskModel.filter(owner_id=data["owner_id"], url_key=url_key, profile=profile)
+            .exclude(status__in=[TaskStatusEnum.failed, TaskStatusEnum.cancelled])
+            .first()
+        )
+        if task is None:
+            task = await TaskModel.create(url=url, url_key=url_key, owner_id=data["owner_id"], profile=profile)
         return TaskInBaseStruct.model_validate(task)
 
+    @classmethod
+    async def create_chunks(cls, parent: TaskInBaseStruct, chunks: list[list[str]]) -> list[uuid.UUID]:
+        """
+        Splits a task into child tasks, one per chunk of entry URLs.
+
+        Returns:
+            list[uuid.UUID]: The ids of the chunks, in the order of ``chunks``.
+        """
+        tasks = [
+            TaskModel(
+                id=uuid.uuid4(),
+                url=str(parent.url),
+                owner_id=parent.owner_id,
+                profile=parent.profile or settings.download_default_profile,
+                parent_id=parent.id,
+                entries=entries,
+            )
+            for entries in chunks
+        ]
+        await TaskModel.bulk_create(tasks)
+        await TaskModel.filter(pk=parent.id).update(status=TaskStatusEnum.in_progress, stage=TaskStageEnum.chunk)
+        return [task.id for task in tasks]
+
+    @classmethod
+    async def finish_chunk(cls, chunk_id: uuid.UUID, status: TaskStatusEnum) -> None:
+        """
+        Sets the final status of a chunk. The last chunk to finish completes the parent task,
+        or fails it if any of its chunks failed.
+        """
+        chunk = await TaskModel.get(pk=chunk_id)
+        chunk.status = status
+        await chunk.save(update_fields=["status"])
+
+        statuses = set(await TaskModel.filter(parent_id=chunk.parent_id).values_list("status", flat=True))
+        if statuses <= _FINAL_STATUSES:
+            parent_status = TaskStatusEnum.failed if TaskStatusEnum.failed in statuses else TaskStatusEnum.completed
+            await (
+                TaskModel.filter(pk=chunk.parent_id)
+                .exclude(status=TaskStatusEnum.cancelled)
+                .update(status=parent_status)
+            )
+
+    @classmethod
+    async def set_job(cls, task_pk: uuid.UUID, name: str, job: dict | None, done: dict | None = None) -> None:
+        """
+        Records a job of the in-process task runner queued for the task, or drops it when ``job`` is None.
+
+        Args:
+            done (dict, optional): The finished job being dropped. A job of the same name queued
+                meanwhile, e.g. a retry, is kept.
+        """
+        task = await TaskModel.get_or_none(pk=task_pk).only("id", "jobs")
+        if task is None:
+            return
+        jobs = dict(task.jobs)
+        if job is None:
+            if done is not None and jobs.get(name) != done:
+                return
+            jobs.pop(name, None)
+        else:
+            jobs[name] = job
+        await TaskModel.filter(pk=task_pk).update(jobs=jobs)
+
+    @classmethod
+    async def cancel(cls, task_pk: uuid.UUID) -> TaskStatusStruct:
+        """
+        Cancels a task and its chunks. A running download stops at its next progress update and
+        removes its partial files, queued runs see the command when they start.
+        """
+        task = await cls._get_active(task_pk)
+        cls._send_command(task, ControlCommandEnum.cancel)
+        fair_scheduler.withdraw(str(task.owner_id), str(task.pk))
+        await TaskModel.filter(parent_id=task.pk, status__in=_ACTIVE_STATUSES).update(status=TaskStatusEnum.cancelled)
+        task.status = TaskStatusEnum.cancelled
+        await task.save(update_fields=["status"])
+        return TaskStatusStruct.model_validate(task)
+
+    @classmethod
+    async def pause(cls, task_pk: uuid.UUID) -> TaskStatusStruct:
+        """
+        Pauses a task. A running download stops at its next progress update and keeps its partial
+        files, so it continues from them on resume; its worker is free meanwhile.
+        """
+        task = await cls._get_active(task_pk)
+        if task.status == TaskStatusEnum.paused:
+            return TaskStatusStruct.model_validate(task)
+        cls._send_command(task, ControlCommandEnum.pause)
+        fair_scheduler.withdraw(str(task.owner_id), str(task.pk))
+        task.status = TaskStatusEnum.paused
+        await task.save(update_fields=["status"])
+        return TaskStatusStruct.model_validate(task)
+
+    @classmethod
+    async def resume(cls, task_pk: uuid.UUID) -> tuple[TaskStatusStruct, list[uuid.UUID]]:
+        """
+        Resumes a paused task. The caller queues the work of the stage it was paused in again:
+        its parse, its chunks that did not finish, or its download.
+
+        Returns:
+            tuple[TaskStatusStruct, list[uuid.UUID]]: The task, and its unfinished chunks in the chunk stage.
+        """
+        task = await TaskModel.get(pk=task_pk)
+        if task.status != TaskStatusEnum.paused:
+            raise HTTPException(status_code=400, detail="Task is not paused")
+        if not task_control.clear(str(task.pk)):
+            raise HTTPException(status_code=503, detail="Task control is unavailable")
+        chunk_ids = []
+        if task.stage == TaskStageEnum.chunk:
+            chunk_ids = await TaskModel.filter(parent_id=task.pk, status__in=_ACTIVE_STATUSES).values_list(
+                "id", flat=True
+            )
+            await TaskModel.filter(pk__in=chunk_ids).update(status=TaskStatusEnum.pending)
+        task.status = TaskStatusEnum.in_progress if chunk_ids else TaskStatusEnum.pending
+        await task.save(update_fields=["status"])
+        return TaskStatusStruct.model_validate(task), list(chunk_ids)
+
+    @classmethod
+    def _send_command(cls, task: TaskModel, command: ControlCommandEnum) -> None:
+        """
+        Sends the command before the task's status changes, so a failed send leaves the task as it was.
+        """
+        if not task_control.send(str(task.pk), command):
+            raise HTTPException(status_code=503, detail="Task control is unavailable")
+
+    @classmethod
+    async def _get_active(cls, task_pk: uuid.UUID) -> TaskModel:
+        task = await TaskModel.get(pk=task_pk)
+        if task.status in _FINAL_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Task is already {task.status.value}")
+        return task
+
+    @classmethod
+    async def set_status(cls, task_pk: uuid.UUID, status: TaskStatusEnum) -> None:
+        await TaskModel.filter(pk=task_pk).update(status=status)
+
+    @classmethod
+    async def set_stage(cls, task_pk: uuid.UUID, stage: TaskStageEnum) -> None:
+        await TaskModel.filter(pk=task_pk).update(stage=stage)
+
     @classmethod
     async def delete(cls, task_pk: uuid.UUID) -> None:
         task = await TaskModel.get(pk=task_pk)
@@ -1,6 +1,8 @@
 from uuid import UUID
 
-from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field
+from applications.tasks.models import TaskStageEnum, TaskStatusEnum
+from core.config import settings
+from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, field_validator
 
 
 class TaskStruct(BaseModel):
@@ -12,6 +14,7 @@ class TaskStruct(BaseModel):
         alias="url",
     )
     owner_id: UUID
+    profile: str | None = None
 
 
 class TaskInBaseStruct(TaskStruct):
@@ -21,6 +24,36 @@ class TaskInBaseStruct(TaskStruct):
 class TaskCreateStruct(TaskStruct):
     owner_id: None = None
 
+    @field_validator("profile")
+    @classmethod
+    def validate_profile(cls, value: str | None) -> str | None:
+        if value is not None and value not in settings.download_profiles:
+            profiles = ", ".join(settings.download_profiles)
+            raise ValueError(f"Unknown download profile, expected one of: {profiles}")
+        return value
+
 
 class TaskResponse(TaskInBaseStruct):
     pass
+
+
+class TaskProgressStruct(BaseModel):
+    """
+    Progress of a task, counted in chunks. A task parsed in one piece counts as a single chunk.
+    """
+
+    total: int
+    completed: int
+    failed: int
+    cancelled: int = 0
+    remaining: int
+    progress: float = Field(..., ge=0, le=1)
+
+
+class TaskStatusStruct(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+    id: UUID
+    status: TaskStatusEnum
+    stage: TaskStageEnum
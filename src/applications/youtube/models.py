@@ -15,7 +15,17 @@ class BaseYTItemModel(BaseDBModel):
         abstract = True
 
 
-class YTChannelModel(BaseYTItemModel):
+class BaseYTListingModel(BaseYTItemModel):
+    last_entry_id = fields.CharField(max_length=256, null=True)
+    last_timestamp = fields.BigIntField(null=True)
+    last_upload_date = fields.CharField(max_length=8, null=True)
+    sync_marks = fields.JSONField(null=False, default={})
+
+    class Meta:
+        abstract = True
+
+
+class YTChannelModel(BaseYTListingModel):
     class Meta:
         table = "channels"
 
@@ -23,7 +33,7 @@ class YTChannelModel(BaseYTItemModel):
     task = fields.ForeignKeyField("models.TaskModel", related_name="channels")
 
 
-class YTPlaylistModel(BaseYTItemModel):
+class YTPlaylistModel(BaseYTListingModel):
     class Meta:
         table = "playlists"
 
@@ -37,3 +47,42 @@ class YTVideoModel(BaseYTItemModel):
 
     owner = fields.ForeignKeyField("models.UserModel", related_name="videos")
     task = fields.ForeignKeyField("models.TaskModel", related_name="videos")
+
+
+class YTRawInfoModel(BaseDBModel):
+    class Meta:
+        table = "raw_info"
+
+    ext_id = fields.CharField(max_length=256, unique=True)
+    data = fields.JSONField(null=False, default={})
+
+
+class DownloadArchiveModel(BaseDBModel):
+    class Meta:
+        table = "download_archive"
+        unique_together = (("extractor", "ext_id"),)
+
+    extractor = fields.CharField(max_length=64)
+    ext_id = fields.CharField(max_length=256)
+
+
+class MediaBlobModel(BaseDBModel):
+    class Meta:
+        table = "media_blobs"
+
+    sha256 = fields.CharField(max_length=64, unique=True)
+    suffix = fields.CharField(max_length=16)
+    size = fields.BigIntField()
+    ext_key = fields.CharField(max_length=256, null=True, index=True)
+    probe = fields.JSONField(null=False, default={})
+
+
+class MediaFileModel(BaseDBModel):
+    class Meta:
+        table = "media_files"
+        unique_together = (("owner", "blob"),)
+
+    owner = fields.ForeignKeyField("models.UserModel", related_name="media_files")
+    blob = fields.ForeignKeyField("models.MediaBlobModel", related_name="files")
+    name = fields.CharField(max_length=256)
+    path = fields.CharField(max_length=1024, null=True)
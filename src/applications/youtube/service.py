@@ -1,7 +1,23 @@
+import asyncio
 import uuid
+from datetime import UTC, datetime
+from pathlib import Path
 
-from .models import YTChannelModel, YTPlaylistModel, YTVideoModel
-from .structs import YTItemStruct
+from tools.media_downloader.archive import download_archive
+from tools.media_downloader.store import media_store
+from tools.media_downloader.structs import DownloadedFile, PostProcessResult, YTEntryInfo
+from tortoise.transactions import in_transaction
+
+from .models import (
+    DownloadArchiveModel,
+    MediaBlobModel,
+    MediaFileModel,
+    YTChannelModel,
+    YTPlaylistModel,
+    YTRawInfoModel,
+    YTVideoModel,
+)
+from .structs import YTBulkUpsertResult, YTItemStruct
 
 
 class YTItemSelector:
@@ -40,15 +56,203 @@ class YTItemInteractor:
         self.__model = model
 
     async def create(self, data: YTItemStruct) -> YTItemStruct:
-        return YTItemStruct.model_validate(
-            await self.__model.create(
-                **data.model_dump(exclude={"owner", "task"}), owner_id=data.owner.id, task_id=data.task.id
-            )
+        item = await self.__model.create(
+            **data.model_dump(exclude={"owner", "task", "meta_data"}),
+            metadata=data.meta_data or {},
+            owner_id=data.owner.id,
+            task_id=data.task.id,
+        )
+        await item.fetch_related("owner", "task")
+        return YTItemStruct.model_validate(item)
+
+    async def bulk_upsert(  # noqa: PLR0913
+        self,
+        owner_id: uuid.UUID,
+        task_id: uuid.UUID,
+        items: dict[str, dict],
+        batch_size: int = 500,
+        flat: bool = False,
+    ) -> YTBulkUpsertResult:
+        """
+        Inserts the items or updates the metadata of the ones stored already, in one transaction and
+        with one lookup and one ``INSERT ... ON CONFLICT (ext_id) DO UPDATE`` per batch.
+
+        Args:
+            owner_id (uuid.UUID): Owner of the inserted items, stored items keep theirs.
+            task_id (uuid.UUID): Task of the inserted items.
+            items (dict[str, dict]): Metadata by ext_id.
+            batch_size (int): Items per statement.
+            flat (bool): The items are flat listing entries, only new ones are inserted (``ON CONFLICT
+                DO NOTHING``) so the full metadata of resolved items is not replaced by the stubs.
+
+        Returns:
+            YTBulkUpsertResult: Inserted and updated counts, taken from the lookup before each batch is
+                written. Items written by a concurrent transaction in between are counted as inserted,
+                so the counts are approximate under concurrent writers; they are meant for logs.
+        """
+        result = YTBulkUpsertResult()
+        ext_ids = list(items)
+        conflict = (
+            {"ignore_conflicts": True}
+            if flat
+            else {"on_conflict": ["ext_id"], "update_fields": ["metadata", "updated_at"]}
         )
+        async with in_transaction() as connection:
+            for start in range(0, len(ext_ids), batch_size):
+                batch = ext_ids[start : start + batch_size]
+                existing = await self.__model.filter(ext_id__in=batch).using_db(connection).count()
+                await self.__model.bulk_create(
+                    [
+                        self.__model(ext_id=ext_id, metadata=items[ext_id], owner_id=owner_id, task_id=task_id)
+                        for ext_id in batch
+                    ],
+                    using_db=connection,
+                    **conflict,
+                )
+                if not flat:
+                    result.updated += existing
+                result.inserted += len(batch) - existing
+        return result
 
-    async def set_metadata(self, item_id: uuid.UUID, data) -> YTItemStruct:
+    async def set_metadata(self, item_id: uuid.UUID, data: dict) -> YTItemStruct:
         item = await self.__model.get(pk=item_id)
-        await item.update(meta_data=data)
-        item.status = "parsed"
-        await item.save()
+        item.metadata = data
+        await item.save(update_fields=["metadata", "updated_at"])
+        await item.fetch_related("owner", "task")
         return YTItemStruct.model_validate(item)
+
+
+class YTListingInteractor:
+    @classmethod
+    async def add_entries(cls, entries: list[YTEntryInfo], owner_id: uuid.UUID, task_id: uuid.UUID) -> int:
+        """
+        Stores the entries found by a channel or playlist sync as videos of the syncing owner and task,
+        not of the listing's, which may have been parsed through another user's task.
+
+        Returns:
+            int: The number of videos created, entries stored already keep their metadata.
+        """
+        result = await YTItemInteractor(YTVideoModel).bulk_upsert(
+            owner_id,
+            task_id,
+            {entry.id: entry.model_dump(exclude_none=True) for entry in entries},
+            flat=True,
+        )
+        return result.inserted
+
+    @classmethod
+    async def set_high_water(
+        cls, listing: YTChannelModel | YTPlaylistModel, marks: dict[str, str], entries: list[YTEntryInfo]
+    ) -> YTChannelModel | YTPlaylistModel:
+        """
+        Moves the high-water mark of a channel or playlist to the newest of the synced entries.
+
+        Args:
+            listing (YTChannelModel | YTPlaylistModel): The synced channel or playlist.
+            marks (dict[str, str]): The per-listing marks updated by ``MediaDownloader.iter_entries``.
+            entries (list[YTEntryInfo]): The new entries, newest first.
+        """
+        listing.sync_marks = marks
+        update_fields = ["sync_marks", "updated_at"]
+        if entries:
+            listing.last_entry_id = entries[0].id
+            update_fields.append("last_entry_id")
+        timestamps = [entry.timestamp for entry in entries if entry.timestamp is not None]
+        if timestamps and max(timestamps) > (listing.last_timestamp or 0):
+            listing.last_timestamp = max(timestamps)
+            listing.last_upload_date = datetime.fromtimestamp(listing.last_timestamp, UTC).strftime("%Y%m%d")
+            update_fields += ["last_timestamp", "last_upload_date"]
+        await listing.save(update_fields=update_fields)
+        return listing
+
+
+class YTRawInfoInteractor:
+    @classmethod
+    async def save(cls, ext_id: str, data: dict) -> None:
+        await YTRawInfoModel.update_or_create(defaults={"data": data}, ext_id=ext_id)
+
+
+class DownloadArchiveInteractor:
+    @classmethod
+    async def ensure_loaded(cls) -> None:
+        """
+        Loads the archive index of the process from the DB, once.
+        """
+        if download_archive.loaded:
+            return
+        rows = await DownloadArchiveModel.all().values_list("extractor", "ext_id")
+        download_archive.load(download_archive.make_key(extractor, ext_id) for extractor, ext_id in rows)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """
+        Persists the keys added to the archive index since the last flush.
+
+        Returns:
+            int: The number of flushed keys.
+        """
+        keys = download_archive.drain_new()
+        if keys:
+            await DownloadArchiveModel.bulk_create(
+                [
+                    DownloadArchiveModel(extractor=extractor, ext_id=ext_id)
+                    for extractor, ext_id in map(_split_key, keys)
+                ],
+                ignore_conflicts=True,
+            )
+        return len(keys)
+
+
+class MediaStoreInteractor:
+    @classmethod
+    async def add(cls, owner_id: uuid.UUID, file: DownloadedFile, result: PostProcessResult) -> MediaFileModel | None:
+        """
+        Moves a post-processed download into the content-addressed store and gives the owner an entry
+        for it. Content stored already is not stored again, the owner's entry points at the existing blob.
+
+        Returns:
+            MediaFileModel | None: The owner's entry, None if the file could not be hashed.
+        """
+        if result.sha256 is None:
+            return None
+        path = Path(result.path)
+        blob_path = await asyncio.to_thread(media_store.ingest, path, result.sha256)
+        probe = result.model_dump(exclude={"path", "sha256", "size", "thumbnail", "remuxed", "errors"})
+        if result.thumbnail:
+            thumbnail = await asyncio.to_thread(media_store.ingest, Path(result.thumbnail), result.sha256, ".thumb.jpg")
+            probe["thumbnail"] = str(thumbnail.relative_to(media_store.blobs))
+        blob, _ = await MediaBlobModel.get_or_create(
+            defaults={"suffix": blob_path.suffix, "size": result.size, "ext_key": file.ext_key, "probe": probe},
+            sha256=result.sha256,
+        )
+        return await cls._link(owner_id, blob, path.name)
+
+    @classmethod
+    async def share(cls, ext_key: str, owner_id: uuid.UUID) -> int:
+        """
+        Gives the owner entries for the stored files of a video downloaded before, e.g. by another user.
+
+        Returns:
+            int: The number of files of the video, 0 if none are stored, e.g. while the earlier download
+                is still post-processed; the video is then downloaded again.
+        """
+        blobs = await MediaBlobModel.filter(ext_key=ext_key).prefetch_related("files")
+        for blob in blobs:
+            name = blob.files[0].name if blob.files else f"{blob.sha256}{blob.suffix}"
+            await cls._link(owner_id, blob, name)
+        return len(blobs)
+
+    @classmethod
+    async def _link(cls, owner_id: uuid.UUID, blob: MediaBlobModel, name: str) -> MediaFileModel:
+        if entry := await MediaFileModel.get_or_none(owner_id=owner_id, blob_id=blob.pk):
+            return entry
+        blob_path = media_store.blob_path(blob.sha256, blob.suffix)
+        link = await asyncio.to_thread(media_store.link, blob_path, str(owner_id), name)
+        return await MediaFileModel.create(
+            owner_id=owner_id, blob_id=blob.pk, name=name, path=str(link) if link else None
+        )
+
+
+def _split_key(key: str) -> tuple[str, str]:
+    extractor, ext_id = key.split(" ", 1)
+    return extractor, ext_id
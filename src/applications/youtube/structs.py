@@ -1,7 +1,7 @@
 from applications.tasks.structs import TaskInBaseStruct
 from applications.users.schemas.user_schemas import UserInBaseStruct
 from applications.youtube.enums import StatusEnum
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class YTItemStruct(BaseModel):
@@ -10,6 +10,11 @@ class YTItemStruct(BaseModel):
     )
     owner: UserInBaseStruct
     task: TaskInBaseStruct
-    meta_data: dict | None = None
+    meta_data: dict | None = Field(None, validation_alias=AliasChoices("meta_data", "metadata"))
     status: StatusEnum = StatusEnum.new
     ext_id: str | None = None
+
+
+class YTBulkUpsertResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
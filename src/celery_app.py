@@ -0,0 +1,43 @@
+from celery import Celery
+from celery.signals import before_task_publish
+from core.autoscale import stamp_enqueued_at
+from core.config import settings
+from core.worker_loop import AsyncTask
+from kombu import Queue
+
+# The one app of the web process and the workers: tasks queued by the API go to the same broker and
+# queues the workers consume.
+celery = Celery(__name__, task_cls=AsyncTask)
+celery.conf.broker_url = settings.celery_broker_url
+celery.conf.result_backend = settings.celery_result_backend
+celery.conf.broker_transport_options = {"visibility_timeout": settings.celery_visibility_timeout}
+
+# Quick metadata extraction, multi-GB downloads and CPU-bound post-processing get their own queues,
+# served by separate workers, so a title lookup never waits behind a download.
+celery.conf.task_queues = [Queue(name) for name in settings.celery_queues]
+celery.conf.task_default_queue = "metadata"
+# Used by workers started with --autoscale=<max>,<min>, see worker_argv
+celery.conf.worker_autoscaler = "core.autoscale:QueueAutoscaler"
+celery.conf.task_routes = {
+    "celery_tasks.parse_url": {"queue": "metadata"},
+    "celery_tasks.parse_chunk": {"queue": "metadata"},
+    "celery_tasks.download_url": {"queue": "download"},
+    "celery_tasks.post_process": {"queue": "post-process"},
+    "celery_tasks.dispatch_subscriptions": {"queue": "metadata"},
+    "celery_tasks.sync_subscription": {"queue": "metadata"},
+    "celery_tasks.dispatch_downloads": {"queue": "metadata"},
+}
+celery.conf.beat_schedule = {
+    "dispatch-subscriptions": {
+        "task": "celery_tasks.dispatch_subscriptions",
+        "schedule": settings.subscription_dispatch_interval,
+        "options": {"expires": settings.subscription_dispatch_interval},
+    },
+    "dispatch-downloads": {
+        "task": "celery_tasks.dispatch_downloads",
+        "schedule": settings.fair_share_dispatch_interval,
+        "options": {"expires": settings.fair_share_dispatch_interval},
+    },
+}
+
+before_task_publish.connect(stamp_enqueued_at)
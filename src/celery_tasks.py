@@ -1,40 +1,417 @@
+import asyncio
+import itertools
+import logging
 import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from functools import partial
 
-from applications.tasks.service import TaskSelector
+from applications.subscriptions.service import SubscriptionInteractor, SubscriptionSelector
+from applications.tasks.models import TaskStageEnum, TaskStatusEnum
+from applications.tasks.service import TaskInteractor, TaskSelector
+from applications.tasks.structs import TaskInBaseStruct
+from applications.users.selectors import UserSelector
 from applications.youtube.models import YTChannelModel, YTPlaylistModel, YTVideoModel
-from applications.youtube.service import YTItemInteractor, YTItemSelector
+from applications.youtube.service import (
+    DownloadArchiveInteractor,
+    MediaStoreInteractor,
+    YTItemInteractor,
+    YTItemSelector,
+    YTListingInteractor,
+    YTRawInfoInteractor,
+)
 from applications.youtube.structs import YTItemStruct
-from celery import shared_task
-from tools.media_downloader.downloader import MediaDownloader
+from celery_app import celery
+from contants import MEDIA_FOLDER
+from core.config import settings
+from core.fair_share import fair_scheduler
+from core.singleflight import singleflight
+from tools.media_downloader.admission import disk_admission, estimate_size
+from tools.media_downloader.archive import download_archive
+from tools.media_downloader.checkpoints import checkpoint_store
+from tools.media_downloader.control import ControlCommandEnum, task_control
+from tools.media_downloader.downloader import MediaDownloader, Url
+from tools.media_downloader.exceptions import DownloadCancelledError, DownloadPausedError
+from tools.media_downloader.proccesing.post import post_processor
+from tools.media_downloader.progress_hooks import ControlHook, ProgressSink, ThroughputHook
+from tools.media_downloader.store import media_store
+from tools.media_downloader.structs import DownloadedFile, YTEntryInfo, YTListingCompact, YTVideoCompact
+from tortoise import Model
+from tortoise.exceptions import DoesNotExist
+from yt_dlp.utils import DownloadError
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-async def parse_url(task_id: uuid.UUID) -> None:
-    task = await TaskSelector.get_by_id(task_id)
-    service = MediaDownloader.download(task.url)
-    info = service.extract_info()
 
-    if service.source == "youtube":
-        if service.is_video:
-            service.model = YTVideoModel
-        if service.is_channel:
-            service.model = YTChannelModel
-        if service.is_playlist:
-            service.model = YTPlaylistModel
+class ParseStoppedError(Exception):
+    pass
+
 
-        selector = YTItemSelector(service.model)
-        interactor = YTItemInteractor(service.model)
+@celery.task(persist_job=True)
+async def parse_url(task_id: uuid.UUID) -> dict:
+    """
+    Extracts the task's URL and stores its item. Concurrent parses of the same URL run once,
+    the other workers wait for that run and reuse its result. A parse stopped by a pause or cancel
+    stores no item and leaves no result to reuse.
+    """
+    task = await TaskSelector.get_by_id(task_id)
+    await TaskInteractor.set_stage(task_id, TaskStageEnum.parse)
+    try:
+        return await singleflight(f"parse-url:{Url(task.url).canonical}", partial(_parse_url, task))
+    except ParseStoppedError as e:
+        logger.info("%s", e)
+        return {}
 
-        raw_data = info.model_dump(by_alias=False)
 
-        if item := await selector.get_by_ext_id(info.id):
-            return await interactor.set_metadata(item.pk, raw_data)
+async def _parse_url(task: TaskInBaseStruct) -> dict:
+    """
+    A parsed channel or playlist gets the high-water marks of the walk, so its first sync only pages
+    through the entries published since.
+    """
+    await DownloadArchiveInteractor.ensure_loaded()
+    marks = {}
+    with MediaDownloader(task.url, MEDIA_FOLDER) as downloader:
+        if downloader.model is YTVideoModel:
+            info = await asyncio.to_thread(downloader.extract_compact)
         else:
-            return await interactor.create(
-                YTItemStruct.model_validate({
-                    "owner": task.owner,
-                    "task": task,
-                    "ext_id": info.id,
-                    "meta_data": raw_data,
-                })
-            )
+            info = await _parse_listing(task, downloader, marks)
+        model = downloader.model
+        raw_info = downloader.info_raw
+
+    if settings.store_raw_info:
+        await YTRawInfoInteractor.save(info.id, raw_info)
+    item = await _save_item(task, model, info.to_dict())
+    if marks:
+        await YTListingInteractor.set_high_water(await model.get(ext_id=info.id), marks, [])
+    return item
+
+
+async def _parse_listing(
+    task: TaskInBaseStruct, downloader: MediaDownloader, marks: dict[str, str] | None = None
+) -> YTListingCompact:
+    """
+    Walks the entries of a playlist or channel once, ``settings.task_chunk_size`` entries at a time,
+    skipping the archived ones. ``marks`` gets the newest entry id of every walked listing, see
+    ``MediaDownloader.iter_entries``.
+
+    A listing of a single batch is resolved right here. The batches of a larger one are stored as flat
+    entries and turned into chunk tasks while the walk goes on, so one batch is held in memory at most.
+    The chunks, which resolve the entries in parallel, are queued once the walk is done. A cancel stops
+    the walk, a pause lets it finish and the chunks pause when they start.
+
+    Raises:
+        ParseStoppedError: If the task was paused or cancelled.
+    """
+    listing = await asyncio.to_thread(downloader.extract_listing)
+    batches = _batches(downloader.iter_entries(skip_archived=True, marks=marks), settings.task_chunk_size)
+    first = await asyncio.to_thread(next, batches, [])
+    second = await asyncio.to_thread(next, batches, [])
+    if not second:
+        items = await _resolve_entries([entry.url for entry in first], partial(_task_stopped, task.id))
+        if items is None:
+            raise ParseStoppedError(f"Parse of task {task.id} stopped")
+        result = await YTItemInteractor(YTVideoModel).bulk_upsert(task.owner_id, task.id, items)
+        logger.info("Entries of %s: %s inserted, %s updated", listing.id, result.inserted, result.updated)
+        listing.entries = [YTVideoCompact.from_info(item) for item in items.values()]
+        return listing
+
+    chunk_ids = []
+    pending = itertools.chain((first, second), batches)
+    while batch := await asyncio.to_thread(next, pending, []):
+        if await asyncio.to_thread(task_control.get, str(task.id)) is ControlCommandEnum.cancel:
+            raise ParseStoppedError(f"Parse of task {task.id} cancelled after {len(chunk_ids)} chunks")
+        await YTItemInteractor(YTVideoModel).bulk_upsert(
+            task.owner_id, task.id, {entry.id: entry.model_dump(mode="json") for entry in batch}, flat=True
+        )
+        chunk_ids += await TaskInteractor.create_chunks(task, [[entry.url for entry in batch]])
+    for chunk_id in chunk_ids:
+        parse_chunk.delay(chunk_id)
+    logger.info("Task %s split into %s chunks", task.id, len(chunk_ids))
+    return listing
+
+
+def _batches(entries: Iterator[YTEntryInfo], size: int) -> Iterator[list[YTEntryInfo]]:
+    while batch := list(itertools.islice(entries, size)):
+        yield batch
+
+
+async def _resolve_entries(urls: list[str], stopped: Callable[[], Awaitable[bool]]) -> dict[str, dict] | None:
+    """
+    Extracts the entries one by one. Entries already in the download archive are not extracted
+    again, entries that cannot be extracted, e.g. private videos, are skipped.
+
+    Args:
+        urls (list[str]): The entry URLs.
+        stopped (Callable[[], Awaitable[bool]]): Checked before every entry, resolving ends once it is true.
+
+    Returns:
+        dict[str, dict] | None: The compact metadata by id, None if resolving was stopped.
+    """
+    items = {}
+    for url in urls:
+        if await stopped():
+            return None
+        if Url(url).ext_key in download_archive:
+            continue
+        try:
+            with MediaDownloader(url, MEDIA_FOLDER) as downloader:
+                info = await asyncio.to_thread(downloader.extract_compact)
+        except DownloadError as e:
+            logger.warning("Skipping %s: %s", url, e)
+            continue
+        items[info.id] = info.to_dict()
+    return items
+
+
+async def _task_stopped(task_id: uuid.UUID) -> bool:
+    return await asyncio.to_thread(task_control.get, str(task_id)) is not None
+
+
+async def _save_item(task: TaskInBaseStruct, model: type[Model], metadata: dict) -> dict:
+    selector = YTItemSelector(model)
+    interactor = YTItemInteractor(model)
+
+    try:
+        item = await selector.get_by_ext_id(metadata["id"])
+    except DoesNotExist:
+        owner = await UserSelector.get_by_uid(task.owner_id)
+        item = await interactor.create(
+            YTItemStruct.model_validate({
+                "owner": owner,
+                "task": task,
+                "ext_id": metadata["id"],
+                "meta_data": metadata,
+            })
+        )
+    else:
+        item = await interactor.set_metadata(item.pk, metadata)
+    return item.model_dump(mode="json")
+
+
+@celery.task(persist_job=True)
+async def parse_chunk(chunk_id: uuid.UUID, attempt: int = 0) -> int:
+    """
+    Resolves the entries of one chunk of a large listing and stores them as videos of the parent task.
+
+    Archived and unavailable entries are skipped, see ``_resolve_entries``. Any other failure retries
+    the whole chunk up to ``settings.task_chunk_max_retries`` times before the chunk is failed.
+
+    Returns:
+        int: The number of stored videos.
+    """
+    parent = await TaskSelector.get_parent(chunk_id)
+    if await _chunk_stopped(chunk_id, parent.id):
+        return 0
+    try:
+        await TaskInteractor.set_status(chunk_id, TaskStatusEnum.in_progress)
+        await DownloadArchiveInteractor.ensure_loaded()
+        urls = await TaskSelector.get_chunk_entries(chunk_id)
+        items = await _resolve_entries(urls, partial(_chunk_stopped, chunk_id, parent.id))
+        if items is None:
+            return 0
+        await YTItemInteractor(YTVideoModel).bulk_upsert(parent.owner_id, parent.id, items)
+    except Exception:
+        if attempt < settings.task_chunk_max_retries:
+            logger.exception("Chunk %s failed, retrying", chunk_id)
+            await TaskInteractor.set_status(chunk_id, TaskStatusEnum.pending)
+            parse_chunk.apply_async((chunk_id, attempt + 1), countdown=settings.task_chunk_retry_delay * 2**attempt)
+            return 0
+        await TaskInteractor.finish_chunk(chunk_id, TaskStatusEnum.failed)
+        raise
+    await TaskInteractor.finish_chunk(chunk_id, TaskStatusEnum.completed)
+    return len(items)
+
+
+async def _chunk_stopped(chunk_id: uuid.UUID, parent_id: uuid.UUID) -> bool:
+    """
+    Whether the parent task of a chunk was paused or cancelled. A paused chunk is parsed again from
+    its start on resume.
+    """
+    command = await asyncio.to_thread(task_control.get, str(parent_id))
+    if command is ControlCommandEnum.pause:
+        await TaskInteractor.set_status(chunk_id, TaskStatusEnum.paused)
+    return command is not None
+
+
+async def submit_download(task: TaskInBaseStruct) -> None:
+    """
+    Queues the task's download in its owner's fair-share queue and starts what the free slots and
+    the cap of its host allow.
+    """
+    await TaskInteractor.set_stage(task.id, TaskStageEnum.download)
+    await asyncio.to_thread(fair_scheduler.submit, str(task.owner_id), str(task.id), Url(task.url).host)
+    await _dispatch_downloads()
+
+
+async def _dispatch_downloads() -> int:
+    task_ids = await asyncio.to_thread(fair_scheduler.dispatch)
+    for task_id in task_ids:
+        download_url.delay(task_id)
+    return len(task_ids)
+
+
+@celery.task
+async def dispatch_downloads() -> int:
+    """
+    Starts queued downloads on the free slots in fair-share order, run by beat every
+    ``settings.fair_share_dispatch_interval`` seconds for slots freed by expiry.
+
+    Returns:
+        int: The number of started downloads.
+    """
+    return await _dispatch_downloads()
+
+
+@celery.task(acks_late=True, reject_on_worker_lost=True, persist_job=True)
+async def download_url(task_id: uuid.UUID) -> None:
+    """
+    Runs a download started by the fair-share scheduler and frees its slot when it ends, unless it
+    waits for disk space. The next queued downloads are started then.
+
+    The task is acknowledged only when it ends, so a download interrupted by a worker restart is
+    delivered again and resumes from its checkpoint.
+    """
+    task = await TaskSelector.get_by_id(task_id)
+    deferred = False
+    try:
+        deferred = await _download_url(task)
+    finally:
+        if not deferred:
+            await asyncio.to_thread(fair_scheduler.release, str(task_id))
+            await _dispatch_downloads()
+
+
+async def _download_url(task: TaskInBaseStruct) -> bool:
+    """
+    Downloads the task's URL into its own folder under the store's ``incoming/``. A video in the
+    download archive gets the stored files instead, or is downloaded again if none are stored.
+
+    The estimated size is reserved against the disk budget first, while the budget is exhausted
+    the task stays pending and is retried after ``settings.disk_retry_delay`` seconds.
+
+    A pause or cancel command stops the download at its next progress update. A paused download
+    keeps its partial files and checkpoint for the resumed run, a cancelled one removes its folder.
+
+    Returns:
+        bool: True if the download was deferred until disk space is free, it keeps its slot.
+    """
+    task_id = task.id
+    if command := await asyncio.to_thread(task_control.get, str(task_id)):
+        logger.info("Download of task %s is %s, skipping", task_id, command.value)
+        return False
+    await DownloadArchiveInteractor.ensure_loaded()
+    files = []
+    try:
+        folder = media_store.incoming_folder(str(task_id))
+        with MediaDownloader(task.url, folder, profile=task.profile) as downloader:
+            archived = downloader.is_archived
+            if archived and await MediaStoreInteractor.share(downloader.url.ext_key, task.owner_id):
+                logger.info("Task %s shares the stored files of %s", task_id, downloader.url.ext_key)
+            else:
+                # Fresh info, its format URLs are downloaded below without extracting the URL again
+                info = await asyncio.to_thread(downloader.extract_compact, True)
+                size = estimate_size(info)
+                if not await asyncio.to_thread(disk_admission.reserve, str(task_id), size, task.url):
+                    await TaskInteractor.set_status(task_id, TaskStatusEnum.pending)
+                    download_url.apply_async((task_id,), countdown=settings.disk_retry_delay)
+                    return True
+                await TaskInteractor.set_status(task_id, TaskStatusEnum.in_progress)
+                downloader.add_progress_hook(ProgressSink(str(task_id)))
+                downloader.add_progress_hook(ControlHook(task_control, str(task_id)))
+                downloader.add_progress_hook(ThroughputHook(fair_scheduler))
+                try:
+                    files = await asyncio.to_thread(downloader.download, str(task_id), archived, downloader.info_raw)
+                except DownloadPausedError:
+                    logger.info("Download of task %s paused, partial files kept", task_id)
+                    return False
+                except DownloadCancelledError:
+                    removed = await asyncio.to_thread(media_store.remove_incoming_folder, str(task_id))
+                    await asyncio.to_thread(checkpoint_store.clear, str(task_id))
+                    logger.info("Download of task %s cancelled, %s partial files removed", task_id, removed)
+                    return False
+                finally:
+                    await asyncio.to_thread(disk_admission.release, str(task_id))
+    except Exception:
+        await TaskInteractor.set_status(task_id, TaskStatusEnum.failed)
+        raise
+    finally:
+        await DownloadArchiveInteractor.flush()
+    await TaskInteractor.set_status(task_id, TaskStatusEnum.completed)
+    if files:
+        post_process.delay(task_id, [file.model_dump() for file in files])
+    return False
+
+
+@celery.task(persist_job=True)
+async def post_process(task_id: uuid.UUID, files: list[dict]) -> list[dict]:
+    """
+    Hashes, probes and thumbnails the files of a finished download on the post-process worker,
+    then moves them into the content-addressed media store.
+    """
+    task = await TaskSelector.get_by_id(task_id)
+    files = [DownloadedFile.model_validate(file) for file in files]
+    results = await asyncio.to_thread(post_processor.run, [file.path for file in files])
+    for file, result in zip(files, results, strict=True):
+        if result.errors:
+            logger.warning("Post-processing of %s for task %s: %s", result.path, task_id, "; ".join(result.errors))
+        await MediaStoreInteractor.add(task.owner_id, file, result)
+    await asyncio.to_thread(media_store.drop_incoming_folder, str(task_id))
+    return [result.model_dump() for result in results]
+
+
+async def _sync_listing(
+    listing: YTChannelModel | YTPlaylistModel,
+    downloader: MediaDownloader,
+    owner_id: uuid.UUID,
+    task_id: uuid.UUID,
+) -> int:
+    """
+    Walks a channel or playlist down to the high-water marks of its previous sync, newest first,
+    and stores the new entries that are not archived yet for the owner and task.
+    """
+    marks = dict(listing.sync_marks)
+    await DownloadArchiveInteractor.ensure_loaded()
+    entries = await asyncio.to_thread(
+        lambda: list(downloader.iter_entries(skip_archived=True, marks=marks, since_timestamp=listing.last_timestamp))
+    )
+    created = await YTListingInteractor.add_entries(entries, owner_id, task_id)
+    await YTListingInteractor.set_high_water(listing, marks, entries)
+    return created
+
+
+@celery.task
+async def dispatch_subscriptions() -> int:
+    """
+    Enqueues the polls of the subscriptions that are due, run by beat every
+    ``settings.subscription_dispatch_interval`` seconds. Every subscription polls at its own offset
+    in its interval, so the polls are spread out instead of hitting the upstream host at once.
+
+    Returns:
+        int: The number of enqueued polls.
+    """
+    subscriptions = await SubscriptionInteractor.claim_due()
+    for subscription in subscriptions:
+        sync_subscription.delay(subscription.id)
+    return len(subscriptions)
+
+
+@celery.task
+async def sync_subscription(subscription_id: uuid.UUID) -> int:
+    """
+    Polls a subscription: a channel or playlist stored before is synced incrementally from the
+    listing extracted for the lookup, anything else is parsed through the subscription's task.
+
+    The stored listing is found by the id its URL resolves to, not by the subscription's task; the
+    listing may have been parsed through another task, e.g. another user's. The new videos are
+    stored for the subscription's owner and task either way.
+
+    Returns:
+        int: The number of new videos, 0 for a parse.
+    """
+    subscription = await SubscriptionSelector.get_by_id(subscription_id)
+    with MediaDownloader(subscription.url, MEDIA_FOLDER) as downloader:
+        if downloader.model is not YTVideoModel:
+            root = await asyncio.to_thread(downloader.extract_listing)
+            if listing := await downloader.model.get_or_none(ext_id=root.id):
+                return await _sync_listing(listing, downloader, subscription.owner_id, subscription.task_id)
+    parse_url.delay(subscription.task_id)
+    return 0
@@ -0,0 +1,148 @@
+import json
+import logging
+import math
+import time
+from datetime import UTC, datetime
+
+import redis
+from celery.worker.autoscale import Autoscaler
+from core.config import settings
+from core.redis_utils import redis_client
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class QueueStats(BaseModel):
+    queue: str
+    depth: int = 0
+    oldest_age: float | None = None  # seconds the oldest waiting task has been queued
+
+
+class ScalingDecision(BaseModel):
+    worker: str
+    queues: list[QueueStats]
+    busy: int
+    processes: int
+    target: int
+    reason: str
+    at: datetime
+
+
+def stamp_enqueued_at(headers: dict | None = None, **_) -> None:
+    """
+    Stamps every published task with the time it was enqueued, so its age in the queue can be measured.
+    Connected to ``before_task_publish`` with the app, so tasks published by any process are stamped.
+    """
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+class QueueMonitor:
+    """
+    Reads the depth and the age of the oldest task of queues from the Redis broker.
+
+    The Redis transport keeps a queue in a list of the same name, new messages are pushed to the head,
+    so the oldest waiting message is the tail.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self._client = client
+
+    def stats(self, queue: str, now: float | None = None) -> QueueStats:
+        pipe = self._client.pipeline()
+        pipe.llen(queue)
+        pipe.lindex(queue, -1)
+        depth, oldest = pipe.execute()
+        return QueueStats(queue=queue, depth=depth, oldest_age=self._age(oldest, now or time.time()))
+
+    @staticmethod
+    def _age(message: bytes | str | None, now: float) -> float | None:
+        if not message:
+            return None
+        try:
+            enqueued_at = json.loads(message)["headers"].get("enqueued_at")
+        except (ValueError, KeyError, TypeError):
+            return None
+        return max(0.0, now - enqueued_at) if enqueued_at else None
+
+
+def target_processes(stats: list[QueueStats], busy: int, minimum: int, maximum: int) -> tuple[int, str]:
+    """
+    Returns the pool size a worker should have for its backlog, within ``minimum`` and ``maximum``.
+
+    The busy processes are kept and one process is added per ``settings.autoscale_tasks_per_process``
+    waiting tasks. A task waiting longer than ``settings.autoscale_max_task_age`` scales to the maximum.
+
+    Returns:
+        tuple[int, str]: The pool size and the reason for it.
+    """
+    backlog = sum(queue.depth for queue in stats)
+    oldest = max((queue.oldest_age for queue in stats if queue.oldest_age is not None), default=None)
+    if oldest is not None and oldest > settings.autoscale_max_task_age:
+        target, reason = maximum, f"oldest task waits {oldest:.0f}s"
+    elif backlog:
+        target, reason = busy + math.ceil(backlog / settings.autoscale_tasks_per_process), f"{backlog} tasks waiting"
+    else:
+        target, reason = busy, "no backlog"
+    return max(minimum, min(maximum, target)), reason
+
+
+class QueueAutoscaler(Autoscaler):
+    """
+    Celery autoscaler driven by the broker backlog of the queues the worker consumes.
+
+    The stock autoscaler only counts the tasks the worker has reserved, which is at most the prefetch
+    limit, so a deep queue never scales it up. This one grows the pool with the depth and the age of
+    the waiting tasks and shrinks it back, after the keepalive, once the backlog is drained. Every
+    decision is recorded in Redis for ``autoscale_decisions``.
+
+    Enable with ``worker_autoscaler``, workers started by ``worker_argv`` are bound by the
+    ``min_concurrency`` and ``concurrency`` of their queue in ``settings.celery_queues``.
+    """
+
+    KEY = "autoscale:decisions"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        app = self.worker.app
+        self._monitor = QueueMonitor(redis.Redis.from_url(app.conf.broker_url))
+        self._queues = list(app.amqp.queues.consume_from or app.amqp.queues)
+        self._hostname = self.worker.hostname
+        self._checked_at = 0.0
+        self._target = self.min_concurrency
+
+    @property
+    def qty(self) -> int:
+        if time.monotonic() - self._checked_at >= settings.autoscale_interval:
+            self._checked_at = time.monotonic()
+            try:
+                self._target = self._decide()
+            except redis.RedisError as e:
+                logger.warning("Autoscaler could not read the broker: %s", e)
+        return self._target
+
+    def _decide(self) -> int:
+        busy = super().qty
+        stats = [self._monitor.stats(queue) for queue in self._queues]
+        target, reason = target_processes(stats, busy, self.min_concurrency, self.max_concurrency)
+        if target != self.processes:
+            logger.info("Autoscaling %s from %s to %s processes: %s", self._hostname, self.processes, target, reason)
+        decision = ScalingDecision(
+            worker=self._hostname,
+            queues=stats,
+            busy=busy,
+            processes=self.processes,
+            target=target,
+            reason=reason,
+            at=datetime.now(UTC),
+        )
+        redis_client.hset(self.KEY, self._hostname, decision.model_dump_json())
+        return target
+
+
+def autoscale_decisions() -> list[ScalingDecision]:
+    """
+    Returns the latest scaling decision of every autoscaled worker.
+    """
+    return [ScalingDecision.model_validate_json(value) for value in redis_client.hvals(QueueAutoscaler.KEY)]
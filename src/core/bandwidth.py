@@ -0,0 +1,153 @@
+import logging
+import time
+from datetime import datetime
+from datetime import time as dt_time
+from threading import Lock
+from zoneinfo import ZoneInfo
+
+import redis
+from core.config import settings
+from core.redis_utils import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket by the time elapsed since the last call and takes the requested tokens, even into
+# debt. Returns how long the caller must wait for the debt to be paid, as a string: Lua numbers are
+# truncated to integers on return. The clock is Redis' own, so workers on different hosts agree on it.
+_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated_at = tonumber(redis.call('HGET', KEYS[1], 'updated_at'))
+if tokens == nil or updated_at == nil then
+    tokens = capacity
+    updated_at = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate) - requested
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class LocalTokenBucket:
+    """
+    In-process token bucket, the fallback of the limiter while Redis is unreachable.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._tokens: float | None = None
+        self._updated_at = 0.0
+
+    def consume(self, amount: int, rate: float, capacity: float) -> float:
+        """
+        Takes ``amount`` tokens, going into debt if the bucket holds fewer.
+
+        Returns:
+            float: Seconds to wait until the debt is paid, 0 if the tokens were available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._tokens is None:
+                self._tokens = capacity
+            else:
+                self._tokens = min(capacity, self._tokens + (now - self._updated_at) * rate)
+            self._updated_at = now
+            self._tokens -= amount
+            return -self._tokens / rate if self._tokens < 0 else 0.0
+
+
+class BandwidthLimiter:
+    """
+    Token-bucket bandwidth limiter shared by every worker through one Redis key.
+
+    The rate follows a time-of-day schedule, so downloads can run at full speed at night and leave
+    room for streaming in the evening. While Redis is unreachable every process falls back to a
+    local bucket with the same rate and retries Redis after ``REDIS_RETRY_AFTER`` seconds.
+    """
+
+    KEY = "media:bandwidth"
+    REDIS_RETRY_AFTER = 30.0
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_client,
+        limit: int | None = None,
+        schedule: dict[str, int] | None = None,
+        burst: float | None = None,
+    ):
+        """
+        Args:
+            client (redis.Redis): Redis client holding the shared bucket.
+            limit (int, optional): Bytes per second without a schedule, 0 for no limit.
+                Defaults to ``settings.bandwidth_limit``.
+            schedule (dict[str, int], optional): Bytes per second by the "HH:MM" time of day they start
+                at, in ``settings.default_tz``. Defaults to ``settings.bandwidth_schedule``.
+            burst (float, optional): Seconds of traffic at the current rate the bucket can hold.
+                Defaults to ``settings.bandwidth_burst``.
+        """
+        self._limit = limit if limit is not None else settings.bandwidth_limit
+        schedule = schedule if schedule is not None else settings.bandwidth_schedule
+        self._schedule = sorted((dt_time.fromisoformat(start), rate) for start, rate in schedule.items())
+        self._burst = burst if burst is not None else settings.bandwidth_burst
+        self._tz = ZoneInfo(settings.default_tz)
+        self._script = client.register_script(_BUCKET_SCRIPT)
+        self._local = LocalTokenBucket()
+        self._redis_down_until = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._limit) or any(rate for _, rate in self._schedule)
+
+    def current_rate(self, now: datetime | None = None) -> int:
+        """
+        Returns the rate in bytes per second in effect at ``now``, 0 for no limit.
+
+        A schedule entry applies from its start until the next one; before the first entry of the day
+        the last entry of the previous day is still in effect.
+        """
+        if not self._schedule:
+            return self._limit
+        moment = (now or datetime.now(self._tz)).time()
+        rate = self._schedule[-1][1]
+        for start, scheduled_rate in self._schedule:
+            if start > moment:
+                break
+            rate = scheduled_rate
+        return rate
+
+    def consume(self, amount: int) -> float:
+        """
+        Takes ``amount`` bytes from the bucket.
+
+        Returns:
+            float: Seconds the caller must wait before transferring more.
+        """
+        rate = self.current_rate()
+        if not rate or amount <= 0:
+            return 0.0
+        capacity = rate * self._burst
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                return float(self._script(keys=[self.KEY], args=[rate, capacity, amount]))
+            except redis.RedisError as e:
+                self._redis_down_until = time.monotonic() + self.REDIS_RETRY_AFTER
+                logger.warning("Bandwidth limiter falls back to a local bucket: %s", e)
+        return self._local.consume(amount, rate, capacity)
+
+    def throttle(self, amount: int) -> None:
+        """
+        Takes ``amount`` bytes from the bucket and blocks until the transfer fits into the rate.
+        """
+        if wait := self.consume(amount):
+            time.sleep(wait)
+
+
+bandwidth_limiter = BandwidthLimiter()
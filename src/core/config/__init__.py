@@ -1,6 +1,6 @@
 __all__ = ["settings"]
 
-from typing import Any
+from typing import Any, Literal
 
 import decouple
 from pydantic import BaseModel, Field, PostgresDsn, RedisDsn, computed_field
@@ -14,6 +14,62 @@ class DatabaseConfig(BaseModel):
     autoflush: bool = False
 
 
+class DownloadProfile(BaseModel):
+    """
+    Named set of yt-dlp download-tuning options, selectable per task.
+    """
+
+    format: str = "m4a/bestaudio/best"
+    concurrent_fragment_downloads: int = 1  # parallel connections for DASH/HLS fragments
+    http_chunk_size: int | None = None  # bytes per range request, None downloads in one request
+    buffersize: int = 1024  # initial read buffer in bytes, resized while downloading
+    retries: float = 10  # float("inf") retries forever
+    fragment_retries: float = 10
+    skip_unavailable_fragments: bool = True
+    socket_timeout: float = 20.0
+
+    def to_options(self) -> dict[str, Any]:
+        options = self.model_dump(exclude_none=True)
+        options["retries"] = _retries(self.retries)
+        options["fragment_retries"] = _retries(self.fragment_retries)
+        return options
+
+
+def _retries(value: float) -> int | float:
+    return value if value == float("inf") else int(value)
+
+
+class CeleryQueueConfig(BaseModel):
+    concurrency: int  # worker processes, the maximum of an autoscaled worker
+    min_concurrency: int | None = None  # autoscales the worker between this and concurrency, None = fixed pool
+    prefetch_multiplier: int = 1  # tasks reserved per worker process
+
+
+DEFAULT_DOWNLOAD_PROFILES = {
+    "default": DownloadProfile(),
+    "fast-lan": DownloadProfile(
+        concurrent_fragment_downloads=8,
+        http_chunk_size=10 * 1024 * 1024,
+        buffersize=1024 * 1024,
+    ),
+    "metered": DownloadProfile(
+        format="bestaudio[abr<=128]/bestaudio/best",
+        http_chunk_size=1024 * 1024,
+        retries=3,
+        fragment_retries=3,
+    ),
+    "archive": DownloadProfile(
+        format="bestvideo*+bestaudio/best",
+        concurrent_fragment_downloads=4,
+        http_chunk_size=10 * 1024 * 1024,
+        retries=float("inf"),
+        fragment_retries=float("inf"),
+        skip_unavailable_fragments=False,
+        socket_timeout=60.0,
+    ),
+}
+
+
 class AppSettings(BaseSettings):
     model_config = SettingsConfigDict(
         env_prefix="APP_",
@@ -58,11 +114,83 @@ class AppSettings(BaseSettings):
 
     id_account_verification: bool = False
     email_reset_token_expire_hours: int = 24
+    # "local" runs tasks in the web process, without a broker or workers. Redis is still required, for
+    # task control, progress, checkpoints, the fair share queue, bandwidth limits, singleflight locks and caches.
+    task_backend: Literal["celery", "local"] = "celery"
+    local_runner_workers: int = 2  # jobs run at once by the in-process runner
+    local_runner_threads: int = 4  # threads of its blocking calls, e.g. yt-dlp
     celery_broker_url: str = "redis"
     celery_result_backend: str = "redis"
+    # Seconds before the Redis broker delivers an unacknowledged task again. Late-acknowledged downloads
+    # stay unacknowledged while they run, so this must exceed the longest download.
+    celery_visibility_timeout: int = 24 * 60 * 60
+    celery_queues: dict[str, CeleryQueueConfig] = {
+        "metadata": CeleryQueueConfig(concurrency=16, min_concurrency=2, prefetch_multiplier=4),
+        "download": CeleryQueueConfig(concurrency=4, prefetch_multiplier=1),
+        "post-process": CeleryQueueConfig(concurrency=2, prefetch_multiplier=1),
+    }
 
     default_tz: str = "UTC"
 
+    worker_db_pool_min: int = 1
+    worker_db_pool_max: int = 5
+
+    autoscale_interval: float = 5.0  # seconds between reads of the broker backlog
+    autoscale_tasks_per_process: int = 2  # waiting tasks that justify one more process
+    autoscale_max_task_age: float = 60.0  # seconds a task may wait before the pool scales to its maximum
+
+    download_profiles: dict[str, DownloadProfile] = DEFAULT_DOWNLOAD_PROFILES
+    download_default_profile: str = "default"
+    # Downloads running at once across the workers, None = the concurrency of the download queue
+    fair_share_capacity: int | None = None
+    fair_share_max_per_user: int = 3  # 0 = no cap, below the capacity leaves a slot for other users
+    fair_share_weights: dict[str, float] = {}  # owner id -> share weight, >= 1, defaults to 1
+    fair_share_caps: dict[str, int] = {}  # owner id -> cap, overrides fair_share_max_per_user
+    fair_share_max_per_host: int = 4  # downloads running against one host, 0 = no cap
+    fair_share_running_ttl: int = 6 * 60 * 60  # seconds a slot is held if its worker never releases it
+    fair_share_dispatch_interval: float = 10.0  # seconds between dispatches of queued downloads by beat
+    fair_share_throughput_window: int = 60  # seconds the reported aggregate throughput is averaged over
+    ytdl_pool_max_idle: int = 4
+    download_checkpoint_interval: float = 5.0  # seconds
+    download_checkpoint_ttl: int = 7 * 24 * 60 * 60  # 7 days
+    progress_max_rate: float = 2.0  # updates per second per download
+    progress_log_interval: float = 10.0  # seconds
+    progress_channel: str = "media:progress"
+    task_control_ttl: int = 7 * 24 * 60 * 60  # 7 days
+    task_control_check_interval: float = 1.0  # seconds between checks for cancel/pause of a download
+
+    singleflight_lock_ttl: int = 5 * 60  # seconds a leader may run before others take over
+    singleflight_result_ttl: int = 60  # seconds the result is reused by later callers
+    singleflight_wait_timeout: float = 10 * 60
+
+    task_chunk_size: int = 100  # listings with more entries are parsed in chunks of this many entries
+    task_chunk_max_retries: int = 3
+    task_chunk_retry_delay: int = 30  # seconds, doubled on every retry
+
+    subscription_default_interval: int = 60 * 60  # seconds between polls of a subscription
+    subscription_min_interval: int = 10 * 60
+    subscription_jitter: float = 0.05  # fraction of the interval a poll is moved by at most
+    subscription_dispatch_interval: float = 60.0  # seconds between checks for due subscriptions
+
+    info_cache_enabled: bool = True
+    info_cache_ttl: int = 6 * 60 * 60  # 6 hours
+    store_raw_info: bool = False
+
+    post_process_thumbnail: bool = True
+    post_process_remux: str | None = None  # container to remux downloads into, e.g. "mp4"
+    ffmpeg_path: str = "ffmpeg"
+    ffprobe_path: str = "ffprobe"
+
+    disk_min_free: int = 1024 * 1024 * 1024  # bytes always left free on the media disk
+    disk_budget: int = 0  # bytes downloads may reserve at once, 0 for the free space only
+    disk_default_estimate: int = 512 * 1024 * 1024  # reserved for videos without a known size
+    disk_reservation_ttl: int = 6 * 60 * 60  # 6 hours
+    disk_retry_delay: int = 60  # seconds before a download waiting for disk space is retried
+
+    bandwidth_limit: int = 0  # bytes per second across all workers, 0 disables the limit
+    bandwidth_schedule: dict[str, int] = {}  # "HH:MM" -> bytes per second from that time of day
+    bandwidth_burst: float = 2.0  # seconds of traffic the shared bucket can hold
+
     def init_settings(self) -> dict[str, Any]:
         return {
             "title": self.title,
@@ -0,0 +1,272 @@
+import json
+import logging
+import time
+
+import redis
+from core.config import settings
+from core.redis_utils import redis_client
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Queues a task at the tail of its owner's queue, once, records its host and adds the owner to the ring.
+_SUBMIT_SCRIPT = """
+redis.call('LREM', KEYS[2], 0, ARGV[2])
+redis.call('LPUSH', KEYS[2], ARGV[2])
+redis.call('HSET', KEYS[3], ARGV[2], ARGV[3])
+if not redis.call('LPOS', KEYS[1], ARGV[1]) then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+"""
+
+# Deficit round robin over the ring of owners with queued tasks, every task costs 1.
+# Visiting an owner adds its weight to its deficit, the owner then starts one task per whole unit of
+# deficit while slots are free, it is below its cap and the host of its next task is below the host
+# cap. Runs until the slots are taken or a full round of the ring starts nothing. Returns the started
+# task ids.
+_DISPATCH_SCRIPT = """
+local ring, deficits, running, running_owners, hosts = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local default_cap = tonumber(ARGV[3])
+local weights = cjson.decode(ARGV[5])
+local caps = cjson.decode(ARGV[6])
+local queue_prefix = ARGV[7]
+local max_per_host = tonumber(ARGV[8])
+
+for _, task in ipairs(redis.call('ZRANGEBYSCORE', running, '-inf', ARGV[4])) do
+    redis.call('ZREM', running, task)
+    redis.call('HDEL', running_owners, task)
+    redis.call('HDEL', hosts, task)
+end
+
+local counts, host_counts, total = {}, {}, 0
+local entries = redis.call('HGETALL', running_owners)
+for i = 1, #entries, 2 do
+    local host = redis.call('HGET', hosts, entries[i]) or ''
+    counts[entries[i + 1]] = (counts[entries[i + 1]] or 0) + 1
+    host_counts[host] = (host_counts[host] or 0) + 1
+    total = total + 1
+end
+
+local function host_of(task)
+    return redis.call('HGET', hosts, task) or ''
+end
+
+-- Whether the owner may start its next task, the oldest one at the tail of its queue.
+local function below_cap(owner, queue)
+    local cap = caps[owner] or default_cap
+    if cap ~= 0 and (counts[owner] or 0) >= cap then
+        return false
+    end
+    local task = redis.call('LINDEX', queue, -1)
+    return max_per_host == 0 or not task or (host_counts[host_of(task)] or 0) < max_per_host
+end
+
+local started, idle = {}, 0
+while total < capacity do
+    local size = redis.call('LLEN', ring)
+    if size == 0 or idle >= size then
+        break
+    end
+    local owner = redis.call('LPOP', ring)
+    local queue = queue_prefix .. owner
+    local sent = 0
+    if below_cap(owner, queue) then
+        local deficit = tonumber(redis.call('HGET', deficits, owner) or '0') + math.max(1, weights[owner] or 1)
+        while deficit >= 1 and total < capacity and below_cap(owner, queue) do
+            local task = redis.call('RPOP', queue)
+            if not task then
+                break
+            end
+            local host = host_of(task)
+            redis.call('ZADD', running, now, task)
+            redis.call('HSET', running_owners, task, owner)
+            counts[owner] = (counts[owner] or 0) + 1
+            host_counts[host] = (host_counts[host] or 0) + 1
+            total = total + 1
+            deficit = deficit - 1
+            sent = sent + 1
+            table.insert(started, task)
+        end
+        redis.call('HSET', deficits, owner, tostring(deficit))
+    end
+    if redis.call('LLEN', queue) > 0 then
+        redis.call('RPUSH', ring, owner)
+    else
+        redis.call('HDEL', deficits, owner)
+    end
+    if sent > 0 then
+        idle = 0
+    else
+        idle = idle + 1
+    end
+end
+return started
+"""
+
+
+class OwnerShare(BaseModel):
+    owner_id: str
+    queued: int
+    running: int
+    weight: float
+    cap: int
+
+
+class HostShare(BaseModel):
+    host: str
+    running: int
+    cap: int
+
+
+class FairShareStatus(BaseModel):
+    capacity: int
+    running: int
+    throughput: float  # bytes per second of all running downloads over the throughput window
+    owners: list[OwnerShare]
+    hosts: list[HostShare]
+
+
+class FairShareScheduler:
+    """
+    Weighted fair queue of downloads, keyed by the task owner.
+
+    Every owner has a FIFO of tasks, owners take turns in deficit round robin order, so a user
+    queuing a whole channel gets slots in turn with the others instead of ahead of them. At most
+    ``settings.fair_share_capacity`` downloads run at once, by default the concurrency of the download
+    queue, and ``settings.fair_share_max_per_user`` per owner; a cap below the capacity keeps a slot free for other users' requests to start right away.
+    Weights and caps of single owners are overridden by ``fair_share_weights``/``fair_share_caps``.
+    At most ``settings.fair_share_max_per_host`` downloads run against one host, an owner whose next
+    task waits for its host gives its turn to the others.
+
+    Downloads are handed to the broker only when they get a slot, so the broker queue never holds
+    more than the workers can take. A slot is held until ``release``, or expires after
+    ``settings.fair_share_running_ttl`` if its worker died.
+
+    Running downloads ``record`` the bytes they transfer in per-second counters, the status reports
+    their aggregate throughput over the last ``settings.fair_share_throughput_window`` seconds.
+    """
+
+    RING_KEY = "fairshare:ring"
+    DEFICITS_KEY = "fairshare:deficits"
+    RUNNING_KEY = "fairshare:running"
+    RUNNING_OWNERS_KEY = "fairshare:running-owners"
+    QUEUE_PREFIX = "fairshare:queue:"
+    HOSTS_KEY = "fairshare:hosts"
+    TRANSFERRED_PREFIX = "fairshare:transferred:"
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self._client = client
+        self._submit = client.register_script(_SUBMIT_SCRIPT)
+        self._dispatch = client.register_script(_DISPATCH_SCRIPT)
+
+    @property
+    def capacity(self) -> int:
+        return settings.fair_share_capacity or settings.celery_queues["download"].concurrency
+
+    def submit(self, owner_id: str, task_id: str, host: str = "") -> None:
+        """
+        Queues a task of the owner downloading from the host. A task queued already keeps a single
+        entry, at the tail.
+        """
+        self._submit(
+            keys=[self.RING_KEY, self.QUEUE_PREFIX + owner_id, self.HOSTS_KEY],
+            args=[owner_id, task_id, host],
+        )
+
+    def withdraw(self, owner_id: str, task_id: str) -> None:
+        """
+        Drops a task from its owner's queue, e.g. when it is cancelled before it started. Best effort:
+        a task left queued while Redis is unavailable sees its cancel or pause command when it starts.
+        """
+        try:
+            pipe = self._client.pipeline()
+            pipe.lrem(self.QUEUE_PREFIX + owner_id, 0, task_id)
+            pipe.hdel(self.HOSTS_KEY, task_id)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not withdraw task %s from the fair share queue: %s", task_id, e)
+
+    def dispatch(self) -> list[str]:
+        """
+        Takes the free slots for queued tasks, in fair order.
+
+        Returns:
+            list[str]: The ids of the tasks to start now.
+        """
+        now = time.time()
+        started = self._dispatch(
+            keys=[self.RING_KEY, self.DEFICITS_KEY, self.RUNNING_KEY, self.RUNNING_OWNERS_KEY, self.HOSTS_KEY],
+            args=[
+                now,
+                self.capacity,
+                settings.fair_share_max_per_user,
+                now - settings.fair_share_running_ttl,
+                json.dumps(settings.fair_share_weights),
+                json.dumps(settings.fair_share_caps),
+                self.QUEUE_PREFIX,
+                settings.fair_share_max_per_host,
+            ],
+        )
+        if started:
+            logger.debug("Dispatching downloads %s", started)
+        return list(started)
+
+    def release(self, task_id: str) -> None:
+        """
+        Frees the slot of a finished task.
+        """
+        pipe = self._client.pipeline()
+        pipe.zrem(self.RUNNING_KEY, task_id)
+        pipe.hdel(self.RUNNING_OWNERS_KEY, task_id)
+        pipe.hdel(self.HOSTS_KEY, task_id)
+        pipe.execute()
+
+    def record(self, amount: int, now: float | None = None) -> None:
+        """
+        Adds bytes transferred by a running download to the counter of the current second.
+        """
+        key = self.TRANSFERRED_PREFIX + str(int(now or time.time()))
+        pipe = self._client.pipeline()
+        pipe.incrby(key, amount)
+        pipe.expire(key, settings.fair_share_throughput_window + 1)
+        pipe.execute()
+
+    def throughput(self, now: float | None = None) -> float:
+        """
+        Returns the bytes per second transferred by all downloads over the last
+        ``settings.fair_share_throughput_window`` whole seconds.
+        """
+        window = settings.fair_share_throughput_window
+        second = int(now or time.time())
+        keys = [self.TRANSFERRED_PREFIX + str(second - offset) for offset in range(1, window + 1)]
+        return sum(int(value) for value in self._client.mget(keys) if value) / window
+
+    def status(self) -> FairShareStatus:
+        running = self._client.hgetall(self.RUNNING_OWNERS_KEY)
+        running_owners = list(running.values())
+        running_hosts = [host or "" for host in self._client.hmget(self.HOSTS_KEY, list(running))] if running else []
+        owners = set(self._client.lrange(self.RING_KEY, 0, -1)) | set(running_owners)
+        return FairShareStatus(
+            capacity=self.capacity,
+            running=len(running_owners),
+            throughput=self.throughput(),
+            owners=[
+                OwnerShare(
+                    owner_id=owner,
+                    queued=self._client.llen(self.QUEUE_PREFIX + owner),
+                    running=running_owners.count(owner),
+                    weight=max(1.0, settings.fair_share_weights.get(owner, 1.0)),
+                    cap=settings.fair_share_caps.get(owner, settings.fair_share_max_per_user),
+                )
+                for owner in sorted(owners)
+            ],
+            hosts=[
+                HostShare(host=host, running=running_hosts.count(host), cap=settings.fair_share_max_per_host)
+                for host in sorted(set(running_hosts))
+            ],
+        )
+
+
+fair_scheduler = FairShareScheduler()
@@ -31,6 +31,7 @@ class App(FastAPI):
         # if self.__settings.init_logger:
         #     self.init_logger()
         self.connect_db()
+        self.register_task_runner()
         self.register_routers()
         self.register_exceptions()
         self.register_middlewares()
@@ -57,6 +58,21 @@ class App(FastAPI):
         root_router.get("/sse_dashboard")(dashboard_streams)
         return root_router
 
+    def register_task_runner(self):
+        """
+        Runs the Celery tasks in this process when ``task_backend`` is "local", no broker or workers needed.
+        """
+        if self.__settings.task_backend != "local":
+            return
+        from celery_app import celery
+        from core.task_runner import local_runner
+
+        async def start_task_runner():
+            await local_runner.start(celery)
+
+        self.add_event_handler("startup", start_task_runner)
+        self.add_event_handler("shutdown", local_runner.stop)
+
     def register_exceptions(self):
         self.add_exception_handler(APIException, on_api_exception)  # noqa: type
         self.add_exception_handler(RequestValidationError, validation_exception_handler)  # noqa: type
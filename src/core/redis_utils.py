@@ -1,9 +1,12 @@
 import asyncio
 
 import redis
+import redis.asyncio
 from core.config import settings
 
 redis_client = redis.StrictRedis.from_url(str(settings.radis_uri), decode_responses=True)
+redis_binary_client = redis.StrictRedis.from_url(str(settings.radis_uri))
+async_redis_client = redis.asyncio.StrictRedis.from_url(str(settings.radis_uri), decode_responses=True)
 
 
 async def acquire_lock(lock_key: str, timeout: int) -> bool:
@@ -0,0 +1,124 @@
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import redis.asyncio
+from core.config import settings
+from core.redis_utils import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+_LOCK_PREFIX = "singleflight:lock:"
+_RESULT_PREFIX = "singleflight:result:"
+_CHANNEL_PREFIX = "singleflight:done:"
+
+# Deletes the lock only while it holds the caller's token, a lock that expired and was taken by
+# another worker is left alone.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extends the lock only while it holds the caller's token.
+_EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleflightTimeoutError(Exception):
+    pass
+
+
+async def singleflight(
+    key: str,
+    func: Callable[[], Awaitable[Any]],
+    client: redis.asyncio.Redis = async_redis_client,
+) -> Any:
+    """
+    Runs ``func`` once across all workers for concurrent calls with the same key.
+
+    The first caller takes the lock, runs ``func`` and stores its JSON result under a result key for
+    ``settings.singleflight_result_ttl`` seconds, then announces it on a pub/sub channel. The other
+    callers wait for the announcement and return the stored result instead of running ``func``
+    themselves. If the leader fails, the lock is released and a waiting caller takes over.
+
+    The lock holds a token of its leader, only the leader releases it, and it is extended while
+    ``func`` runs, so a flight longer than ``settings.singleflight_lock_ttl`` keeps it. The lock of a
+    leader that died expires after that TTL.
+
+    Args:
+        key (str): Identity of the work, e.g. the canonical URL.
+        func (Callable[[], Awaitable[Any]]): The work, its result must be JSON serializable.
+        client (redis.asyncio.Redis): Redis client for the result key and the channel.
+
+    Raises:
+        SingleflightTimeoutError: If no result appears within ``settings.singleflight_wait_timeout``.
+    """
+    result_key = _RESULT_PREFIX + key
+    lock_key = _LOCK_PREFIX + key
+    deadline = time.monotonic() + settings.singleflight_wait_timeout
+    while time.monotonic() < deadline:
+        if (cached := await client.get(result_key)) is not None:
+            return json.loads(cached)
+
+        token = uuid.uuid4().hex
+        if await client.set(lock_key, token, ex=settings.singleflight_lock_ttl, nx=True):
+            keepalive = asyncio.create_task(_keep_lock(client, lock_key, token))
+            try:
+                result = await func()
+                await client.set(result_key, json.dumps(result), ex=settings.singleflight_result_ttl)
+            finally:
+                keepalive.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await keepalive
+                await client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                await client.publish(_CHANNEL_PREFIX + key, "done")
+            return result
+
+        logger.debug("Waiting for the running flight of %s", key)
+        await _wait_for_flight(client, key, deadline)
+    raise SingleflightTimeoutError(f"No result for {key} within {settings.singleflight_wait_timeout}s")
+
+
+async def _keep_lock(client: redis.asyncio.Redis, lock_key: str, token: str) -> None:
+    """
+    Extends the leader's lock to the full TTL every third of it, until cancelled or the lock is lost.
+    """
+    ttl = settings.singleflight_lock_ttl
+    while True:
+        await asyncio.sleep(ttl / 3)
+        try:
+            extended = await client.eval(_EXTEND_SCRIPT, 1, lock_key, token, int(ttl * 1000))
+        except redis.RedisError as e:
+            logger.warning("Could not extend the singleflight lock %s: %s", lock_key, e)
+            continue
+        if not extended:
+            logger.warning("Singleflight lock %s was lost, another worker may run the same flight", lock_key)
+            return
+
+
+async def _wait_for_flight(client: redis.asyncio.Redis, key: str, deadline: float) -> None:
+    """
+    Waits until the leader announces the end of its flight, or its lock expires.
+    """
+    pubsub = client.pubsub()
+    await pubsub.subscribe(_CHANNEL_PREFIX + key)
+    try:
+        # The flight may have ended between the lock attempt and the subscription
+        while await client.exists(_LOCK_PREFIX + key) and time.monotonic() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is not None:
+                return
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
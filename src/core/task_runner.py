@@ -0,0 +1,188 @@
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from celery import Celery, Task
+from core.config import settings
+from pydantic_core import to_jsonable_python
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Job:
+    task: Task
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    eta: float | None = None  # epoch seconds the job may start at
+
+    @property
+    def task_id(self) -> Any:
+        """
+        The TaskModel id a persisted job belongs to, its first argument.
+        """
+        return self.args[0] if self.args else None
+
+    @property
+    def persisted(self) -> bool:
+        return bool(getattr(self.task, "persist_job", False)) and self.task_id is not None
+
+    def to_dict(self) -> dict:
+        return to_jsonable_python({"args": self.args, "kwargs": self.kwargs, "eta": self.eta})
+
+
+class LocalTaskRunner:
+    """
+    Runs Celery tasks in the web process, without a broker or worker processes, for single-node setups.
+
+    Jobs go into an asyncio queue served by a bounded number of workers on the server's event loop, and
+    the blocking yt-dlp calls the tasks hand to ``asyncio.to_thread`` run on a bounded thread pool.
+    Jobs of tasks marked ``persist_job`` are recorded on their TaskModel row while they are queued or
+    running, so they are queued again after a restart. The interval entries of the beat schedule run here too.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_threads: int | None = None):
+        """
+        Args:
+            max_workers (int, optional): Jobs run at once. Defaults to ``settings.local_runner_workers``.
+            max_threads (int, optional): Threads of blocking calls. Defaults to ``settings.local_runner_threads``.
+        """
+        self._max_workers = max(1, max_workers or settings.local_runner_workers)
+        self._max_threads = max(1, max_threads or settings.local_runner_threads)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[Job] | None = None
+        self._background: set[asyncio.Task] = set()
+        self._jobs_lock: asyncio.Lock | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self, app: Celery | None = None, recover: bool = True) -> None:
+        """
+        Starts the workers on the running loop, queues the persisted jobs again and starts the beat schedule.
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop.set_default_executor(ThreadPoolExecutor(self._max_threads, thread_name_prefix="task-runner"))
+        self._queue = asyncio.Queue()
+        self._jobs_lock = asyncio.Lock()
+        for number in range(self._max_workers):
+            self._spawn(self._work(), f"task-runner-{number}")
+        if app is not None:
+            if recover:
+                await self._recover(app)
+            for name, entry in (app.conf.beat_schedule or {}).items():
+                self._start_periodic(app, name, entry)
+        logger.info("Task runner started with %s workers and %s threads", self._max_workers, self._max_threads)
+
+    async def stop(self) -> None:
+        """
+        Cancels the workers. Persisted jobs that did not finish stay recorded and run after the next start.
+        """
+        if not self.running:
+            return
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        self._loop = None
+
+    def submit(self, task: Task, args: tuple = (), kwargs: dict | None = None, countdown: float | None = None) -> None:
+        """
+        Queues a job, from the loop or from any other thread. Mirrors ``Task.apply_async``.
+        """
+        if not self.running:
+            raise RuntimeError("The task runner is not started")
+        job = Job(task, tuple(args), kwargs or {}, time.time() + countdown if countdown else None)
+        coroutine = self._enqueue(job)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._spawn(coroutine, f"enqueue-{task.name}")
+        else:
+            asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def join(self) -> None:
+        """
+        Waits until every queued job is done.
+        """
+        await self._queue.join()
+
+    def _spawn(self, coroutine, name: str) -> None:
+        task = self._loop.create_task(coroutine, name=name)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _enqueue(self, job: Job) -> None:
+        if job.persisted:
+            await self._record(job, job.to_dict())
+        delay = job.eta - time.time() if job.eta else 0
+        if delay > 0:
+            self._loop.call_later(delay, self._queue.put_nowait, job)
+        else:
+            self._queue.put_nowait(job)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                result = job.task.run(*job.args, **job.kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job %s%s failed", job.task.name, job.args)
+            finally:
+                self._queue.task_done()
+            if job.persisted:
+                await self._record(job, None)
+
+    async def _record(self, job: Job, value: dict | None) -> None:
+        from applications.tasks.service import TaskInteractor
+
+        async with self._jobs_lock:
+            try:
+                await TaskInteractor.set_job(job.task_id, job.task.name, value, done=None if value else job.to_dict())
+            except Exception:
+                logger.exception("Could not record job %s of task %s", job.task.name, job.task_id)
+
+    async def _recover(self, app: Celery) -> None:
+        from applications.tasks.service import TaskSelector
+
+        recovered = 0
+        for jobs in (await TaskSelector.get_queued_jobs()).values():
+            for name, job in jobs.items():
+                task = app.tasks.get(name)
+                if task is None:
+                    logger.warning("Dropping a persisted job of unknown task %s", name)
+                    continue
+                await self._enqueue(Job(task, tuple(job.get("args", ())), job.get("kwargs", {}), job.get("eta")))
+                recovered += 1
+        if recovered:
+            logger.info("Task runner queued %s persisted jobs again", recovered)
+
+    def _start_periodic(self, app: Celery, name: str, entry: dict) -> None:
+        schedule = entry["schedule"]
+        interval = schedule.total_seconds() if isinstance(schedule, timedelta) else schedule
+        if not isinstance(interval, int | float):
+            logger.warning("Beat entry %s has no fixed interval, it does not run in the task runner", name)
+            return
+
+        async def periodic() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                self.submit(app.tasks[entry["task"]], tuple(entry.get("args", ())), entry.get("kwargs"))
+
+        self._spawn(periodic(), f"beat-{name}")
+
+
+local_runner = LocalTaskRunner()
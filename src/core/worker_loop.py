@@ -0,0 +1,124 @@
+import asyncio
+import inspect
+import logging
+import os
+from collections.abc import Coroutine
+from threading import Lock, Thread
+from typing import Any, TypeVar
+
+from celery import Task
+from celery.signals import worker_process_init, worker_process_shutdown
+from core.config import settings
+from core.task_runner import local_runner
+from tortoise import Model, Tortoise
+from tortoise.backends.base.config_generator import expand_db_url
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def tortoise_config() -> dict:
+    """
+    Returns the Tortoise config of a worker process, with a bounded connection pool.
+    """
+    from contants import APP_FOLDER
+    from tools.class_finder import ClassFinder
+
+    connection = expand_db_url(str(settings.db_uri))
+    connection["credentials"].update(minsize=settings.worker_db_pool_min, maxsize=settings.worker_db_pool_max)
+    return {
+        "connections": {"default": connection},
+        "apps": {
+            "models": {
+                "models": ClassFinder(APP_FOLDER, Model).build_tortoise_imports(),
+                "default_connection": "default",
+            }
+        },
+        "use_tz": True,
+        "timezone": settings.default_tz,
+    }
+
+
+class WorkerLoop:
+    """
+    One event loop per worker process, running in a background thread for the lifetime of the process.
+
+    Tortoise and its connection pool are initialised on this loop once, so coroutine tasks share the
+    warm connections instead of building a loop and connecting to the DB for every task. Tasks of any
+    worker thread are submitted to the loop, so the prefork, threads and solo pools work alike.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pid: int | None = None
+        self._lock = Lock()
+
+    def start(self) -> None:
+        """
+        Starts the loop and initialises Tortoise on it, once per process.
+        """
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            # A loop inherited through fork has no thread running it, the child starts its own
+            self._loop = asyncio.new_event_loop()
+            self._pid = os.getpid()
+            Thread(target=self._loop.run_forever, name="worker-loop", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(Tortoise.init(config=tortoise_config()), self._loop).result()
+            logger.info("Worker loop started in process %s", self._pid)
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Runs the coroutine on the loop and blocks the calling thread until it returns.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            asyncio.run_coroutine_threadsafe(Tortoise.close_connections(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+worker_loop = WorkerLoop()
+
+
+class AsyncTask(Task):
+    """
+    Celery task class that runs ``async def`` tasks to completion on the worker loop.
+    """
+
+    persist_job = False  # the in-process runner records queued jobs of the task on its TaskModel
+
+    def __call__(self, *args, **kwargs):
+        result = super().__call__(*args, **kwargs)
+        if inspect.iscoroutine(result):
+            return worker_loop.run(result)
+        return result
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        """
+        Sends the task to the broker, or queues it in the in-process runner when ``settings.task_backend``
+        is "local"; that mode returns None instead of an AsyncResult.
+        """
+        if settings.task_backend == "local":
+            return local_runner.submit(self, args or (), kwargs, options.get("countdown"))
+        return super().apply_async(args, kwargs, **options)
+
+
+@worker_process_init.connect
+def start_worker_loop(**_) -> None:
+    from applications.youtube.service import DownloadArchiveInteractor
+
+    worker_loop.start()
+    # Parses and syncs skip archived entries, so the index is there before the first task runs
+    worker_loop.run(DownloadArchiveInteractor.ensure_loaded())
+
+
+@worker_process_shutdown.connect
+def stop_worker_loop(**_) -> None:
+    worker_loop.stop()
@@ -1,4 +1,4 @@
-__all__ = ["MediaDownloader", "YTChannelInfo", "YTPlaylistInfo", "YTVideoInfo"]
+__all__ = ["MediaDownloader", "YTChannelInfo", "YTEntryInfo", "YTPlaylistInfo", "YTVideoInfo"]
 
 from .downloader import MediaDownloader
-from .structs import YTChannelInfo, YTPlaylistInfo, YTVideoInfo
+from .structs import YTChannelInfo, YTEntryInfo, YTPlaylistInfo, YTVideoInfo
@@ -0,0 +1,141 @@
+import json
+import logging
+import shutil
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import redis
+from contants import MEDIA_FOLDER
+from core.config import settings
+from core.redis_utils import redis_client
+
+from .exceptions import InsufficientDiskSpaceError
+from .structs import DiskReservation, DiskUsageStatus, YTListingCompact, YTVideoCompact
+
+logger = logging.getLogger(__name__)
+
+# Drops expired reservations, sums the others and adds the new one if it fits into the budget.
+# Returns {admitted, reserved bytes of the other reservations}.
+_RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local budget = tonumber(ARGV[2])
+local size = tonumber(ARGV[4])
+local reserved = 0
+local entries = redis.call('HGETALL', KEYS[1])
+for i = 1, #entries, 2 do
+    if entries[i] ~= ARGV[3] then
+        local reservation = cjson.decode(entries[i + 1])
+        if reservation.expires_at < now then
+            redis.call('HDEL', KEYS[1], entries[i])
+        else
+            reserved = reserved + reservation.size
+        end
+    end
+end
+if reserved + size > budget then
+    return {0, reserved}
+end
+redis.call('HSET', KEYS[1], ARGV[3], ARGV[5])
+return {1, reserved}
+"""
+
+
+def estimate_size(info: YTVideoCompact | YTListingCompact, default: int | None = None) -> int:
+    """
+    Estimates the bytes a download takes from ``filesize``/``filesize_approx``, summed over the entries
+    of a listing. Entries without either count as ``default``.
+    """
+    default = default if default is not None else settings.disk_default_estimate
+    if isinstance(info, YTListingCompact):
+        entries = info.entries or [YTVideoCompact(id=info.id, title=info.title)]
+        return sum(estimate_size(entry, default) for entry in entries)
+    return info.filesize or info.filesize_approx or default
+
+
+class DiskAdmission:
+    """
+    Admission control of downloads against the free space of the media disk.
+
+    A download reserves its estimated size before it starts and releases it when it ends, the sum of
+    the reservations of every worker never exceeds the budget: the free space above
+    ``settings.disk_min_free``, capped by ``settings.disk_budget``. Reservations live in a Redis hash
+    shared by the workers and expire after ``settings.disk_reservation_ttl``, so a crashed worker
+    does not hold its reservation forever.
+
+    The budget is measured from the current free space, which already excludes what running
+    downloads have written, so it errs on the safe side while those downloads are in flight.
+    """
+
+    KEY = "media:disk-reservations"
+
+    def __init__(self, client: redis.Redis = redis_client, root: Path = MEDIA_FOLDER):
+        self._client = client
+        self._root = root
+        self._script = client.register_script(_RESERVE_SCRIPT)
+
+    def budget(self) -> int:
+        """
+        Returns the bytes downloads may take: the free space above the minimum, capped by the budget.
+        """
+        budget = shutil.disk_usage(self._root).free - settings.disk_min_free
+        if settings.disk_budget:
+            budget = min(budget, settings.disk_budget)
+        return max(0, budget)
+
+    def reserve(self, key: str, size: int, url: str | None = None) -> bool:
+        """
+        Reserves ``size`` bytes for a download. Reserving again under the same key replaces the reservation.
+
+        Returns:
+            bool: True if admitted, False if the budget is exhausted by other downloads for now.
+
+        Raises:
+            InsufficientDiskSpaceError: If the download does not fit even without other reservations.
+        """
+        now = time.time()
+        budget = self.budget()
+        reservation = DiskReservation(
+            key=key,
+            size=size,
+            url=url,
+            expires_at=datetime.fromtimestamp(now + settings.disk_reservation_ttl, UTC),
+        )
+        value = json.dumps({**reservation.model_dump(mode="json"), "expires_at": reservation.expires_at.timestamp()})
+        admitted, reserved = self._script(keys=[self.KEY], args=[now, budget, key, size, value])
+        if not admitted and not reserved:
+            raise InsufficientDiskSpaceError(f"Download of {size} bytes does not fit into {budget} bytes")
+        if not admitted:
+            logger.info("Download %s waits for disk space: %s reserved of %s", key, reserved, budget)
+        return bool(admitted)
+
+    def release(self, key: str) -> None:
+        self._client.hdel(self.KEY, key)
+
+    def reservations(self) -> list[DiskReservation]:
+        now = time.time()
+        reservations = []
+        for value in self._client.hvals(self.KEY):
+            data = json.loads(value)
+            if data["expires_at"] >= now:
+                reservations.append(
+                    DiskReservation.model_validate({
+                        **data,
+                        "expires_at": datetime.fromtimestamp(data["expires_at"], UTC),
+                    })
+                )
+        return reservations
+
+    def status(self) -> DiskUsageStatus:
+        usage = shutil.disk_usage(self._root)
+        reservations = self.reservations()
+        return DiskUsageStatus(
+            total=usage.total,
+            free=usage.free,
+            budget=self.budget(),
+            reserved=sum(reservation.size for reservation in reservations),
+            reservations=reservations,
+        )
+
+
+disk_admission = DiskAdmission()
@@ -0,0 +1,58 @@
+from collections.abc import Iterable, Iterator
+from threading import Lock
+
+from yt_dlp.utils import make_archive_id
+
+
+class DownloadArchive:
+    """
+    In-memory index of already downloaded items, keyed like yt-dlp archive ids ("youtube <id>").
+
+    It is loaded from the DB once per worker process and is also handed to yt-dlp as the
+    ``download_archive`` option: yt-dlp skips archived playlist entries before extracting them and
+    calls ``add`` after every finished download. Keys added in the process are kept until
+    ``drain_new`` hands them over for persistence.
+    """
+
+    def __init__(self):
+        self._keys: set[str] = set()
+        self._new: list[str] = []
+        self._lock = Lock()
+        self.loaded = False
+
+    @staticmethod
+    def make_key(extractor: str, ext_id: str) -> str:
+        return make_archive_id(extractor, ext_id)
+
+    def load(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._keys.update(keys)
+            self.loaded = True
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            if key not in self._keys:
+                self._keys.add(key)
+                self._new.append(key)
+
+    def drain_new(self) -> list[str]:
+        with self._lock:
+            new, self._new = self._new, []
+        return new
+
+    def contains_entry(self, extractor: str | None, ext_id: str | None) -> bool:
+        if not extractor or not ext_id:
+            return False
+        return self.make_key(extractor, ext_id) in self._keys
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(set(self._keys))
+
+
+download_archive = DownloadArchive()
@@ -0,0 +1,88 @@
+import json
+import logging
+import zlib
+
+import redis
+from core.config import settings
+from core.redis_utils import redis_binary_client
+
+from .structs import InfoCacheStats
+
+logger = logging.getLogger(__name__)
+
+
+class InfoCache:
+    """
+    Redis cache of raw yt-dlp info dicts, keyed by the extractor id of the URL (see ``Url.ext_key``).
+
+    Values are stored as zlib-compressed JSON with a TTL. Hit/miss counters are kept in Redis, so
+    they are shared by all workers. Redis failures are logged and treated as cache misses.
+    """
+
+    KEY_PREFIX = "media:info:"
+    STATS_KEY = "media:info-stats"
+
+    def __init__(self, client: redis.Redis | None = None, ttl: int | None = None):
+        """
+        Initializes the InfoCache.
+
+        Args:
+            client (redis.Redis, optional): A Redis client without response decoding. Defaults to the shared one.
+            ttl (int, optional): Time to live of an entry in seconds. Defaults to ``settings.info_cache_ttl``.
+        """
+        self._client = client or redis_binary_client
+        self._ttl = ttl or settings.info_cache_ttl
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns the cached info dict or None on a miss.
+        """
+        try:
+            value = self._client.get(self.KEY_PREFIX + key)
+            self._client.hincrby(self.STATS_KEY, "hits" if value is not None else "misses", 1)
+        except redis.RedisError as e:
+            logger.warning(f"Info cache is unavailable: {e}")
+            return None
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value))
+
+    def set(self, key: str, info: dict) -> None:
+        """
+        Stores a JSON-serializable info dict (see ``YoutubeDL.sanitize_info``).
+        """
+        value = zlib.compress(json.dumps(info, separators=(",", ":")).encode())
+        try:
+            self._client.set(self.KEY_PREFIX + key, value, ex=self._ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Info cache is unavailable: {e}")
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Drops a cached entry, the next extraction of the URL goes to the network.
+
+        Returns:
+            bool: True if there was an entry to drop.
+        """
+        try:
+            return bool(self._client.delete(self.KEY_PREFIX + key))
+        except redis.RedisError as e:
+            logger.warning(f"Info cache is unavailable: {e}")
+            return False
+
+    def stats(self) -> InfoCacheStats:
+        try:
+            stats = self._client.hgetall(self.STATS_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Info cache is unavailable: {e}")
+            return InfoCacheStats()
+        return InfoCacheStats.model_validate({key.decode(): int(value) for key, value in stats.items()})
+
+    def reset_stats(self) -> None:
+        try:
+            self._client.delete(self.STATS_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Info cache is unavailable: {e}")
+
+
+info_cache = InfoCache()
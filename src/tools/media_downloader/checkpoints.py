@@ -0,0 +1,47 @@
+import logging
+
+import redis
+from core.config import settings
+from core.redis_utils import redis_client
+
+from .structs import DownloadCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """
+    Keeps the progress of running downloads in Redis, so a restarted worker can resume them.
+
+    A checkpoint records where yt-dlp writes the partial file and how far it got. The data itself
+    stays in the ``.part`` file (and the ``.ytdl`` fragment state) that yt-dlp continues from.
+    """
+
+    KEY_PREFIX = "media:checkpoint:"
+
+    def __init__(self, client: redis.Redis | None = None, ttl: int | None = None):
+        self._client = client or redis_client
+        self._ttl = ttl or settings.download_checkpoint_ttl
+
+    def get(self, key: str) -> DownloadCheckpoint | None:
+        try:
+            value = self._client.get(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Checkpoint store is unavailable: {e}")
+            return None
+        return DownloadCheckpoint.model_validate_json(value) if value else None
+
+    def save(self, key: str, checkpoint: DownloadCheckpoint) -> None:
+        try:
+            self._client.set(self.KEY_PREFIX + key, checkpoint.model_dump_json(), ex=self._ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Checkpoint store is unavailable: {e}")
+
+    def clear(self, key: str) -> None:
+        try:
+            self._client.delete(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Checkpoint store is unavailable: {e}")
+
+
+checkpoint_store = CheckpointStore()
@@ -0,0 +1,63 @@
+import logging
+from enum import Enum
+
+import redis
+from core.config import settings
+from core.redis_utils import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class ControlCommandEnum(Enum):
+    cancel = "cancel"
+    pause = "pause"
+
+
+class TaskControl:
+    """
+    Commands for running tasks, kept in Redis and polled by the workers running them.
+
+    A command stays set until it is cleared or expires after ``settings.task_control_ttl``, so a task
+    that is queued while paused or cancelled sees the command when it starts.
+    """
+
+    KEY_PREFIX = "task:control:"
+
+    def __init__(self, client: redis.Redis | None = None, ttl: int | None = None):
+        self._client = client or redis_client
+        self._ttl = ttl or settings.task_control_ttl
+
+    def send(self, key: str, command: ControlCommandEnum) -> bool:
+        """
+        Returns:
+            bool: False if Redis is unavailable and the command was not sent.
+        """
+        try:
+            self._client.set(self.KEY_PREFIX + key, command.value, ex=self._ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Task control is unavailable: {e}")
+            return False
+        return True
+
+    def get(self, key: str) -> ControlCommandEnum | None:
+        try:
+            value = self._client.get(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Task control is unavailable: {e}")
+            return None
+        return ControlCommandEnum(value) if value else None
+
+    def clear(self, key: str) -> bool:
+        """
+        Returns:
+            bool: False if Redis is unavailable and the command was not cleared.
+        """
+        try:
+            self._client.delete(self.KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Task control is unavailable: {e}")
+            return False
+        return True
+
+
+task_control = TaskControl()
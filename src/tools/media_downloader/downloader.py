@@ -1,14 +1,43 @@
+import itertools
+import logging
+from collections.abc import Callable, Iterable, Iterator
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
+from urllib.parse import urlsplit
 
 from applications.youtube.models import YTChannelModel, YTPlaylistModel, YTVideoModel
+from core.bandwidth import bandwidth_limiter
+from core.config import settings
 from pydantic import AnyHttpUrl
 from yt_dlp import YoutubeDL
+from yt_dlp.extractor import gen_extractor_classes
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.utils import PagedList, make_archive_id
 
+from .archive import download_archive
+from .cache import InfoCache, info_cache
+from .checkpoints import checkpoint_store
 from .console_logger import ConsoleLogger
-from .exceptions import UrlUnknownHostError
-from .progress_hooks import console_hook
-from .structs import YTChannelInfo, YTPlaylistInfo, YTVideoInfo
+from .exceptions import UnknownProfileError, UrlUnknownHostError
+from .pool import ytdl_pool
+from .progress_hooks import BandwidthHook, CheckpointHook, console_hook
+from .structs import (
+    DownloadCheckpoint,
+    DownloadedFile,
+    YTChannelInfo,
+    YTEntryInfo,
+    YTListingCompact,
+    YTPlaylistInfo,
+    YTVideoCompact,
+    YTVideoInfo,
+)
+from .urls import YOUTUBE_HOSTS, canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# The id keeps files of different videos with the same title apart
+_OUTTMPL = "%(title)s [%(id)s].%(ext)s"
 
 
 class UrlHostEnum(str, Enum):
@@ -24,70 +53,255 @@ class Url(str):
         else:
             self.__url = url
 
+    @property
+    def host(self) -> str:
+        return self.__url.host
+
+    @cached_property
+    def ext_key(self) -> str | None:
+        """
+        The extractor id of the URL in yt-dlp archive format (e.g. "youtube dQw4w9WgXcQ"), None if unknown.
+        """
+        url = str(self)
+        for extractor in gen_extractor_classes():
+            if extractor.ie_key() == "Generic":
+                return None
+            if extractor.suitable(url):
+                ext_id = extractor.get_temp_id(url)
+                return make_archive_id(extractor, ext_id) if ext_id else None
+        return None
+
+    @cached_property
+    def canonical(self) -> str:
+        """
+        The canonical spelling of the URL, see ``canonicalize_url``.
+        """
+        return canonicalize_url(str(self))
+
     @property
     def source(self) -> UrlHostEnum:
-        if self.__url.host in ["www.youtube.com", "www.youtu.be"]:
+        if self.__url.host in YOUTUBE_HOSTS:
             return UrlHostEnum.youtube
         else:
             raise UrlUnknownHostError(f"Unknown host: {self.__url.host}")
 
     @property
     def is_video(self) -> bool:
-        return "watch" in self.__url.path
+        return "/watch?" in self.canonical
 
     @property
     def is_channel(self) -> bool:
-        return "channel" in self.__url.path
+        path = urlsplit(self.canonical).path
+        return path.startswith(("/channel/", "/c/", "/user/", "/@"))
 
     @property
     def is_playlist(self) -> bool:
-        return "playlist" in self.__url.path
+        return "/playlist?" in self.canonical
 
     def __str__(self):
         return str(self.__url)
 
 
+class _CollectFilesPP(PostProcessor):
+    """
+    Records the final file of every downloaded video, after the other postprocessors and the move.
+    """
+
+    def __init__(self, files: list[DownloadedFile]):
+        super().__init__()
+        self._files = files
+
+    def run(self, info: dict) -> tuple[list, dict]:
+        extractor = info.get("extractor_key") or info.get("ie_key")
+        ext_key = make_archive_id(extractor, info["id"]) if extractor and info.get("id") else None
+        self._files.append(DownloadedFile(path=info["filepath"], ext_key=ext_key))
+        return [], info
+
+
 class MediaDownloader:
+    _LISTING_EXTRACTORS = ("YoutubeTab",)
+    _URL_TYPES = ("url", "url_transparent")
+
     _url: Url
     _media_folder: Path
     _client: YoutubeDL
     _options: dict = None
-    _info_raw: dict
+    _profile: str | None = None
+    _cache: InfoCache | None = None
+    _info_raw: dict | None = None
+    _listing: dict | None = None
     _info: YTVideoInfo | YTChannelInfo | YTPlaylistInfo | None = None
 
     __model: type[YTVideoModel] | type[YTChannelModel] | type[YTPlaylistModel] | None = None
     __struct: type[YTVideoInfo] | type[YTChannelInfo] | type[YTPlaylistInfo] | None = None
 
-    def __init__(self, url: AnyHttpUrl | str, media_folder: Path, options: dict | None = None):
+    def __init__(  # noqa: PLR0913
+        self,
+        url: AnyHttpUrl | str,
+        media_folder: Path,
+        options: dict | None = None,
+        cache: InfoCache | None = None,
+        profile: str | None = None,
+    ):
         """
         Initializes the MediaDownloader with the specified URL, media folder, and logger.
 
+        Without custom options the YoutubeDL client is borrowed from the per-process pool of the
+        download profile, release it with ``close()`` or by using the downloader as a context manager.
+
         Args:
             url (AnyHttpUrl): The URL to download media from.
             media_folder (Path): The folder to save the downloaded media.
+            options (dict, optional): Custom yt-dlp options, the client is then built just for this downloader.
+            cache (InfoCache, optional): Cache for extracted info. Defaults to the shared one
+                when ``settings.info_cache_enabled`` is set.
+            profile (str, optional): Name of a download profile from ``settings.download_profiles``,
+                ignored with custom options. Defaults to ``settings.download_default_profile``.
+
+        Raises:
+            UnknownProfileError: If the profile is not configured.
         """
         self._url = Url(url)
+        self._cache = cache or (info_cache if settings.info_cache_enabled else None)
         self._media_folder = media_folder
-        self._client = YoutubeDL(self._get_yt_options())
         self._options = options
-        if self._options and "outtmpl" not in self._options:
-            self._options["outtmpl"] = f"{self._media_folder}/%(title)s.%(ext)s"
+        if self._options is None:
+            self._profile = profile or settings.download_default_profile
+            if self._profile not in settings.download_profiles:
+                raise UnknownProfileError(f"Unknown download profile: {self._profile}")
+            self._client = ytdl_pool.acquire(self._profile, self._get_yt_options)
+        else:
+            self._client = YoutubeDL(self._get_yt_options())
+        self._client.params["paths"] = {"home": str(self._media_folder)}
+
+    def __enter__(self) -> "MediaDownloader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Releases the YoutubeDL client, a pooled client goes back to the pool.
+        """
+        if self._profile is not None:
+            ytdl_pool.release(self._profile, self._client)
+        else:
+            self._client.close()
 
     @property
     def url(self) -> Url:
         return self._url
 
-    def download(self):
+    def add_progress_hook(self, hook: Callable[[dict], None]) -> None:
+        """
+        Registers an additional yt-dlp progress hook for this downloader.
+
+        Args:
+            hook (Callable[[dict], None]): The hook, called with the yt-dlp progress dict.
+        """
+        self._client.add_progress_hook(hook)
+
+    def download(
+        self, checkpoint_key: str | None = None, ignore_archive: bool = False, info: dict | None = None
+    ) -> list[DownloadedFile]:
         """
         Downloads media from the specified URL and saves it to the media folder.
+
+        Transfers draw from the cluster-wide bandwidth limiter when a limit is configured.
+
+        Args:
+            checkpoint_key (str, optional): Key to checkpoint the progress under. A download with the
+                same key continues from the partial file left by an interrupted run, e.g. after a
+                worker restart. The resume itself is yt-dlp's ``continuedl`` picking up the ``.part``
+                file, the checkpoint only records the progress for logs and monitoring. It is dropped
+                once the download succeeds.
+            ignore_archive (bool): Download even if the item is in the download archive, e.g. when
+                the stored files of an archived item are gone.
+            info (dict, optional): The info of an ``extract_compact(refresh=True)`` of this URL, downloaded
+                without extracting the URL again. Cached info is not fit for it, its format URLs expire.
+
+        Returns:
+            list[DownloadedFile]: The final files written by this download, after yt-dlp's own postprocessors.
         """
+        files: list[DownloadedFile] = []
+        self._client.add_post_processor(_CollectFilesPP(files), when="after_move")
+        if bandwidth_limiter.enabled:
+            self._client.add_progress_hook(BandwidthHook(bandwidth_limiter))
+        if checkpoint_key is not None:
+            if checkpoint := checkpoint_store.get(checkpoint_key):
+                self._log_resume(checkpoint_key, checkpoint)
+            self._client.params["continuedl"] = True
+            self._client.params["nopart"] = False
+            self._client.add_progress_hook(CheckpointHook(checkpoint_store, checkpoint_key))
+
+        archive = self._client.archive
+        if ignore_archive:
+            # yt-dlp treats an empty archive as none, the pooled client gets the shared one back below
+            self._client.archive = set()
+        try:
+            if info is None:
+                self._client.download([self._url])
+            else:
+                self._client.process_ie_result(info, download=True)
+        finally:
+            self._client.archive = archive
+        if checkpoint_key is not None:
+            checkpoint_store.clear(checkpoint_key)
+        return files
+
+    @staticmethod
+    def _log_resume(checkpoint_key: str, checkpoint: DownloadCheckpoint) -> None:
+        part = Path(checkpoint.tmpfilename or f"{checkpoint.filename}.part")
+        if part.exists():
+            logger.info(
+                f"Resuming {checkpoint_key} from {part} at {part.stat().st_size} bytes"
+                f" (fragment {checkpoint.fragment_index}/{checkpoint.fragment_count})"
+            )
+        else:
+            logger.info(f"Partial file of {checkpoint_key} is gone, downloading from scratch")
 
-        self._client.download([self._url])
+    @property
+    def model(self) -> type[YTVideoModel] | type[YTChannelModel] | type[YTPlaylistModel]:
+        """
+        The DB model the URL's info is stored in.
+        """
+        self._resolve_target()
+        return self.__model
 
-    def extract_info(self) -> YTVideoInfo | YTChannelInfo | YTPlaylistInfo:
+    @property
+    def info_raw(self) -> dict | None:
+        """
+        The raw yt-dlp info dict of the last extraction.
+        """
+        return self._info_raw
+
+    def extract_info(self, refresh: bool = False) -> YTVideoInfo | YTChannelInfo | YTPlaylistInfo:
         """
         Extracts information from the specified URL.
+
+        Args:
+            refresh (bool): Ignore the cached info and extract it again, the cache is updated.
+        """
+        self._resolve_target()
+        self._info_raw = self._extract_raw_info(refresh)
+        self._info = self.__struct.model_validate(self._info_raw)
+        return self._info
+
+    def extract_compact(self, refresh: bool = False) -> YTVideoCompact | YTListingCompact:
         """
+        Extracts information from the specified URL and validates only its compact projection.
+
+        Args:
+            refresh (bool): Ignore the cached info and extract it again, the cache is updated.
+        """
+        self._resolve_target()
+        self._info_raw = self._extract_raw_info(refresh)
+        if self.__struct is YTVideoInfo:
+            return YTVideoCompact.from_info(self._info_raw)
+        return YTListingCompact.from_info(self._info_raw)
+
+    def _resolve_target(self) -> None:
         if self._url.source == UrlHostEnum.youtube:
             if self._url.is_video:
                 self.__struct = YTVideoInfo
@@ -98,21 +312,160 @@ class MediaDownloader:
             else:
                 self.__struct = YTPlaylistInfo
                 self.__model = YTPlaylistModel
-            self._info_raw = self._client.extract_info(self._url, download=False)
-            self._info = self.__struct.model_validate(self._info_raw)
-            return self._info
+            return
 
         raise UrlUnknownHostError(f"Unknown host: {self._url.source}")
 
+    @property
+    def is_archived(self) -> bool:
+        """
+        Whether the URL's item is already in the download archive.
+        """
+        return self._url.ext_key is not None and self._url.ext_key in download_archive
+
+    def invalidate_info(self) -> bool:
+        """
+        Drops the cached info of the URL.
+
+        Returns:
+            bool: True if there was a cached entry.
+        """
+        if self._cache is None or self._url.ext_key is None:
+            return False
+        return self._cache.invalidate(self._url.ext_key)
+
+    def _extract_raw_info(self, refresh: bool = False) -> dict:
+        key = self._url.ext_key
+        if self._cache is None or key is None:
+            return self._client.extract_info(self._url, download=False)
+
+        info = None if refresh else self._cache.get(key)
+        if info is None:
+            info = YoutubeDL.sanitize_info(self._client.extract_info(self._url, download=False))
+            self._cache.set(key, info)
+        return info
+
+    def iter_entries(
+        self,
+        resolve: bool = False,
+        skip_archived: bool = False,
+        marks: dict[str, str] | None = None,
+        since_timestamp: int | None = None,
+    ) -> Iterator[YTEntryInfo | YTVideoInfo]:
+        """
+        Walks the entries of a playlist or channel lazily, one validated record at a time.
+
+        Listing pages are requested only when the consumer advances past the entries already
+        fetched, nested listings (e.g. the Videos/Shorts/Live tabs of a channel) are followed
+        and nothing but the current entry is held in memory. The listing of a preceding
+        ``extract_listing`` is walked instead of extracting the URL again.
+
+        Args:
+            resolve (bool): Resolve every entry into a full YTVideoInfo. Costs one extraction per entry.
+            skip_archived (bool): Skip entries already in the download archive, before they are resolved.
+            marks (dict[str, str] | None): High-water marks of an incremental sync, the newest known entry id
+                per listing URL. Listings are newest first, so paging through a listing stops at its mark.
+                The dict is updated in place with the newest entry of every walked listing.
+            since_timestamp (int | None): Also stop paging through a listing at the first entry published
+                at or before this timestamp, for listings whose marked entry is gone.
+
+        Yields:
+            YTEntryInfo | YTVideoInfo: Flat entries, or fully resolved videos when ``resolve`` is set.
+        """
+        info, self._listing = self._listing or self._extract_root(), None
+        if "entries" not in info:
+            yield self._entry_struct({**info, "url": info.get("webpage_url") or str(self._url)}, resolve)
+            return
+
+        yield from self._walk_entries(info, resolve, skip_archived, marks, since_timestamp)
+
+    def extract_listing(self) -> YTListingCompact:
+        """
+        Extracts a playlist or channel without its entries, walk them with ``iter_entries``.
+        ``info_raw`` holds the extracted info without the entries then.
+        """
+        self._listing = self._extract_root()
+        self._info_raw = {key: value for key, value in self._listing.items() if key != "entries"}
+        return YTListingCompact.from_info({**self._info_raw, "entries": []})
+
+    def _extract_root(self) -> dict:
+        """
+        Extracts the unprocessed info of the URL, following redirects to other URLs.
+        """
+        if self._url.source != UrlHostEnum.youtube:
+            raise UrlUnknownHostError(f"Unknown host: {self._url.source}")
+
+        info = self._client.extract_info(self._url, download=False, process=False)
+        while info.get("_type") in self._URL_TYPES:
+            info = self._client.extract_info(info["url"], download=False, process=False, ie_key=info.get("ie_key"))
+        return info
+
+    def _walk_entries(  # noqa: PLR0913
+        self,
+        info: dict,
+        resolve: bool,
+        skip_archived: bool,
+        marks: dict[str, str] | None = None,
+        since_timestamp: int | None = None,
+    ) -> Iterator[YTEntryInfo | YTVideoInfo]:
+        listing_key = info.get("webpage_url") or info.get("id")
+        stop_id = marks.get(listing_key) if marks is not None else None
+        newest_seen = False
+        for entry in self._iter_raw_entries(info.get("entries")):
+            if not entry:
+                continue
+            if entry.get("_type") == "playlist" or entry.get("ie_key") in self._LISTING_EXTRACTORS:
+                listing = entry
+                if "entries" not in listing:
+                    listing = self._client.extract_info(
+                        entry["url"], download=False, process=False, ie_key=entry.get("ie_key")
+                    )
+                yield from self._walk_entries(listing, resolve, skip_archived, marks, since_timestamp)
+                continue
+            if self._is_known(entry, stop_id, since_timestamp):
+                return
+            if marks is not None and not newest_seen:
+                marks[listing_key] = entry.get("id")
+                newest_seen = True
+            if not (skip_archived and download_archive.contains_entry(entry.get("ie_key"), entry.get("id"))):
+                yield self._entry_struct(entry, resolve)
+
+    @staticmethod
+    def _is_known(entry: dict, stop_id: str | None, since_timestamp: int | None) -> bool:
+        if stop_id is not None and entry.get("id") == stop_id:
+            return True
+        timestamp = entry.get("timestamp")
+        return since_timestamp is not None and timestamp is not None and timestamp <= since_timestamp
+
+    def _entry_struct(self, entry: dict, resolve: bool) -> YTEntryInfo | YTVideoInfo:
+        if resolve:
+            return YTVideoInfo.model_validate(self._client.extract_info(entry["url"], download=False))
+        return YTEntryInfo.model_validate(entry)
+
+    @staticmethod
+    def _iter_raw_entries(entries: Iterable[dict] | PagedList | None) -> Iterator[dict]:
+        """
+        Iterates yt-dlp entries without materializing them, paged lists are fetched page by page.
+        """
+        if isinstance(entries, PagedList):
+            for page in itertools.count():
+                page_entries = entries.getpage(page)
+                if not page_entries:
+                    return
+                yield from page_entries
+        elif entries:
+            yield from entries
+
     def _get_yt_options(self):
         """
-        Returns the options for the YouTubeDL client.
+        Returns the options for the YouTubeDL client, the download profile tunes the defaults.
         """
-        if self._options:
-            return self._options
+        if self._options is not None:
+            return {"outtmpl": _OUTTMPL, **self._options}
         return {
-            "format": "m4a/bestaudio/best",
+            **settings.download_profiles[self._profile].to_options(),
             "logger": ConsoleLogger(),
             "progress_hooks": [console_hook],
-            "outtmpl": f"{self._media_folder}/%(title)s.%(ext)s",
+            "outtmpl": _OUTTMPL,
+            "download_archive": download_archive,
         }
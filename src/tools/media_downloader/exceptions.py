@@ -1,2 +1,21 @@
+from yt_dlp.utils import DownloadCancelled
+
+
 class UrlUnknownHostError(Exception):
     pass
+
+
+class UnknownProfileError(Exception):
+    pass
+
+
+class InsufficientDiskSpaceError(Exception):
+    pass
+
+
+class DownloadCancelledError(DownloadCancelled):
+    pass
+
+
+class DownloadPausedError(DownloadCancelled):
+    pass
@@ -0,0 +1,109 @@
+import logging
+import os
+from collections import defaultdict
+from collections.abc import Callable
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from core.config import settings
+from yt_dlp import YoutubeDL
+
+logger = logging.getLogger(__name__)
+
+
+class YoutubeDLPool:
+    """
+    Per-process pool of warm YoutubeDL clients keyed by option profile.
+
+    Building a YoutubeDL initializes extractors, the cookie jar and the HTTP opener, so clients are
+    reused between downloads instead. Only idle clients are kept, a borrowed client belongs to the
+    borrower until it is released. On release the per-download state (params, hooks, postprocessors
+    and counters) is restored to what it was right after construction. The pool is dropped after a
+    fork, so each worker process builds its own clients.
+    """
+
+    # Per-download counters of YoutubeDL and factories of their initial values
+    _COUNTERS: dict[str, Callable] = {
+        "_download_retcode": int,
+        "_num_downloads": int,
+        "_num_videos": int,
+        "_playlist_level": int,
+        "_playlist_urls": set,
+        "_printed_messages": set,
+    }
+    _HOOKS = ("_progress_hooks", "_postprocessor_hooks", "_post_hooks")
+    _POSTPROCESSORS = "_pps"
+
+    def __init__(self, max_idle: int | None = None):
+        """
+        Initializes the YoutubeDLPool.
+
+        Args:
+            max_idle (int, optional): Idle clients kept per profile. Defaults to ``settings.ytdl_pool_max_idle``.
+        """
+        self._max_idle = max_idle if max_idle is not None else settings.ytdl_pool_max_idle
+        self._idle: dict[str, list[YoutubeDL]] = defaultdict(list)
+        self._initial_state: WeakKeyDictionary[YoutubeDL, dict] = WeakKeyDictionary()
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+    def acquire(self, profile: str, options_factory: Callable[[], dict]) -> YoutubeDL:
+        """
+        Borrows an idle client of the profile or builds a new one.
+
+        Args:
+            profile (str): The option profile, all clients of a profile must share the same options.
+            options_factory (Callable[[], dict]): Builds the yt-dlp options when a new client is needed.
+        """
+        with self._lock:
+            self._check_fork()
+            if self._idle[profile]:
+                return self._idle[profile].pop()
+
+        client = YoutubeDL(options_factory())
+        self._initial_state[client] = self._snapshot(client)
+        return client
+
+    def release(self, profile: str, client: YoutubeDL) -> None:
+        """
+        Returns a borrowed client, it is reset or closed if the pool is full.
+        """
+        state = self._initial_state.get(client)
+        with self._lock:
+            self._check_fork()
+            if state is not None and len(self._idle[profile]) < self._max_idle:
+                self._reset(client, state)
+                self._idle[profile].append(client)
+                return
+        client.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        for clients in idle.values():
+            for client in clients:
+                client.close()
+
+    def _check_fork(self) -> None:
+        if self._pid != os.getpid():
+            self._idle = defaultdict(list)
+            self._pid = os.getpid()
+
+    def _snapshot(self, client: YoutubeDL) -> dict:
+        state = {name: list(getattr(client, name)) for name in self._HOOKS}
+        postprocessors = getattr(client, self._POSTPROCESSORS)
+        state[self._POSTPROCESSORS] = {when: list(pps) for when, pps in postprocessors.items()}
+        state["params"] = {**client.params, "outtmpl": dict(client.params["outtmpl"])}
+        return state
+
+    def _reset(self, client: YoutubeDL, state: dict) -> None:
+        for name in self._HOOKS:
+            setattr(client, name, list(state[name]))
+        postprocessors = {when: list(pps) for when, pps in state[self._POSTPROCESSORS].items()}
+        setattr(client, self._POSTPROCESSORS, postprocessors)
+        for name, factory in self._COUNTERS.items():
+            setattr(client, name, factory())
+        client.params = {**state["params"], "outtmpl": dict(state["params"]["outtmpl"])}
+
+
+ytdl_pool = YoutubeDLPool()
@@ -0,0 +1,3 @@
+__all__ = ["PostProcessOptions", "PostProcessor", "post_processor", "process_file"]
+
+from .pipeline import PostProcessOptions, PostProcessor, post_processor, process_file
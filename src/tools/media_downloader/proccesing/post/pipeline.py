@@ -0,0 +1,112 @@
+import logging
+import subprocess
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.config import settings
+
+from ...structs import PostProcessResult
+from .steps import extract_thumbnail, hash_file, probe, remux
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PostProcessOptions:
+    ffmpeg: str
+    ffprobe: str
+    thumbnail: bool = True
+    remux: str | None = None
+
+    @classmethod
+    def from_settings(cls) -> "PostProcessOptions":
+        return cls(
+            ffmpeg=settings.ffmpeg_path,
+            ffprobe=settings.ffprobe_path,
+            thumbnail=settings.post_process_thumbnail,
+            remux=settings.post_process_remux,
+        )
+
+
+def process_file(path: str, options: PostProcessOptions) -> PostProcessResult:
+    """
+    Runs every post-processing step on one file. A failing step is recorded in ``errors`` and
+    the remaining steps still run.
+    """
+    file = Path(path)
+    errors = []
+    remuxed = False
+    if options.remux:
+        try:
+            target = remux(file, options.ffmpeg, options.remux)
+            remuxed = target != file
+            file = target
+        except (OSError, subprocess.CalledProcessError) as e:
+            errors.append(f"remux: {e}")
+
+    result = PostProcessResult(path=str(file), remuxed=remuxed)
+    try:
+        result.size = file.stat().st_size
+    except OSError as e:
+        errors.append(f"stat: {e}")
+    try:
+        result.sha256 = hash_file(file)
+    except OSError as e:
+        errors.append(f"hash: {e}")
+
+    streams = []
+    try:
+        info = probe(file, options.ffprobe)
+        streams = info.get("streams", [])
+        result.duration = float(info["format"]["duration"]) if "duration" in info.get("format", {}) else None
+        result.format_name = info.get("format", {}).get("format_name")
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        errors.append(f"probe: {e}")
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    if video:
+        result.video_codec = video.get("codec_name")
+        result.width = video.get("width")
+        result.height = video.get("height")
+    if audio:
+        result.audio_codec = audio.get("codec_name")
+
+    if options.thumbnail and video:
+        try:
+            result.thumbnail = str(extract_thumbnail(file, options.ffmpeg, (result.duration or 0) / 10))
+        except (OSError, subprocess.CalledProcessError) as e:
+            errors.append(f"thumbnail: {e}")
+
+    result.errors = errors
+    return result
+
+
+class PostProcessor:
+    """
+    Runs the post-processing of downloaded files in the calling process, one file after the other.
+
+    Hashing, probing and ffmpeg are CPU-bound, they run on the post-process queue's own worker so the
+    network-bound download workers stay free. The queue's concurrency in ``settings.celery_queues``
+    bounds how many files are processed at once. A pool of its own would not work there anyway, the
+    children of a prefork worker are daemonic and cannot start processes.
+    """
+
+    def __init__(self, options: PostProcessOptions | None = None):
+        """
+        Args:
+            options (PostProcessOptions, optional): Step options. Defaults to the ones from the settings.
+        """
+        self._options = options or PostProcessOptions.from_settings()
+
+    def run(self, paths: Iterable[Path | str]) -> list[PostProcessResult]:
+        """
+        Post-processes the files.
+
+        Returns:
+            list[PostProcessResult]: One result per file, in the order of ``paths``.
+        """
+        return [process_file(str(path), self._options) for path in paths]
+
+
+post_processor = PostProcessor()
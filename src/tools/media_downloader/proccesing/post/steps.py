@@ -0,0 +1,72 @@
+"""
+Post-processing steps. They only take plain arguments and do not touch the settings, Redis or the DB,
+``process_file`` passes them what they need.
+"""
+
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """
+    Returns the SHA-256 of the file, read in chunks so large videos are not loaded into memory.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe(path: Path, ffprobe: str) -> dict:
+    """
+    Returns the format and the streams of the file as reported by ffprobe.
+    """
+    output = subprocess.run(  # noqa: S603
+        [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def extract_thumbnail(path: Path, ffmpeg: str, at: float) -> Path:
+    """
+    Writes a JPEG frame of the video at ``at`` seconds next to it.
+
+    Returns:
+        Path: The thumbnail, ``<name>.thumb.jpg``.
+    """
+    thumbnail = path.with_suffix(".thumb.jpg")
+    subprocess.run(  # noqa: S603
+        [ffmpeg, "-v", "error", "-y", "-ss", f"{at:.2f}", "-i", str(path), "-frames:v", "1", str(thumbnail)],
+        capture_output=True,
+        check=True,
+    )
+    return thumbnail
+
+
+def remux(path: Path, ffmpeg: str, container: str) -> Path:
+    """
+    Copies the streams of the file into another container without re-encoding and removes the original.
+
+    Returns:
+        Path: The remuxed file, the original path if it already is in the container.
+    """
+    target = path.with_suffix(f".{container}")
+    if target == path:
+        return path
+    tmp = target.with_suffix(f".remux.{container}")
+    subprocess.run(  # noqa: S603
+        [ffmpeg, "-v", "error", "-y", "-i", str(path), "-map", "0", "-c", "copy", str(tmp)],
+        capture_output=True,
+        check=True,
+    )
+    tmp.replace(target)
+    path.unlink()
+    return target
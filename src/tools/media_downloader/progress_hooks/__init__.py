@@ -1,5 +1,16 @@
 __all__ = [
+    "BandwidthHook",
+    "CheckpointHook",
+    "ControlHook",
+    "ProgressSink",
+    "ProgressSnapshot",
+    "ThroughputHook",
     "console_hook",
 ]
 
+from .bandwidth import BandwidthHook
+from .checkpoint import CheckpointHook
 from .console import console_hook
+from .control import ControlHook
+from .sink import ProgressSink, ProgressSnapshot
+from .throughput import ThroughputHook
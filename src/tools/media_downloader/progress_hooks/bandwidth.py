@@ -0,0 +1,25 @@
+from core.bandwidth import BandwidthLimiter
+
+
+class BandwidthHook:
+    """
+    Progress hook that draws the bytes of every update from a bandwidth limiter.
+
+    yt-dlp calls progress hooks from the downloading thread after each block, so blocking here
+    slows the transfer down to the rate of the limiter.
+    """
+
+    def __init__(self, limiter: BandwidthLimiter):
+        self._limiter = limiter
+        self._seen: dict[str, int] = {}
+
+    def __call__(self, data: dict) -> None:
+        filename = data.get("filename", "")
+        if data.get("status") != "downloading":
+            self._seen.pop(filename, None)
+            return
+        downloaded_bytes = data.get("downloaded_bytes") or 0
+        amount = downloaded_bytes - self._seen.get(filename, 0)
+        self._seen[filename] = downloaded_bytes
+        if amount > 0:
+            self._limiter.throttle(amount)
@@ -0,0 +1,39 @@
+import time
+from datetime import UTC, datetime
+
+from core.config import settings
+
+from ..checkpoints import CheckpointStore
+from ..structs import DownloadCheckpoint
+
+
+class CheckpointHook:
+    """
+    Progress hook that saves a download checkpoint at most once per ``interval`` seconds.
+    """
+
+    def __init__(self, store: CheckpointStore, key: str, interval: float | None = None):
+        self._store = store
+        self._key = key
+        self._interval = interval if interval is not None else settings.download_checkpoint_interval
+        self._saved_at = 0.0
+
+    def __call__(self, data: dict) -> None:
+        if data.get("status") != "downloading":
+            return
+        now = time.monotonic()
+        if now - self._saved_at < self._interval:
+            return
+        self._saved_at = now
+        self._store.save(
+            self._key,
+            DownloadCheckpoint(
+                filename=data["filename"],
+                tmpfilename=data.get("tmpfilename"),
+                downloaded_bytes=data.get("downloaded_bytes") or 0,
+                total_bytes=data.get("total_bytes") or data.get("total_bytes_estimate"),
+                fragment_index=data.get("fragment_index"),
+                fragment_count=data.get("fragment_count"),
+                updated_at=datetime.now(UTC),
+            ),
+        )
@@ -1,9 +1,26 @@
 import logging
+import time
 
-from ..structs import DownloadItemState
+from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_logged_at: dict[str, float] = {}
+
 
 def console_hook(data: dict) -> None:
-    logger.info(str(DownloadItemState.model_validate(data)))
+    """
+    Logs the yt-dlp progress line of a file at most once per ``settings.progress_log_interval``.
+    """
+    filename = data.get("filename", "")
+    if data.get("status") == "finished":
+        _logged_at.pop(filename, None)
+        logger.info(f"{filename} has finished downloading.")
+        return
+
+    now = time.monotonic()
+    if now - _logged_at.get(filename, 0.0) < settings.progress_log_interval:
+        return
+    _logged_at[filename] = now
+    downloaded_bytes = data.get("downloaded_bytes")
+    logger.info(data.get("_default_template") or f"{filename}: {downloaded_bytes} bytes")
@@ -0,0 +1,35 @@
+import time
+
+from core.config import settings
+
+from ..control import ControlCommandEnum, TaskControl
+from ..exceptions import DownloadCancelledError, DownloadPausedError
+
+
+class ControlHook:
+    """
+    Progress hook that stops the download when a cancel or pause command is sent for it, checked at
+    most once per ``interval`` seconds.
+
+    yt-dlp lets the raised ``DownloadCancelled`` through and leaves the partial files in place,
+    so a paused download continues from them when it runs again.
+    """
+
+    def __init__(self, control: TaskControl, key: str, interval: float | None = None):
+        self._control = control
+        self._key = key
+        self._interval = interval if interval is not None else settings.task_control_check_interval
+        self._checked_at = 0.0
+
+    def __call__(self, data: dict) -> None:
+        if data.get("status") != "downloading":
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self._interval:
+            return
+        self._checked_at = now
+        command = self._control.get(self._key)
+        if command is ControlCommandEnum.cancel:
+            raise DownloadCancelledError(f"Download {self._key} cancelled")
+        if command is ControlCommandEnum.pause:
+            raise DownloadPausedError(f"Download {self._key} paused")
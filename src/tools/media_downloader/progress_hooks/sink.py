@@ -0,0 +1,81 @@
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+
+import redis
+from core.config import settings
+from core.redis_utils import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ProgressSnapshot:
+    """
+    Raw numbers of a yt-dlp progress update. A plain dataclass on purpose: it is built on the hot
+    path of every published update and needs no validation.
+    """
+
+    task_id: str | None
+    filename: str
+    status: str
+    downloaded_bytes: int | None = None
+    total_bytes: int | None = None
+    speed: float | None = None
+    eta: int | None = None
+    fragment_index: int | None = None
+    fragment_count: int | None = None
+
+    @classmethod
+    def from_hook(cls, data: dict, task_id: str | None = None) -> "ProgressSnapshot":
+        return cls(
+            task_id=task_id,
+            filename=data.get("filename", ""),
+            status=data.get("status", ""),
+            downloaded_bytes=data.get("downloaded_bytes"),
+            total_bytes=data.get("total_bytes") or data.get("total_bytes_estimate"),
+            speed=data.get("speed"),
+            eta=data.get("eta"),
+            fragment_index=data.get("fragment_index"),
+            fragment_count=data.get("fragment_count"),
+        )
+
+
+class ProgressSink:
+    """
+    Progress hook that samples yt-dlp updates and publishes them to a Redis channel.
+
+    yt-dlp calls progress hooks many times per second. "downloading" updates of a file are dropped
+    unless ``1 / max_rate`` seconds passed since the last published one, status changes (finished,
+    error) are always published. Subscribers (e.g. the SSE progress stream) get JSON snapshots.
+    """
+
+    def __init__(
+        self,
+        task_id: str | None = None,
+        max_rate: float | None = None,
+        client: redis.Redis | None = None,
+        channel: str | None = None,
+    ):
+        self._task_id = task_id
+        self._min_interval = 1 / (max_rate or settings.progress_max_rate)
+        self._client = client or redis_client
+        self._channel = channel or settings.progress_channel
+        self._published: dict[str, tuple[str, float]] = {}
+
+    def __call__(self, data: dict) -> None:
+        filename = data.get("filename", "")
+        status = data.get("status", "")
+        now = time.monotonic()
+        last = self._published.get(filename)
+        if last is not None and last[0] == status and now - last[1] < self._min_interval:
+            return
+        self._published[filename] = (status, now)
+        self.publish(ProgressSnapshot.from_hook(data, self._task_id))
+
+    def publish(self, snapshot: ProgressSnapshot) -> None:
+        try:
+            self._client.publish(self._channel, json.dumps(asdict(snapshot)))
+        except redis.RedisError as e:
+            logger.debug(f"Progress is not published: {e}")
@@ -0,0 +1,45 @@
+import logging
+import time
+from typing import Protocol
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class ThroughputRecorder(Protocol):
+    def record(self, amount: int) -> None: ...
+
+
+class ThroughputHook:
+    """
+    Progress hook that reports the bytes of every update to a throughput recorder, e.g. the
+    fair-share scheduler, batched to at most one report per ``interval`` seconds and file.
+    """
+
+    def __init__(self, recorder: ThroughputRecorder, interval: float = 1.0):
+        self._recorder = recorder
+        self._interval = interval
+        self._seen: dict[str, int] = {}
+        self._pending = 0
+        self._reported_at = time.monotonic()
+
+    def __call__(self, data: dict) -> None:
+        filename = data.get("filename", "")
+        downloaded_bytes = data.get("downloaded_bytes") or 0
+        self._pending += max(0, downloaded_bytes - self._seen.get(filename, 0))
+        if data.get("status") == "downloading":
+            self._seen[filename] = downloaded_bytes
+        else:
+            self._seen.pop(filename, None)
+        now = time.monotonic()
+        if self._pending and (data.get("status") != "downloading" or now - self._reported_at >= self._interval):
+            self.flush(now)
+
+    def flush(self, now: float | None = None) -> None:
+        amount, self._pending = self._pending, 0
+        self._reported_at = now or time.monotonic()
+        try:
+            self._recorder.record(amount)
+        except redis.RedisError as e:
+            logger.debug(f"Throughput is not recorded: {e}")
@@ -0,0 +1,118 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from contants import MEDIA_FOLDER
+
+logger = logging.getLogger(__name__)
+
+
+class MediaStore:
+    """
+    Content-addressed media store.
+
+    Every file is kept once as a blob named by its SHA-256 under ``blobs/ab/cd/``, so the same video
+    downloaded by several users, or under another title, takes the disk space of one copy and checking
+    for it is a path lookup. Users see their files as hardlinks to the blobs in ``users/<owner id>/``.
+    Downloads land in ``incoming/<task id>/`` first, on the same filesystem, so ingesting them is a rename
+    and the partial files of concurrent downloads never mix.
+    """
+
+    def __init__(self, root: Path):
+        self._root = root
+        self.blobs = root / "blobs"
+        self.users = root / "users"
+        self.incoming = root / "incoming"
+
+    def incoming_folder(self, key: str) -> Path:
+        """
+        Returns the folder the download of a task lands in.
+        """
+        return self.incoming / key
+
+    def drop_incoming_folder(self, key: str) -> bool:
+        """
+        Removes the folder of a download once its files are ingested. A folder still holding files is kept.
+
+        Returns:
+            bool: True if the folder was removed.
+        """
+        try:
+            self.incoming_folder(key).rmdir()
+        except OSError:
+            return False
+        return True
+
+    def remove_incoming_folder(self, key: str) -> int:
+        """
+        Removes the folder of a cancelled download with everything in it: partial files, fragments
+        and fragment state of this task only.
+
+        Returns:
+            int: The number of removed files.
+        """
+        folder = self.incoming_folder(key)
+        if not folder.is_dir():
+            return 0
+        removed = sum(1 for path in folder.rglob("*") if not path.is_dir())
+        shutil.rmtree(folder, ignore_errors=True)
+        return removed
+
+    def blob_path(self, sha256: str, suffix: str) -> Path:
+        return self.blobs / sha256[:2] / sha256[2:4] / f"{sha256}{suffix}"
+
+    def contains(self, sha256: str, suffix: str) -> bool:
+        return self.blob_path(sha256, suffix).exists()
+
+    def ingest(self, path: Path, sha256: str, suffix: str | None = None) -> Path:
+        """
+        Moves a file into the store. If the content is stored already the file is dropped.
+
+        Args:
+            path (Path): The file to ingest.
+            sha256 (str): The SHA-256 of the file.
+            suffix (str, optional): Suffix of the blob. Defaults to the suffix of the file.
+
+        Returns:
+            Path: The blob holding the content.
+        """
+        blob = self.blob_path(sha256, path.suffix if suffix is None else suffix)
+        if blob.exists():
+            if not blob.samefile(path):
+                path.unlink()
+            return blob
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            path.replace(blob)
+        except OSError:
+            shutil.move(path, blob)
+        return blob
+
+    def link(self, blob: Path, owner_id: str, name: str) -> Path | None:
+        """
+        Adds a hardlink to the blob to the owner's folder. An existing entry of another file with
+        the same name is kept and the link gets a numbered name instead.
+
+        Returns:
+            Path | None: The link, None if the filesystem does not support hardlinks; the DB
+                reference is then the only entry of the owner.
+        """
+        folder = self.users / str(owner_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        target = folder / name
+        counter = 1
+        while target.exists():
+            if target.samefile(blob):
+                return target
+            target = folder / f"{Path(name).stem} ({counter}){Path(name).suffix}"
+            counter += 1
+        try:
+            os.link(blob, target)
+        except OSError as e:
+            logger.warning("Could not link %s for %s: %s", blob, owner_id, e)
+            return None
+        return target
+
+
+media_store = MediaStore(MEDIA_FOLDER)
@@ -1,7 +1,10 @@
+from collections.abc import Iterator
+from dataclasses import field
 from datetime import datetime
 from enum import Enum
 
-from pydantic import AnyHttpUrl, BaseModel, Field
+from pydantic import AnyHttpUrl, BaseModel, Field, TypeAdapter, computed_field
+from pydantic.dataclasses import dataclass
 
 
 class DownloadItemStateStatusEnum(str, Enum):
@@ -35,6 +38,74 @@ class DownloadItemState(BaseModel):
             return f"{self.filename} has finished downloading."
 
 
+class DiskReservation(BaseModel):
+    key: str
+    size: int
+    url: str | None = None
+    expires_at: datetime
+
+
+class DiskUsageStatus(BaseModel):
+    total: int
+    free: int
+    budget: int
+    reserved: int
+    reservations: list[DiskReservation] = []
+
+
+class DownloadedFile(BaseModel):
+    path: str
+    ext_key: str | None = None  # yt-dlp archive id of the video, e.g. "youtube dQw4w9WgXcQ"
+
+
+class PostProcessResult(BaseModel):
+    """
+    What the post-processing stage learned about one downloaded file.
+    """
+
+    path: str
+    size: int | None = None
+    sha256: str | None = None
+    duration: float | None = None
+    format_name: str | None = None
+    video_codec: str | None = None
+    audio_codec: str | None = None
+    width: int | None = None
+    height: int | None = None
+    thumbnail: str | None = None
+    remuxed: bool = False
+    errors: list[str] = []
+
+
+class DownloadCheckpoint(BaseModel):
+    filename: str
+    tmpfilename: str | None = None
+    downloaded_bytes: int = 0
+    total_bytes: int | None = None
+    fragment_index: int | None = None
+    fragment_count: int | None = None
+    updated_at: datetime
+
+
+class InfoCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+
+    @computed_field
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class InfoCacheInvalidateStruct(BaseModel):
+    url: AnyHttpUrl
+
+
+class InfoCacheInvalidateResponse(BaseModel):
+    key: str | None
+    invalidated: bool
+
+
 class YTVideoInfo(BaseModel):
     id: str
     title: str
@@ -119,6 +190,27 @@ class YTVideoInfo(BaseModel):
     format: str
 
 
+class YTEntryInfo(BaseModel):
+    """
+    A flat playlist/channel entry as listed by yt-dlp, without formats or other per-video details.
+    """
+
+    id: str
+    url: str
+    ie_key: str | None = None
+    title: str | None = None
+    description: str | None = None
+    duration: float | None = None
+    channel_id: str | None = None
+    channel: str | None = None
+    channel_url: str | None = None
+    view_count: int | None = None
+    timestamp: int | None = None
+    release_timestamp: int | None = None
+    live_status: str | None = None
+    availability: str | None = None
+
+
 class YTChannelInfo(BaseModel):
     id: str
     channel: str
@@ -175,3 +267,86 @@ class YTPlaylistInfo(BaseModel):
     webpage_url_domain: str
     release_year: str | int | None = None
     epoch: int
+
+
+@dataclass(slots=True)
+class YTVideoCompact:
+    """
+    Projection of a yt-dlp video info dict to the fields the API needs.
+
+    Formats, thumbnails, captions, headers and the heatmap are dropped, which keeps validation
+    cheap and the stored metadata small. The full dict goes to the raw side store when enabled.
+    """
+
+    id: str
+    title: str
+    description: str | None = None
+    thumbnail: str | None = None
+    duration: float | None = None
+    channel: str | None = None
+    channel_id: str | None = None
+    channel_url: str | None = None
+    uploader: str | None = None
+    upload_date: str | None = None
+    timestamp: int | None = None
+    view_count: int | None = None
+    like_count: int | None = None
+    live_status: str | None = None
+    webpage_url: str | None = None
+    extractor_key: str | None = None
+    ext: str | None = None
+    width: int | None = None
+    height: int | None = None
+    filesize: int | None = None
+    filesize_approx: int | None = None
+    tags: list[str] = field(default_factory=list)
+    categories: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_info(cls, info: dict) -> "YTVideoCompact":
+        return _video_compact_adapter.validate_python(info)
+
+    def to_dict(self) -> dict:
+        return _video_compact_adapter.dump_python(self, mode="json")
+
+
+@dataclass(slots=True)
+class YTListingCompact:
+    """
+    Projection of a yt-dlp playlist or channel info dict, entries are projected to YTVideoCompact.
+    The entries of nested listings, e.g. the Videos/Shorts tabs of a channel, are flattened into it.
+    """
+
+    id: str
+    title: str
+    description: str | None = None
+    channel: str | None = None
+    channel_id: str | None = None
+    channel_url: str | None = None
+    uploader: str | None = None
+    playlist_count: int | None = None
+    view_count: int | None = None
+    webpage_url: str | None = None
+    extractor_key: str | None = None
+    entries: list[YTVideoCompact] = field(default_factory=list)
+
+    @classmethod
+    def from_info(cls, info: dict) -> "YTListingCompact":
+        return _listing_compact_adapter.validate_python({**info, "entries": list(_flat_entries(info))})
+
+    def to_dict(self) -> dict:
+        return _listing_compact_adapter.dump_python(self, mode="json")
+
+
+def _flat_entries(info: dict) -> Iterator[dict]:
+    for entry in info.get("entries") or ():
+        if not entry:
+            continue
+        if entry.get("_type") == "playlist" or "entries" in entry:
+            yield from _flat_entries(entry)
+        else:
+            yield entry
+
+
+_video_compact_adapter = TypeAdapter(YTVideoCompact)
+_listing_compact_adapter = TypeAdapter(YTListingCompact)
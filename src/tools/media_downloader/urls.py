@@ -0,0 +1,68 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+YOUTUBE_HOSTS = frozenset({
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
+    "youtu.be",
+    "www.youtu.be",
+})
+
+# Path prefixes that carry the video id as the next path segment.
+_VIDEO_PATHS = ("shorts", "live", "embed", "v", "e")
+# Legacy channel paths with a case-insensitive name, /channel/ ids are case-sensitive.
+_NAMED_CHANNEL_PATHS = ("c", "user")
+# Query parameters that select the content, everything else (t, si, feature, pp, utm_*...) is dropped.
+_YOUTUBE_PARAMS = ("v", "list")
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "yclid", "mc_cid", "mc_eid", "si", "igshid", "ref"})
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Maps the many spellings of one resource to a single canonical URL.
+
+    YouTube links from youtu.be, m./music. hosts, shorts, live and embed players all become
+    ``https://www.youtube.com/watch?v=<id>``, playback position and tracking parameters are dropped and
+    channel handles are lower-cased. Other URLs only lose their fragment and tracking parameters and get
+    their query sorted.
+
+    Args:
+        url (str): The URL as submitted.
+
+    Returns:
+        str: The canonical URL, equal for every spelling of the same resource.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host in YOUTUBE_HOSTS:
+        return _canonicalize_youtube(host, parts.path, parts.query)
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in _TRACKING_PARAMS and not key.startswith("utm_")
+    )
+    netloc = host if parts.port is None else f"{host}:{parts.port}"
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def _canonicalize_youtube(host: str, path: str, query: str) -> str:
+    segments = [segment for segment in path.split("/") if segment]
+    params = dict(parse_qsl(query))
+
+    if host.endswith("youtu.be") and segments:
+        params["v"] = segments[0]
+        segments = ["watch"]
+    elif segments[1:] and segments[0] in _VIDEO_PATHS:
+        params["v"] = segments[1]
+        segments = ["watch"]
+    elif segments and segments[0].startswith("@"):
+        segments[0] = segments[0].lower()
+    elif segments[1:] and segments[0] in _NAMED_CHANNEL_PATHS:
+        segments[1] = segments[1].lower()
+
+    kept = [(key, params[key]) for key in _YOUTUBE_PARAMS if params.get(key)]
+    return urlunsplit(("https", "www.youtube.com", "/" + "/".join(segments), urlencode(kept), ""))
@@ -1,7 +1,40 @@
+import sys
+
 import celery_tasks  # noqa: F401
-from celery import Celery
+from celery.signals import celeryd_init
+from celery_app import celery
 from core.config import settings
 
-celery = Celery(__name__)
-celery.conf.broker_url = settings.celery_broker_url
-celery.conf.result_backend = settings.celery_result_backend
+
+@celeryd_init.connect
+def configure_queue_worker(conf, options: dict, **_) -> None:
+    """
+    Applies the concurrency and prefetch settings of the queue a worker consumes (``-Q <queue>``),
+    command line options still take precedence.
+    """
+    queues = options.get("queues") or [conf.task_default_queue]
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if len(queues) != 1 or queues[0] not in settings.celery_queues:
+        return
+    queue = settings.celery_queues[queues[0]]
+    conf.worker_concurrency = queue.concurrency
+    conf.worker_prefetch_multiplier = queue.prefetch_multiplier
+
+
+def worker_argv(queue: str, *args: str) -> list[str]:
+    """
+    Returns the command line of a worker consuming one queue, sized by its ``settings.celery_queues`` entry:
+    autoscaled between ``min_concurrency`` and ``concurrency``, or a fixed pool of ``concurrency`` processes.
+    """
+    config = settings.celery_queues[queue]
+    if config.min_concurrency is None:
+        pool = f"--concurrency={config.concurrency}"
+    else:
+        pool = f"--autoscale={config.concurrency},{config.min_concurrency}"
+    return ["worker", "-Q", queue, "-n", f"{queue}@%h", pool, *args]
+
+
+if __name__ == "__main__":
+    # python worker.py <queue> [celery worker options]
+    celery.worker_main(worker_argv(*sys.argv[1:]))
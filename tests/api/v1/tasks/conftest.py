@@ -0,0 +1,30 @@
+import pytest
+
+from celery_app import celery
+from core.config import settings
+from core.fair_share import fair_scheduler
+from tests.inventory.fake_redis import FakeRedis
+from tools.media_downloader.control import task_control
+
+
+@pytest.fixture
+def broker(mocker, monkeypatch):
+    """
+    Celery mode with the fair share scheduler granting every download a slot, returns the mocked
+    ``send_task`` of the app that publishes to the broker.
+    """
+    monkeypatch.setattr(settings, "task_backend", "celery")
+    mocker.patch.object(fair_scheduler, "submit")
+    mocker.patch.object(fair_scheduler, "withdraw")
+    mocker.patch.object(fair_scheduler, "dispatch", side_effect=lambda: [fair_scheduler.submit.call_args.args[1]])
+    return mocker.patch.object(celery, "send_task")
+
+
+@pytest.fixture
+def control(monkeypatch) -> FakeRedis:
+    """
+    Task control commands kept in memory instead of Redis.
+    """
+    client = FakeRedis()
+    monkeypatch.setattr(task_control, "_client", client)
+    return client
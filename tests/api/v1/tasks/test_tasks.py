@@ -1,5 +1,11 @@
 import pytest
+import redis
 
+from applications.tasks.models import TaskModel, TaskStageEnum, TaskStatusEnum
+from celery_app import celery
+from core.fair_share import fair_scheduler
+from tools.media_downloader.control import ControlCommandEnum, task_control
+from tools.media_downloader.downloader import Url
 
 pytestmark = pytest.mark.api
 
@@ -14,7 +20,8 @@ async def test_get_tasks(client, task_factory):
         {
             "id": str(task.id),
             "url": task.url,
-            "owner_id": str(task.owner_id)
+            "owner_id": str(task.owner_id),
+            "profile": task.profile,
         }
     ], f"Error {response.json()}"
 
@@ -26,9 +33,95 @@ async def test_create_task(client):
     assert response.status_code == 200, f"Error {response.json()}"
 
 
+async def test_create_task_unknown_profile(client):
+    await client.force_auth()
+    url = client.url_for("create_task")
+    response = await client.post(url, json={"url": "https://test.com", "profile": "unknown"})
+    assert response.status_code == 422, f"Error {response.json()}"
+
+
 async def test_get_task(client, task_factory):
     user = await client.force_auth()
     task = await task_factory.create(owner_id=user.id)
     url = client.url_for("get_task", task_id=task.id)
     response = await client.get(url)
     assert response.status_code == 200, f"Error {response.json()}"
+
+
+async def test_get_task_progress(client, task_factory):
+    user = await client.force_auth()
+    task = await task_factory.create(owner_id=user.id)
+    url = client.url_for("get_task_progress", task_id=task.id)
+    response = await client.get(url)
+    assert response.status_code == 200, f"Error {response.json()}"
+    assert response.json()["total"] == 1
+
+
+async def test_download_task_publishes_to_download_queue(client, task_factory, broker):
+    user = await client.force_auth()
+    task = await task_factory.create(owner_id=user.id)
+    url = client.url_for("download_task", task_id=task.id)
+    response = await client.post(url)
+    assert response.status_code == 200, f"Error {response.json()}"
+
+    fair_scheduler.submit.assert_called_once_with(str(user.id), str(task.id), Url(task.url).host)
+    broker.assert_called_once()
+    assert broker.call_args.args[0] == "celery_tasks.download_url"
+    assert broker.call_args.args[1] == (str(task.id),)
+    assert celery.amqp.router.route({}, "celery_tasks.download_url")["queue"].name == "download"
+
+
+async def test_cancel_task(client, task_factory, broker, control):
+    user = await client.force_auth()
+    task = await task_factory.create(owner_id=user.id, status=TaskStatusEnum.in_progress)
+    response = await client.post(client.url_for("cancel_task", task_id=task.id))
+    assert response.status_code == 200, f"Error {response.json()}"
+    assert response.json()["status"] == "cancelled"
+    assert task_control.get(str(task.id)) is ControlCommandEnum.cancel
+    fair_scheduler.withdraw.assert_called_once_with(str(user.id), str(task.id))
+
+
+async def test_pause_and_resume_download(client, task_factory, broker, control):
+    user = await client.force_auth()
+    task = await task_factory.create(
+        owner_id=user.id, status=TaskStatusEnum.in_progress, stage=TaskStageEnum.download
+    )
+    response = await client.post(client.url_for("pause_task", task_id=task.id))
+    assert response.status_code == 200, f"Error {response.json()}"
+    assert response.json()["status"] == "paused"
+    assert task_control.get(str(task.id)) is ControlCommandEnum.pause
+
+    response = await client.post(client.url_for("resume_task", task_id=task.id))
+    assert response.status_code == 200, f"Error {response.json()}"
+    assert task_control.get(str(task.id)) is None
+    assert [call.args[:2] for call in broker.call_args_list] == [("celery_tasks.download_url", (str(task.id),))]
+
+
+async def test_resume_paused_parse_parses_again(client, task_factory, broker, control):
+    user = await client.force_auth()
+    task = await task_factory.create(owner_id=user.id, status=TaskStatusEnum.paused, stage=TaskStageEnum.parse)
+    response = await client.post(client.url_for("resume_task", task_id=task.id))
+    assert response.status_code == 200, f"Error {response.json()}"
+    assert [call.args[:2] for call in broker.call_args_list] == [("celery_tasks.parse_url", (task.id,))]
+    fair_scheduler.submit.assert_not_called()
+
+
+async def test_resume_paused_chunks(client, task_factory, broker, control):
+    user = await client.force_auth()
+    task = await task_factory.create(owner_id=user.id, status=TaskStatusEnum.paused, stage=TaskStageEnum.chunk)
+    done = await task_factory.create(owner_id=user.id, parent_id=task.id, status=TaskStatusEnum.completed)
+    paused = await task_factory.create(owner_id=user.id, parent_id=task.id, status=TaskStatusEnum.paused)
+    response = await client.post(client.url_for("resume_task", task_id=task.id))
+    assert response.status_code == 200, f"Error {response.json()}"
+    assert response.json()["status"] == "in_progress"
+    assert [call.args[:2] for call in broker.call_args_list] == [("celery_tasks.parse_chunk", (paused.id,))]
+    assert (await TaskModel.get(pk=done.id)).status == TaskStatusEnum.completed
+
+
+async def test_pause_without_task_control_keeps_status(client, task_factory, broker, control, mocker):
+    user = await client.force_auth()
+    task = await task_factory.create(owner_id=user.id, status=TaskStatusEnum.in_progress)
+    mocker.patch.object(control, "set", side_effect=redis.ConnectionError("down"))
+    response = await client.post(client.url_for("pause_task", task_id=task.id))
+    assert response.status_code == 503, f"Error {response.json()}"
+    assert (await TaskModel.get(pk=task.id)).status == TaskStatusEnum.in_progress
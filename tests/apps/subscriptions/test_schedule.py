@@ -0,0 +1,38 @@
+from datetime import UTC, datetime, timedelta
+
+from applications.subscriptions.schedule import first_poll_at, next_poll_at, poll_offset
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=UTC)
+
+
+def test_poll_offset_is_stable_and_in_interval():
+    assert poll_offset("a", 3600) == poll_offset("a", 3600)
+    assert all(0 <= poll_offset(str(i), 3600) < 3600 for i in range(100))
+
+
+def test_poll_offsets_are_spread():
+    offsets = [poll_offset(str(i), 3600) for i in range(1000)]
+    # Every quarter of the interval gets roughly a quarter of the subscriptions
+    quarters = [sum(q * 900 <= offset < (q + 1) * 900 for offset in offsets) for q in range(4)]
+    assert all(200 < count < 300 for count in quarters), quarters
+
+
+def test_next_poll_at_keeps_slot():
+    first = next_poll_at("a", 3600, NOW)
+    second = next_poll_at("a", 3600, first)
+    assert NOW < first <= NOW + timedelta(hours=1)
+    assert second - first == timedelta(hours=1)
+    assert first.timestamp() % 3600 == poll_offset("a", 3600)
+
+
+def test_next_poll_at_jitter():
+    slot = next_poll_at("a", 3600, NOW)
+    polls = [next_poll_at("a", 3600, NOW, jitter=0.1) for _ in range(50)]
+    assert all(abs((poll - slot).total_seconds()) <= 360 or poll - slot > timedelta(minutes=50) for poll in polls)
+    assert all(poll > NOW for poll in polls)
+    assert len(set(polls)) > 1
+
+
+def test_first_poll_at():
+    poll = first_poll_at("a", 3600, NOW)
+    assert NOW < poll <= NOW + timedelta(hours=1)
@@ -0,0 +1,59 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from applications.subscriptions.models import SubscriptionModel
+from applications.subscriptions.service import SubscriptionInteractor, SubscriptionSelector
+from applications.subscriptions.structs import SubscriptionCreateStruct, SubscriptionStruct
+
+
+async def test_create_collapses_duplicates(user_factory):
+    user = await user_factory.create()
+    subscription = await SubscriptionInteractor.create(
+        SubscriptionStruct(url="https://www.youtube.com/@channel/videos", owner_id=user.id)
+    )
+    duplicate = await SubscriptionInteractor.create(
+        SubscriptionStruct(url="https://m.youtube.com/@channel/videos", owner_id=user.id)
+    )
+    assert duplicate.id == subscription.id
+    assert len(await SubscriptionSelector.get_by_owner(user.id)) == 1
+
+
+async def test_claim_due(user_factory):
+    user = await user_factory.create()
+    subscription = await SubscriptionInteractor.create(
+        SubscriptionStruct(url="https://www.youtube.com/playlist?list=PL1", owner_id=user.id, interval=3600)
+    )
+    now = datetime.now(UTC) + timedelta(hours=2)
+    claimed = await SubscriptionInteractor.claim_due(now)
+    assert subscription.id in [item.id for item in claimed]
+
+    model = await SubscriptionModel.get(pk=subscription.id)
+    assert model.last_run_at == now
+    assert model.next_run_at > now
+    assert subscription.id not in [item.id for item in await SubscriptionInteractor.claim_due(now)]
+
+
+async def test_paused_subscription_is_not_claimed(user_factory):
+    user = await user_factory.create()
+    subscription = await SubscriptionInteractor.create(
+        SubscriptionStruct(url="https://www.youtube.com/playlist?list=PL2", owner_id=user.id)
+    )
+    await SubscriptionInteractor.set_enabled(subscription.id, False)
+    claimed = await SubscriptionInteractor.claim_due(datetime.now(UTC) + timedelta(hours=2))
+    assert subscription.id not in [item.id for item in claimed]
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["https://www.youtube.com/watch?v=dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ", "https://example.com/@channel"],
+)
+def test_create_struct_rejects_other_urls(url):
+    with pytest.raises(ValidationError):
+        SubscriptionCreateStruct(url=url)
+
+
+def test_create_struct_accepts_listings():
+    assert SubscriptionCreateStruct(url="https://www.youtube.com/@channel/videos")
+    assert SubscriptionCreateStruct(url="https://www.youtube.com/playlist?list=PL1")
@@ -1,8 +1,16 @@
+import uuid
+from types import SimpleNamespace
+
 import pytest
+from yt_dlp.utils import DownloadError
 
-from applications.tasks.models import TaskModel
-from applications.youtube.models import YTVideoModel
+from applications.tasks.models import TaskModel, TaskStatusEnum
+from applications.youtube.models import YTPlaylistModel, YTVideoModel
 from applications.youtube.service import YTItemSelector
+from celery_tasks import _parse_listing, _parse_url, parse_chunk, parse_url, sync_subscription
+from core.config import settings
+from tools.media_downloader.control import ControlCommandEnum
+from tools.media_downloader.structs import YTEntryInfo, YTListingCompact, YTVideoCompact
 
 pytestmark = pytest.mark.celery
 
@@ -19,3 +27,218 @@ async def test_parse_url_video(task_factory, user_factory, yt_url_video):
     item = await YTItemSelector(YTVideoModel).get_by_task(task.id)
     assert item is not None
 
+
+class FakeDownloader:
+    failures: dict[str, Exception] = {}
+
+    def __init__(self, url, media_folder):
+        self.url = url
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def extract_compact(self):
+        if self.url in self.failures:
+            raise self.failures[self.url]
+        return YTVideoCompact(id=self.url.rsplit("=", 1)[-1], title="Title")
+
+
+FIRST, SECOND = "dQw4w9WgXcQ", "9bZkp7q19f0"
+LISTING_URL = "https://www.youtube.com/playlist?list=PL0"
+
+
+def video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+@pytest.fixture
+def chunk(mocker):
+    parent = SimpleNamespace(id=uuid.uuid4(), owner_id=uuid.uuid4())
+    mocker.patch("celery_tasks.TaskSelector.get_parent", return_value=parent)
+    mocker.patch("celery_tasks.TaskSelector.get_chunk_entries", return_value=[video_url(FIRST), video_url(SECOND)])
+    mocker.patch("celery_tasks.DownloadArchiveInteractor.ensure_loaded")
+    mocker.patch("celery_tasks.MediaDownloader", FakeDownloader)
+    mocker.patch.object(FakeDownloader, "failures", {})
+    mocker.patch("celery_tasks.download_archive", set())
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        parent=parent,
+        control=mocker.patch("celery_tasks.task_control.get", return_value=None),
+        set_status=mocker.patch("celery_tasks.TaskInteractor.set_status"),
+        finish=mocker.patch("celery_tasks.TaskInteractor.finish_chunk"),
+        upsert=mocker.patch("celery_tasks.YTItemInteractor.bulk_upsert"),
+        retry=mocker.patch.object(parse_chunk, "apply_async"),
+    )
+
+
+@pytest.mark.unit()
+async def test_parse_chunk_skips_archived_and_unavailable_entries(chunk, mocker):
+    mocker.patch("celery_tasks.download_archive", {f"youtube {FIRST}"})
+    FakeDownloader.failures[video_url(SECOND)] = DownloadError("Private video")
+
+    assert await parse_chunk.run(chunk.id) == 0
+
+    chunk.upsert.assert_awaited_once_with(chunk.parent.owner_id, chunk.parent.id, {})
+    chunk.finish.assert_awaited_once_with(chunk.id, TaskStatusEnum.completed)
+
+
+@pytest.mark.unit()
+async def test_parse_chunk_stores_resolved_entries(chunk):
+    assert await parse_chunk.run(chunk.id) == 2
+
+    items = chunk.upsert.await_args.args[2]
+    assert list(items) == [FIRST, SECOND]
+    chunk.finish.assert_awaited_once_with(chunk.id, TaskStatusEnum.completed)
+
+
+@pytest.mark.unit()
+async def test_parse_chunk_retries_with_backoff(chunk):
+    FakeDownloader.failures[video_url(FIRST)] = RuntimeError("connection reset")
+
+    assert await parse_chunk.run(chunk.id, 1) == 0
+
+    chunk.retry.assert_called_once_with((chunk.id, 2), countdown=settings.task_chunk_retry_delay * 2)
+    chunk.set_status.assert_awaited_with(chunk.id, TaskStatusEnum.pending)
+    chunk.finish.assert_not_awaited()
+
+
+@pytest.mark.unit()
+async def test_parse_chunk_fails_after_the_last_retry(chunk):
+    FakeDownloader.failures[video_url(FIRST)] = RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError):
+        await parse_chunk.run(chunk.id, settings.task_chunk_max_retries)
+
+    chunk.retry.assert_not_called()
+    chunk.finish.assert_awaited_once_with(chunk.id, TaskStatusEnum.failed)
+
+
+@pytest.mark.unit()
+async def test_parse_chunk_stops_between_entries(chunk):
+    chunk.control.side_effect = [None, None, ControlCommandEnum.pause]
+
+    assert await parse_chunk.run(chunk.id) == 0
+
+    chunk.set_status.assert_awaited_with(chunk.id, TaskStatusEnum.paused)
+    chunk.upsert.assert_not_awaited()
+    chunk.finish.assert_not_awaited()
+
+
+class FakeListingDownloader:
+    model = YTPlaylistModel
+    info_raw = None
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.listings = 0
+
+    def __call__(self, url, media_folder):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def extract_listing(self):
+        self.listings += 1
+        return YTListingCompact(id="PL0", title="Playlist")
+
+    def iter_entries(self, skip_archived=False, marks=None, since_timestamp=None):
+        if marks is not None and self.entries:
+            marks[LISTING_URL] = self.entries[0].id
+        return iter(self.entries)
+
+
+@pytest.mark.unit
+async def test_parse_listing_streams_batches_into_chunks(mocker):
+    mocker.patch.object(settings, "task_chunk_size", 2)
+    mocker.patch("celery_tasks.task_control.get", return_value=None)
+    upsert = mocker.patch("celery_tasks.YTItemInteractor.bulk_upsert")
+    create_chunks = mocker.patch(
+        "celery_tasks.TaskInteractor.create_chunks", side_effect=lambda task, chunks: [uuid.uuid4()]
+    )
+    delay = mocker.patch.object(parse_chunk, "delay")
+    task = SimpleNamespace(id=uuid.uuid4(), owner_id=uuid.uuid4())
+    entries = [YTEntryInfo(id=str(number), url=video_url(str(number))) for number in range(5)]
+    downloader = FakeListingDownloader(entries)
+
+    listing = await _parse_listing(task, downloader)
+
+    assert listing.id == "PL0"
+    assert downloader.listings == 1
+    assert [call.args[1] for call in create_chunks.await_args_list] == [
+        [[video_url("0"), video_url("1")]],
+        [[video_url("2"), video_url("3")]],
+        [[video_url("4")]],
+    ]
+    assert all(call.kwargs["flat"] for call in upsert.await_args_list)
+    assert delay.call_count == 3
+
+
+@pytest.mark.unit
+async def test_parse_url_seeds_high_water_of_listing(mocker):
+    mocker.patch.object(settings, "task_chunk_size", 1)
+    mocker.patch.object(settings, "store_raw_info", False)
+    mocker.patch("celery_tasks.DownloadArchiveInteractor.ensure_loaded")
+    mocker.patch("celery_tasks.task_control.get", return_value=None)
+    mocker.patch("celery_tasks.YTItemInteractor.bulk_upsert")
+    mocker.patch("celery_tasks.TaskInteractor.create_chunks", side_effect=lambda task, chunks: [uuid.uuid4()])
+    mocker.patch.object(parse_chunk, "delay")
+    mocker.patch("celery_tasks._save_item", return_value={"ext_id": "PL0"})
+    playlist = SimpleNamespace(ext_id="PL0")
+    lookup = mocker.patch.object(YTPlaylistModel, "get", new_callable=mocker.AsyncMock, return_value=playlist)
+    set_high_water = mocker.patch("celery_tasks.YTListingInteractor.set_high_water")
+    entries = [YTEntryInfo(id=str(number), url=video_url(str(number))) for number in range(2)]
+    mocker.patch("celery_tasks.MediaDownloader", FakeListingDownloader(entries))
+
+    assert await _parse_url(SimpleNamespace(id=uuid.uuid4(), owner_id=uuid.uuid4(), url=LISTING_URL)) == {
+        "ext_id": "PL0"
+    }
+
+    lookup.assert_awaited_once_with(ext_id="PL0")
+    set_high_water.assert_awaited_once_with(playlist, {LISTING_URL: "0"}, [])
+
+
+@pytest.fixture
+def subscription(mocker):
+    subscription = SimpleNamespace(
+        id=uuid.uuid4(), owner_id=uuid.uuid4(), task_id=uuid.uuid4(), url="https://www.youtube.com/playlist?list=PL0"
+    )
+    mocker.patch("celery_tasks.SubscriptionSelector.get_by_id", return_value=subscription)
+    mocker.patch("celery_tasks.DownloadArchiveInteractor.ensure_loaded")
+    return subscription
+
+
+@pytest.mark.unit
+async def test_sync_subscription_polls_stored_playlist_incrementally(subscription, mocker):
+    playlist = SimpleNamespace(sync_marks={}, last_timestamp=None)
+    entries = [YTEntryInfo(id=FIRST, url=video_url(FIRST))]
+    downloader = FakeListingDownloader(entries)
+    mocker.patch("celery_tasks.MediaDownloader", downloader)
+    lookup = mocker.patch.object(YTPlaylistModel, "get_or_none", new_callable=mocker.AsyncMock, return_value=playlist)
+    add_entries = mocker.patch("celery_tasks.YTListingInteractor.add_entries", return_value=1)
+    mocker.patch("celery_tasks.YTListingInteractor.set_high_water")
+    parse = mocker.patch.object(parse_url, "delay")
+
+    assert await sync_subscription.run(subscription.id) == 1
+
+    lookup.assert_awaited_once_with(ext_id="PL0")
+    add_entries.assert_awaited_once_with(entries, subscription.owner_id, subscription.task_id)
+    assert downloader.listings == 1
+    parse.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_sync_subscription_parses_unknown_listing(subscription, mocker):
+    mocker.patch("celery_tasks.MediaDownloader", FakeListingDownloader([]))
+    mocker.patch.object(YTPlaylistModel, "get_or_none", new_callable=mocker.AsyncMock, return_value=None)
+    parse = mocker.patch.object(parse_url, "delay")
+
+    assert await sync_subscription.run(subscription.id) == 0
+
+    parse.assert_called_once_with(subscription.task_id)
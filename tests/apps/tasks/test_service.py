@@ -1,7 +1,7 @@
 import pytest
 from tortoise.exceptions import DoesNotExist
 
-from applications.tasks.models import TaskModel
+from applications.tasks.models import TaskModel, TaskStatusEnum
 from applications.tasks.service import TaskSelector, TaskInteractor
 from applications.tasks.structs import TaskStruct
 
@@ -51,3 +51,58 @@ async def test_delete(user_factory, task_factory):
     await TaskInteractor.delete(pk)
     with pytest.raises(DoesNotExist):
         await TaskModel.get(pk=pk)
+
+
+async def test_create_collapses_duplicates(user_factory):
+    user = await user_factory.create()
+    task = await TaskInteractor.create(
+        TaskStruct(url="https://youtu.be/dQw4w9WgXcQ?si=abc", owner_id=user.id)
+    )
+    duplicate = await TaskInteractor.create(
+        TaskStruct(url="https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=10", owner_id=user.id)
+    )
+    assert duplicate.id == task.id
+
+
+async def test_create_keeps_profiles_apart(user_factory):
+    user = await user_factory.create()
+    task = await TaskInteractor.create(
+        TaskStruct(url="https://youtu.be/dQw4w9WgXcQ", owner_id=user.id)
+    )
+    audio = await TaskInteractor.create(
+        TaskStruct(url="https://youtu.be/dQw4w9WgXcQ", owner_id=user.id, profile="audio")
+    )
+    assert audio.id != task.id
+    assert audio.profile == "audio"
+
+
+async def test_chunks_progress(task_factory, user_factory):
+    user = await user_factory.create()
+    parent = await TaskSelector.get_by_id((await task_factory.create(owner_id=user.id)).id)
+    chunk_ids = await TaskInteractor.create_chunks(parent, [["https://youtu.be/a"], ["https://youtu.be/b"]])
+    assert await TaskSelector.get_chunk_entries(chunk_ids[0]) == ["https://youtu.be/a"]
+    assert [task.id for task in await TaskSelector.get_by_owner(user.id)] == [parent.id]
+
+    await TaskInteractor.finish_chunk(chunk_ids[0], TaskStatusEnum.completed)
+    progress = await TaskSelector.get_progress(parent.id)
+    assert (progress.total, progress.completed, progress.remaining, progress.progress) == (2, 1, 1, 0.5)
+    assert (await TaskModel.get(pk=parent.id)).status == TaskStatusEnum.in_progress
+
+    await TaskInteractor.finish_chunk(chunk_ids[1], TaskStatusEnum.failed)
+    progress = await TaskSelector.get_progress(parent.id)
+    assert (progress.completed, progress.failed, progress.progress) == (1, 1, 1.0)
+    assert (await TaskModel.get(pk=parent.id)).status == TaskStatusEnum.failed
+
+
+async def test_get_queued_jobs_skips_final_tasks(task_factory, user_factory):
+    user = await user_factory.create()
+    job = {"celery_tasks.download_url": {"args": [], "kwargs": {}, "eta": None}}
+    queued = await task_factory.create(owner_id=user.id, jobs=job)
+    finished = [
+        (await task_factory.create(owner_id=user.id, status=status, jobs=job)).id
+        for status in (TaskStatusEnum.completed, TaskStatusEnum.failed, TaskStatusEnum.cancelled)
+    ]
+
+    jobs = await TaskSelector.get_queued_jobs()
+    assert jobs[queued.id] == job
+    assert not set(finished) & set(jobs)
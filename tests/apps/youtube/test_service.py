@@ -1,10 +1,13 @@
+from uuid import uuid4
+
 import pytest
 from kombu.transport.sqlalchemy import metadata
 
 from applications.tasks.models import TaskModel
 from applications.youtube.models import YTVideoModel
-from applications.youtube.service import YTItemInteractor, YTItemSelector
+from applications.youtube.service import YTItemInteractor, YTItemSelector, YTListingInteractor
 from applications.youtube.structs import YTItemStruct
+from tools.media_downloader.structs import YTEntryInfo
 
 pytestmark = pytest.mark.unit
 
@@ -89,3 +92,51 @@ class TestYTItemInteractor:
         video = await self.service.create(data)
         assert video.owner.id == user.pk
         assert video.task.id == task.pk
+
+    async def test_bulk_upsert(self, user_factory, task_factory, yt_video_factory):
+        user = await user_factory.create()
+        task = await task_factory.create(owner_id=user.pk)
+        video = await yt_video_factory.create(owner_id=user.pk, task_id=task.pk)
+        first, second = uuid4().hex, uuid4().hex
+
+        result = await self.service.bulk_upsert(
+            user.pk,
+            task.pk,
+            {video.ext_id: {"title": "updated"}, first: {"title": "one"}, second: {"title": "two"}},
+            batch_size=2,
+        )
+
+        assert (result.inserted, result.updated) == (2, 1)
+        assert (await YTVideoModel.get(pk=video.pk)).metadata == {"title": "updated"}
+        assert await YTVideoModel.filter(ext_id__in=[first, second], task_id=task.pk).count() == 2
+
+    async def test_bulk_upsert_flat_keeps_stored_metadata(self, user_factory, task_factory, yt_video_factory):
+        user = await user_factory.create()
+        task = await task_factory.create(owner_id=user.pk)
+        video = await yt_video_factory.create(
+            owner_id=user.pk, task_id=task.pk, metadata={"title": "full", "formats": []}
+        )
+        new = uuid4().hex
+
+        result = await self.service.bulk_upsert(
+            user.pk, task.pk, {video.ext_id: {"title": "stub"}, new: {"title": "one"}}, flat=True
+        )
+
+        assert (result.inserted, result.updated) == (1, 0)
+        assert (await YTVideoModel.get(pk=video.pk)).metadata == {"title": "full", "formats": []}
+        assert (await YTVideoModel.get(ext_id=new)).metadata == {"title": "one"}
+
+
+class TestYTListingInteractor:
+    async def test_add_entries_stores_videos_of_the_syncing_task(self, user_factory, task_factory):
+        user = await user_factory.create()
+        task = await task_factory.create(owner_id=user.pk)
+        ext_id = uuid4().hex
+
+        created = await YTListingInteractor.add_entries(
+            [YTEntryInfo(id=ext_id, url=f"https://www.youtube.com/watch?v={ext_id}")], user.pk, task.pk
+        )
+
+        assert created == 1
+        video = await YTVideoModel.get(ext_id=ext_id)
+        assert (str(video.owner_id), str(video.task_id)) == (str(user.pk), str(task.pk))
@@ -0,0 +1,53 @@
+"""
+Compares full YTVideoInfo validation with the YTVideoCompact projection.
+
+Run from the repository root:
+
+    yt-dlp -j --skip-download "https://www.youtube.com/watch?v=jNQXAC9IVRw" > /tmp/yt-dlp-dump.json
+    PYTHONPATH=src python tests/benchmarks/bench_video_info.py /tmp/yt-dlp-dump.json
+
+Pass a real dump as above; its formats, thumbnails and subtitles are what the numbers depend on.
+Without one the synthetic fixture of the struct tests is used, shaped like ``yt-dlp -j`` output,
+and the results are marked as such.
+"""
+
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from tools.media_downloader.structs import YTVideoCompact, YTVideoInfo
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "yt_video_info.json"
+ROUNDS = 200
+
+
+def retained_bytes(factory) -> int:
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    item = factory()  # noqa: F841
+    size = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, "filename"))
+    tracemalloc.stop()
+    return size
+
+
+def main(path: Path) -> None:
+    info = json.loads(path.read_text())
+    variants = {
+        "YTVideoInfo": (lambda: YTVideoInfo.model_validate(info), lambda item: item.model_dump(mode="json")),
+        "YTVideoCompact": (lambda: YTVideoCompact.from_info(info), lambda item: item.to_dict()),
+    }
+
+    print(f"fixture: {path} ({len(json.dumps(info))} bytes of raw JSON)")
+    if path == FIXTURE:
+        print("synthetic fixture, pass a real yt-dlp -j dump for representative numbers")
+    print(f"{'struct':<16}{'validate, us':>14}{'row, bytes':>12}{'memory, bytes':>15}")
+    for name, (validate, dump) in variants.items():
+        seconds = timeit.timeit(validate, number=ROUNDS) / ROUNDS
+        row = len(json.dumps(dump(validate())))
+        print(f"{name:<16}{seconds * 1e6:>14.1f}{row:>12}{retained_bytes(validate):>15}")
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else FIXTURE)
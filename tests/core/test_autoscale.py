@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from core.autoscale import QueueMonitor, QueueStats, stamp_enqueued_at, target_processes
+from core.config import CeleryQueueConfig, settings
+from tests.inventory.fake_redis import FakeRedis
+from worker import worker_argv
+
+pytestmark = pytest.mark.unit
+
+
+def broker(*messages):
+    """
+    A broker queue holding the messages, the first one the oldest.
+    """
+    client = FakeRedis(decode_responses=False)
+    for body in messages:
+        client.lpush("metadata", body)
+    return client
+
+
+def message(enqueued_at):
+    return json.dumps({"body": "", "headers": {"task": "celery_tasks.parse_url", "enqueued_at": enqueued_at}})
+
+
+def test_stamp_enqueued_at():
+    headers = {}
+    stamp_enqueued_at(headers=headers)
+    assert "enqueued_at" in headers
+
+
+def test_queue_stats_reads_depth_and_oldest_age():
+    monitor = QueueMonitor(broker(message(900.0), message(990.0)))
+
+    stats = monitor.stats("metadata", now=1000.0)
+
+    assert stats == QueueStats(queue="metadata", depth=2, oldest_age=100.0)
+
+
+def test_queue_stats_of_empty_queue():
+    assert QueueMonitor(broker()).stats("metadata").oldest_age is None
+
+
+def test_target_grows_with_backlog():
+    target, _ = target_processes([QueueStats(queue="metadata", depth=5, oldest_age=1)], busy=1, minimum=1, maximum=8)
+    assert target == 4
+
+
+def test_target_is_bounded():
+    stats = [QueueStats(queue="metadata", depth=100, oldest_age=1)]
+    assert target_processes(stats, busy=2, minimum=1, maximum=8)[0] == 8
+    assert target_processes([QueueStats(queue="metadata")], busy=0, minimum=2, maximum=8)[0] == 2
+
+
+def test_old_task_scales_to_maximum():
+    target, reason = target_processes(
+        [QueueStats(queue="download", depth=1, oldest_age=600)], busy=1, minimum=1, maximum=8
+    )
+    assert target == 8
+    assert "600" in reason
+
+
+def test_worker_argv_sizes_pool_from_settings(monkeypatch):
+    metadata, download = CeleryQueueConfig(concurrency=16, min_concurrency=2), CeleryQueueConfig(concurrency=4)
+    monkeypatch.setattr(settings, "celery_queues", {"metadata": metadata, "download": download})
+
+    assert worker_argv("metadata", "--loglevel=info")[-2:] == ["--autoscale=16,2", "--loglevel=info"]
+    assert worker_argv("download")[:5] == ["worker", "-Q", "download", "-n", "download@%h"]
+    assert worker_argv("download")[-1] == "--concurrency=4"
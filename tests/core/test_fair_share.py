@@ -0,0 +1,134 @@
+import pytest
+
+from core.config import CeleryQueueConfig, settings
+from core.fair_share import FairShareScheduler
+from tests.inventory.fake_redis import FakeRedis
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def scheduler(monkeypatch) -> FairShareScheduler:
+    monkeypatch.setattr(settings, "fair_share_capacity", 3)
+    monkeypatch.setattr(settings, "fair_share_max_per_user", 2)
+    monkeypatch.setattr(settings, "fair_share_weights", {})
+    monkeypatch.setattr(settings, "fair_share_caps", {})
+    monkeypatch.setattr(settings, "fair_share_running_ttl", 3600)
+    monkeypatch.setattr(settings, "fair_share_max_per_host", 0)
+    monkeypatch.setattr(settings, "fair_share_throughput_window", 10)
+    return FairShareScheduler(FakeRedis())
+
+
+def test_submit_keeps_a_single_entry(scheduler):
+    scheduler.submit("owner", "t1")
+    scheduler.submit("owner", "t2")
+    scheduler.submit("owner", "t1")
+
+    assert scheduler._client.lrange(FairShareScheduler.RING_KEY, 0, -1) == ["owner"]
+    assert scheduler._client.lrange(FairShareScheduler.QUEUE_PREFIX + "owner", 0, -1) == ["t1", "t2"]
+
+
+def test_dispatch_takes_turns_between_owners(scheduler):
+    for task in ["t1", "t2", "t3", "t4"]:
+        scheduler.submit("bulk", task)
+    scheduler.submit("single", "s1")
+
+    assert scheduler.dispatch() == ["t1", "s1", "t2"]
+    assert scheduler.dispatch() == []
+
+
+def test_cap_holds_tasks_until_release(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "fair_share_capacity", 4)
+    for task in ["t1", "t2", "t3"]:
+        scheduler.submit("bulk", task)
+
+    assert scheduler.dispatch() == ["t1", "t2"]
+    assert scheduler.dispatch() == []
+
+    scheduler.release("t1")
+
+    assert scheduler.dispatch() == ["t3"]
+
+
+def test_dispatch_by_weight(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "fair_share_capacity", 4)
+    monkeypatch.setattr(settings, "fair_share_max_per_user", 0)
+    monkeypatch.setattr(settings, "fair_share_weights", {"family": 2})
+    for task in ["b1", "b2", "b3"]:
+        scheduler.submit("bulk", task)
+    for task in ["f1", "f2", "f3"]:
+        scheduler.submit("family", task)
+
+    assert scheduler.dispatch() == ["b1", "f1", "f2", "b2"]
+
+
+def test_host_cap_gives_the_turn_to_other_owners(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "fair_share_max_per_host", 1)
+    scheduler.submit("bulk", "t1", "youtube.com")
+    scheduler.submit("bulk", "t2", "youtube.com")
+    scheduler.submit("single", "s1", "youtube.com")
+    scheduler.submit("single", "s2", "vimeo.com")
+
+    assert scheduler.dispatch() == ["t1"]
+
+    scheduler.release("t1")
+
+    assert scheduler.dispatch() == ["s1", "s2"]
+    assert scheduler.status().owners[0].queued == 1
+
+
+def test_withdraw(scheduler):
+    scheduler.submit("bulk", "t1")
+    scheduler.submit("bulk", "t2")
+    scheduler.withdraw("bulk", "t1")
+
+    assert scheduler.dispatch() == ["t2"]
+    assert scheduler._client.hkeys(FairShareScheduler.HOSTS_KEY) == ["t2"]
+
+
+def test_expired_slots_are_freed(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "fair_share_running_ttl", -1)
+    for task in ["t1", "t2", "t3"]:
+        scheduler.submit("bulk", task)
+
+    assert scheduler.dispatch() == ["t1", "t2"]
+    assert scheduler.dispatch() == ["t3"]
+
+
+def test_throughput_sums_the_window(scheduler):
+    scheduler.record(1000, now=95.5)
+    scheduler.record(500, now=99.2)
+    scheduler.record(300, now=99.9)
+    scheduler.record(700, now=100.1)
+
+    assert scheduler.throughput(now=100.5) == pytest.approx(180.0)
+
+
+def test_status(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "fair_share_caps", {"bulk": 1})
+    monkeypatch.setattr(settings, "fair_share_max_per_host", 4)
+    for task in ["t1", "t2", "t3"]:
+        scheduler.submit("bulk", task, "youtube.com")
+    scheduler.submit("single", "s1", "vimeo.com")
+    scheduler.dispatch()
+
+    status = scheduler.status()
+
+    assert status.capacity == 3
+    assert status.running == 2
+    assert [(owner.owner_id, owner.queued, owner.running, owner.cap) for owner in status.owners] == [
+        ("bulk", 2, 1, 1),
+        ("single", 0, 1, 2),
+    ]
+    assert [(host.host, host.running, host.cap) for host in status.hosts] == [
+        ("vimeo.com", 1, 4),
+        ("youtube.com", 1, 4),
+    ]
+    assert status.throughput == 0
+
+
+def test_capacity_defaults_to_download_concurrency(monkeypatch):
+    monkeypatch.setattr(settings, "fair_share_capacity", None)
+    monkeypatch.setattr(settings, "celery_queues", {"download": CeleryQueueConfig(concurrency=3)})
+
+    assert FairShareScheduler(FakeRedis()).capacity == 3
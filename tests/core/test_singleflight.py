@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from core.config import settings
+from core.singleflight import _EXTEND_SCRIPT, _LOCK_PREFIX, _RELEASE_SCRIPT, singleflight
+
+pytestmark = pytest.mark.unit
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def unsubscribe(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.extended = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        if self.data.get(key) != token:
+            return 0
+        if script == _RELEASE_SCRIPT:
+            del self.data[key]
+        elif script == _EXTEND_SCRIPT:
+            self.extended.append(key)
+        return 1
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"data": message})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis()
+
+
+async def test_concurrent_calls_run_once(redis):
+    calls = []
+
+    async def extract():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": "dQw4w9WgXcQ"}
+
+    results = await asyncio.gather(*(singleflight("url", extract, client=redis) for _ in range(5)))
+
+    assert results == [{"id": "dQw4w9WgXcQ"}] * 5
+    assert len(calls) == 1
+
+
+async def test_waiting_caller_takes_over_after_failure(redis):
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("extraction failed")
+
+    async def extract():
+        return {"id": "dQw4w9WgXcQ"}
+
+    leader = asyncio.create_task(singleflight("url", failing, client=redis))
+    await asyncio.sleep(0.01)
+    follower = await singleflight("url", extract, client=redis)
+
+    assert follower == {"id": "dQw4w9WgXcQ"}
+    with pytest.raises(RuntimeError):
+        await leader
+
+
+async def test_lock_is_extended_while_the_flight_runs(redis, mocker):
+    mocker.patch.object(settings, "singleflight_lock_ttl", 0.03)
+
+    async def extract():
+        await asyncio.sleep(0.05)
+        return {"id": "dQw4w9WgXcQ"}
+
+    await singleflight("url", extract, client=redis)
+
+    assert redis.extended
+    assert _LOCK_PREFIX + "url" not in redis.data
+
+
+async def test_leader_does_not_release_a_lock_taken_over(redis):
+    async def extract():
+        redis.data[_LOCK_PREFIX + "url"] = "other-leader"
+        return {"id": "dQw4w9WgXcQ"}
+
+    await singleflight("url", extract, client=redis)
+
+    assert redis.data[_LOCK_PREFIX + "url"] == "other-leader"
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.task_runner import LocalTaskRunner
+
+pytestmark = pytest.mark.unit
+
+
+class FakeTask:
+    def __init__(self, name, func):
+        self.name = name
+        self.run = func
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_runs_jobs_on_bounded_workers():
+    calls = []
+    running = 0
+    peak = 0
+
+    async def job(number):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        calls.append(number)
+        running -= 1
+
+    async def scenario():
+        runner = LocalTaskRunner(max_workers=2, max_threads=1)
+        await runner.start()
+        for number in range(6):
+            runner.submit(FakeTask("job", job), (number,))
+        await asyncio.sleep(0)
+        await runner.join()
+        await runner.stop()
+
+    run(scenario())
+    assert sorted(calls) == list(range(6))
+    assert peak == 2
+
+
+def test_blocking_calls_run_on_runner_threads():
+    async def job():
+        return await asyncio.to_thread(lambda: threading.current_thread().name)
+
+    names = []
+
+    async def recording_job():
+        names.append(await job())
+
+    async def scenario():
+        runner = LocalTaskRunner(max_workers=1, max_threads=1)
+        await runner.start()
+        runner.submit(FakeTask("job", recording_job))
+        await asyncio.sleep(0)
+        await runner.join()
+        await runner.stop()
+
+    run(scenario())
+    assert names[0].startswith("task-runner")
+
+
+def test_failing_job_does_not_stop_the_worker():
+    calls = []
+
+    async def failing():
+        raise ValueError("boom")
+
+    async def job():
+        calls.append("ok")
+
+    async def scenario():
+        runner = LocalTaskRunner(max_workers=1)
+        await runner.start()
+        runner.submit(FakeTask("failing", failing))
+        runner.submit(FakeTask("job", job))
+        await asyncio.sleep(0)
+        await runner.join()
+        await runner.stop()
+
+    run(scenario())
+    assert calls == ["ok"]
+
+
+def test_countdown_delays_job():
+    started = []
+
+    async def job():
+        started.append(asyncio.get_running_loop().time())
+
+    async def scenario():
+        runner = LocalTaskRunner(max_workers=1)
+        await runner.start()
+        submitted = asyncio.get_running_loop().time()
+        runner.submit(FakeTask("job", job), countdown=0.05)
+        await asyncio.sleep(0.1)
+        await runner.join()
+        await runner.stop()
+        return submitted
+
+    submitted = run(scenario())
+    assert started[0] - submitted >= 0.04
+
+
+def test_submit_requires_started_runner():
+    with pytest.raises(RuntimeError):
+        LocalTaskRunner().submit(FakeTask("job", lambda: None))
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from core.worker_loop import WorkerLoop
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def worker_loop(mocker):
+    init = mocker.patch("core.worker_loop.Tortoise.init", new=mocker.AsyncMock())
+    mocker.patch("core.worker_loop.Tortoise.close_connections", new=mocker.AsyncMock())
+    mocker.patch("core.worker_loop.tortoise_config", return_value={})
+    loop = WorkerLoop()
+    yield loop, init
+    loop.stop()
+
+
+def test_runs_coroutines_on_one_loop(worker_loop):
+    loop, init = worker_loop
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = loop.run(current_loop())
+    second = loop.run(current_loop())
+
+    assert first is second
+    init.assert_awaited_once()
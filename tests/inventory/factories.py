@@ -52,7 +52,7 @@ class YTChannelFactory(AsyncTortoiseFactory):
     owner_id = factory.SubFactory(UserModelFactory)
     task_id = factory.SubFactory(TaskModelFactory)
 
-    meta_data = factory.LazyAttribute(
+    metadata = factory.LazyAttribute(
         lambda o: {
             "title": faker.sentence(),
             "description": faker.paragraph(),
@@ -82,7 +82,7 @@ class YTPlaylistFactory(AsyncTortoiseFactory):
     owner_id = factory.SubFactory(UserModelFactory)
     task_id = factory.SubFactory(TaskModelFactory)
 
-    meta_data = factory.LazyAttribute(
+    metadata = factory.LazyAttribute(
         lambda o: {
             "title": faker.sentence(),
             "description": faker.paragraph(),
@@ -112,7 +112,7 @@ class YTVideoFactory(AsyncTortoiseFactory):
     owner_id = factory.SubFactory(UserModelFactory)
     task_id = factory.SubFactory(TaskModelFactory)
 
-    meta_data = factory.LazyAttribute(
+    metadata = factory.LazyAttribute(
         lambda o: {
             "title": faker.sentence(),
             "description": faker.paragraph(),
@@ -0,0 +1,13 @@
+import fakeredis
+
+
+class FakeRedis(fakeredis.FakeRedis):
+    """
+    In-memory Redis of its own for every instance, Lua scripts included (``fakeredis[lua]``).
+
+    Responses are decoded like the shared ``redis_client``, pass ``decode_responses=False`` to stand in
+    for ``redis_binary_client`` or the broker connection.
+    """
+
+    def __init__(self, decode_responses: bool = True, **kwargs):
+        super().__init__(server=fakeredis.FakeServer(), decode_responses=decode_responses, **kwargs)
@@ -0,0 +1,71 @@
+import pytest
+
+from core.config import settings
+from tests.inventory.fake_redis import FakeRedis
+from tools.media_downloader.admission import DiskAdmission, estimate_size
+from tools.media_downloader.exceptions import InsufficientDiskSpaceError
+from tools.media_downloader.structs import YTListingCompact, YTVideoCompact
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def admission(monkeypatch, tmp_path) -> DiskAdmission:
+    monkeypatch.setattr(settings, "disk_budget", 1000)
+    monkeypatch.setattr(settings, "disk_min_free", 0)
+    monkeypatch.setattr(settings, "disk_reservation_ttl", 60)
+    return DiskAdmission(FakeRedis(), root=tmp_path)
+
+
+def test_estimate_size():
+    video = YTVideoCompact(id="a", title="A", filesize=None, filesize_approx=300)
+    listing = YTListingCompact(id="p", title="P", entries=[video, YTVideoCompact(id="b", title="B", filesize=100)])
+
+    assert estimate_size(video, default=1000) == 300
+    assert estimate_size(listing, default=1000) == 400
+    assert estimate_size(YTListingCompact(id="p", title="P"), default=1000) == 1000
+
+
+def test_reserve_within_budget(admission):
+    assert admission.reserve("first", 600, url="https://example.com/a") is True
+    assert admission.reserve("second", 400) is True
+
+    assert {(reservation.key, reservation.size) for reservation in admission.reservations()} == {
+        ("first", 600),
+        ("second", 400),
+    }
+
+
+def test_reserve_waits_while_others_hold_the_budget(admission):
+    admission.reserve("first", 600)
+
+    assert admission.reserve("second", 500) is False
+    assert [reservation.key for reservation in admission.reservations()] == ["first"]
+
+
+def test_reserve_again_replaces_the_reservation(admission):
+    admission.reserve("task", 600)
+
+    assert admission.reserve("task", 900) is True
+    assert [(reservation.key, reservation.size) for reservation in admission.reservations()] == [("task", 900)]
+
+
+def test_release_frees_the_budget(admission):
+    admission.reserve("first", 600)
+    admission.release("first")
+
+    assert admission.reserve("second", 1000) is True
+
+
+def test_expired_reservations_are_dropped(admission, monkeypatch):
+    monkeypatch.setattr(settings, "disk_reservation_ttl", -1)
+    admission.reserve("crashed", 600)
+    monkeypatch.setattr(settings, "disk_reservation_ttl", 60)
+
+    assert admission.reservations() == []
+    assert admission.reserve("second", 1000) is True
+
+
+def test_reserve_rejects_download_larger_than_budget(admission):
+    with pytest.raises(InsufficientDiskSpaceError):
+        admission.reserve("task", 1001)
@@ -0,0 +1,17 @@
+import pytest
+
+from tools.media_downloader.archive import DownloadArchive
+
+pytestmark = pytest.mark.unit
+
+
+def test_archive_tracks_new_keys():
+    archive = DownloadArchive()
+    archive.load(["youtube a"])
+    archive.add("youtube a")
+    archive.add("youtube b")
+
+    assert archive.contains_entry("Youtube", "a")
+    assert "youtube b" in archive
+    assert archive.drain_new() == ["youtube b"]
+    assert archive.drain_new() == []
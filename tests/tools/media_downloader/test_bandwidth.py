@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+import redis
+
+from core.bandwidth import BandwidthLimiter
+from tools.media_downloader.progress_hooks import BandwidthHook
+
+pytestmark = pytest.mark.unit
+
+
+class BrokenRedis:
+    def register_script(self, script):
+        def call(keys, args):
+            raise redis.ConnectionError("unreachable")
+
+        return call
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.amounts = []
+
+    def throttle(self, amount):
+        self.amounts.append(amount)
+
+
+def test_current_rate_follows_schedule():
+    limiter = BandwidthLimiter(BrokenRedis(), limit=0, schedule={"23:00": 0, "08:00": 1000, "18:00": 200})
+
+    assert limiter.current_rate(datetime(2024, 1, 1, 3, 0)) == 0
+    assert limiter.current_rate(datetime(2024, 1, 1, 8, 0)) == 1000
+    assert limiter.current_rate(datetime(2024, 1, 1, 20, 30)) == 200
+    assert limiter.current_rate(datetime(2024, 1, 1, 23, 59)) == 0
+
+
+def test_consume_falls_back_to_local_bucket():
+    limiter = BandwidthLimiter(BrokenRedis(), limit=1000, schedule={}, burst=1.0)
+
+    assert limiter.consume(1000) == 0
+    assert limiter.consume(500) == pytest.approx(0.5, abs=0.01)
+
+
+def test_hook_draws_downloaded_deltas():
+    limiter = RecordingLimiter()
+    hook = BandwidthHook(limiter)
+
+    for downloaded_bytes in (100, 300, 300, 600):
+        hook({"status": "downloading", "filename": "video.mp4", "downloaded_bytes": downloaded_bytes})
+    hook({"status": "finished", "filename": "video.mp4", "downloaded_bytes": 600})
+    hook({"status": "downloading", "filename": "video.mp4", "downloaded_bytes": 50})
+
+    assert limiter.amounts == [100, 200, 300, 50]
@@ -0,0 +1,49 @@
+import pytest
+
+from tests.inventory.fake_redis import FakeRedis
+from tools.media_downloader.cache import InfoCache
+from tools.media_downloader.downloader import MediaDownloader
+
+pytestmark = pytest.mark.unit
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def extract_info(self, url, download=True):
+        self.calls += 1
+        return {"id": "dQw4w9WgXcQ", "title": "Title"}
+
+
+@pytest.fixture
+def cache() -> InfoCache:
+    return InfoCache(client=FakeRedis(decode_responses=False), ttl=60)
+
+
+def test_cache_roundtrip(cache):
+    assert cache.get("youtube x") is None
+    cache.set("youtube x", {"id": "x", "entries": [{"id": "y"}]})
+
+    assert cache.get("youtube x") == {"id": "x", "entries": [{"id": "y"}]}
+    assert cache.invalidate("youtube x") is True
+    assert cache.get("youtube x") is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_extract_raw_info_uses_cache(cache, tmp_path):
+    downloader = MediaDownloader(VIDEO_URL, tmp_path, cache=cache)
+    downloader._client = FakeClient()
+
+    first = downloader._extract_raw_info()
+    second = downloader._extract_raw_info()
+    downloader._extract_raw_info(refresh=True)
+
+    assert first["id"] == second["id"] == "dQw4w9WgXcQ"
+    assert downloader._client.calls == 2
+    assert downloader.url.ext_key == "youtube dQw4w9WgXcQ"
+    assert downloader.invalidate_info() is True
@@ -0,0 +1,45 @@
+import pytest
+
+from tests.inventory.fake_redis import FakeRedis
+from tools.media_downloader.checkpoints import CheckpointStore
+from tools.media_downloader.progress_hooks import CheckpointHook
+
+pytestmark = pytest.mark.unit
+
+
+def progress(downloaded_bytes: int, fragment_index: int) -> dict:
+    return {
+        "status": "downloading",
+        "filename": "/media/video.mp4",
+        "tmpfilename": "/media/video.mp4.part",
+        "downloaded_bytes": downloaded_bytes,
+        "total_bytes": 1000,
+        "fragment_index": fragment_index,
+        "fragment_count": 10,
+    }
+
+
+@pytest.fixture
+def store() -> CheckpointStore:
+    return CheckpointStore(client=FakeRedis(), ttl=60)
+
+
+def test_hook_saves_checkpoint(store):
+    hook = CheckpointHook(store, "task", interval=0)
+    hook(progress(100, 1))
+    hook(progress(200, 2))
+
+    checkpoint = store.get("task")
+    assert checkpoint.tmpfilename == "/media/video.mp4.part"
+    assert (checkpoint.downloaded_bytes, checkpoint.fragment_index) == (200, 2)
+
+    store.clear("task")
+    assert store.get("task") is None
+
+
+def test_hook_is_throttled(store):
+    hook = CheckpointHook(store, "task", interval=60)
+    hook(progress(100, 1))
+    hook(progress(200, 2))
+
+    assert store.get("task").downloaded_bytes == 100
@@ -0,0 +1,53 @@
+import pytest
+import redis
+
+from tests.inventory.fake_redis import FakeRedis
+from tools.media_downloader.control import ControlCommandEnum, TaskControl
+from tools.media_downloader.exceptions import DownloadPausedError
+from tools.media_downloader.progress_hooks import ControlHook
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def control():
+    return TaskControl(FakeRedis(), ttl=60)
+
+
+def downloading(filename):
+    return {"status": "downloading", "filename": filename, "downloaded_bytes": 10}
+
+
+def test_control_commands(control):
+    assert control.get("task") is None
+    control.send("task", ControlCommandEnum.pause)
+    assert control.get("task") is ControlCommandEnum.pause
+    control.clear("task")
+    assert control.get("task") is None
+
+
+def test_control_reports_unavailable_redis(control, mocker):
+    error = redis.ConnectionError("down")
+    mocker.patch.object(control._client, "set", side_effect=error)
+    mocker.patch.object(control._client, "delete", side_effect=error)
+
+    assert not control.send("task", ControlCommandEnum.cancel)
+    assert not control.clear("task")
+
+
+def test_hook_passes_without_command(control):
+    ControlHook(control, "task", interval=0)(downloading("video.mp4"))
+
+
+def test_hook_stops_paused_download(control):
+    hook = ControlHook(control, "task", interval=0)
+    control.send("task", ControlCommandEnum.pause)
+    with pytest.raises(DownloadPausedError):
+        hook(downloading("video.mp4"))
+
+
+def test_hook_checks_at_most_once_per_interval(control):
+    hook = ControlHook(control, "task", interval=60)
+    hook(downloading("video.mp4"))
+    control.send("task", ControlCommandEnum.cancel)
+    hook(downloading("video.mp4"))
@@ -0,0 +1,146 @@
+import pytest
+
+from tools.media_downloader.archive import DownloadArchive
+from tools.media_downloader.downloader import MediaDownloader
+from tools.media_downloader.exceptions import UnknownProfileError
+from tools.media_downloader.structs import YTEntryInfo
+
+pytestmark = pytest.mark.unit
+
+CHANNEL_URL = "https://www.youtube.com/channel/UC0000000000000000000000"
+
+
+def video_entry(video_id: str) -> dict:
+    return {
+        "_type": "url",
+        "ie_key": "Youtube",
+        "id": video_id,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "title": f"Video {video_id}",
+        "duration": 60,
+    }
+
+
+class FakeClient:
+    def __init__(self, listings: dict[str, list[dict]]):
+        self.listings = listings
+        self.calls = []
+
+    def extract_info(self, url, download=True, process=True, ie_key=None):
+        self.calls.append(str(url))
+        entries = self.listings[str(url)]
+        return {"_type": "playlist", "id": str(url), "entries": (entry for entry in entries)}
+
+
+@pytest.fixture
+def downloader(tmp_path) -> MediaDownloader:
+    return MediaDownloader(CHANNEL_URL, tmp_path)
+
+
+def test_iter_entries_walks_nested_tabs(downloader):
+    client = FakeClient({
+        CHANNEL_URL: [
+            {"_type": "url", "ie_key": "YoutubeTab", "url": f"{CHANNEL_URL}/videos"},
+            {"_type": "url", "ie_key": "YoutubeTab", "url": f"{CHANNEL_URL}/shorts"},
+        ],
+        f"{CHANNEL_URL}/videos": [video_entry("a"), video_entry("b")],
+        f"{CHANNEL_URL}/shorts": [video_entry("c")],
+    })
+    downloader._client = client
+
+    entries = list(downloader.iter_entries())
+
+    assert [entry.id for entry in entries] == ["a", "b", "c"]
+    assert all(isinstance(entry, YTEntryInfo) for entry in entries)
+
+
+def test_iter_entries_is_lazy(downloader):
+    client = FakeClient({
+        CHANNEL_URL: [
+            {"_type": "url", "ie_key": "YoutubeTab", "url": f"{CHANNEL_URL}/videos"},
+            {"_type": "url", "ie_key": "YoutubeTab", "url": f"{CHANNEL_URL}/shorts"},
+        ],
+        f"{CHANNEL_URL}/videos": [video_entry("a"), video_entry("b")],
+        f"{CHANNEL_URL}/shorts": [video_entry("c")],
+    })
+    downloader._client = client
+
+    first = next(downloader.iter_entries())
+
+    assert first.id == "a"
+    assert client.calls == [CHANNEL_URL, f"{CHANNEL_URL}/videos"]
+
+
+def test_iter_entries_skips_archived(downloader, mocker):
+    archive = DownloadArchive()
+    archive.load(["youtube b"])
+    mocker.patch("tools.media_downloader.downloader.download_archive", archive)
+    downloader._client = FakeClient({CHANNEL_URL: [video_entry("a"), video_entry("b"), video_entry("c")]})
+
+    entries = list(downloader.iter_entries(skip_archived=True))
+
+    assert [entry.id for entry in entries] == ["a", "c"]
+
+
+def test_iter_entries_stops_at_marks(downloader):
+    client = FakeClient({
+        CHANNEL_URL: [
+            {"_type": "url", "ie_key": "YoutubeTab", "url": f"{CHANNEL_URL}/videos"},
+            {"_type": "url", "ie_key": "YoutubeTab", "url": f"{CHANNEL_URL}/shorts"},
+        ],
+        f"{CHANNEL_URL}/videos": [video_entry("new"), video_entry("a"), video_entry("b")],
+        f"{CHANNEL_URL}/shorts": [video_entry("c")],
+    })
+    downloader._client = client
+    marks = {f"{CHANNEL_URL}/videos": "a", f"{CHANNEL_URL}/shorts": "c"}
+
+    entries = list(downloader.iter_entries(marks=marks))
+
+    assert [entry.id for entry in entries] == ["new"]
+    assert marks == {f"{CHANNEL_URL}/videos": "new", f"{CHANNEL_URL}/shorts": "c"}
+
+
+def test_iter_entries_stops_at_since_timestamp(downloader):
+    entries = [{**video_entry(video_id), "timestamp": ts} for video_id, ts in (("a", 300), ("b", 200), ("c", 100))]
+    downloader._client = FakeClient({CHANNEL_URL: entries})
+    marks = {}
+
+    found = list(downloader.iter_entries(marks=marks, since_timestamp=200))
+
+    assert [entry.id for entry in found] == ["a"]
+    assert marks == {CHANNEL_URL: "a"}
+
+
+def test_download_ignores_archive_once(downloader, mocker):
+    archive = downloader._client.archive
+    seen = []
+    mocker.patch.object(
+        downloader._client, "download", side_effect=lambda urls: seen.append(downloader._client.archive)
+    )
+
+    downloader.download(ignore_archive=True)
+
+    assert seen == [set()]
+    assert downloader._client.archive is archive
+
+
+def test_download_reuses_extracted_info(downloader, mocker):
+    info = {"_type": "video", "id": "a"}
+    download = mocker.patch.object(downloader._client, "download")
+    process = mocker.patch.object(downloader._client, "process_ie_result")
+
+    downloader.download(info=info)
+
+    download.assert_not_called()
+    process.assert_called_once_with(info, download=True)
+
+
+def test_profile_tunes_client(tmp_path):
+    with MediaDownloader(CHANNEL_URL, tmp_path, profile="fast-lan") as downloader:
+        assert downloader._client.params["concurrent_fragment_downloads"] == 8
+        assert downloader._client.params["http_chunk_size"] == 10 * 1024 * 1024
+
+
+def test_unknown_profile(tmp_path):
+    with pytest.raises(UnknownProfileError):
+        MediaDownloader(CHANNEL_URL, tmp_path, profile="unknown")
@@ -0,0 +1,55 @@
+import pytest
+from yt_dlp.postprocessor import PostProcessor
+
+from tools.media_downloader.pool import YoutubeDLPool
+
+pytestmark = pytest.mark.unit
+
+
+def options() -> dict:
+    return {"format": "bestaudio", "outtmpl": "%(title)s.%(ext)s", "quiet": True}
+
+
+def test_release_reuses_client():
+    pool = YoutubeDLPool(max_idle=1)
+    client = pool.acquire("default", options)
+    pool.release("default", client)
+
+    assert pool.acquire("default", options) is client
+    assert pool.acquire("default", options) is not client
+
+
+def test_release_resets_download_state():
+    pool = YoutubeDLPool(max_idle=1)
+    client = pool.acquire("default", options)
+    client.add_progress_hook(lambda data: None)
+    client.params["paths"] = {"home": "/tmp/media"}
+    client.params["outtmpl"]["default"] = "changed"
+    client._num_downloads = 3
+
+    pool.release("default", client)
+    client = pool.acquire("default", options)
+
+    assert client._progress_hooks == []
+    assert "paths" not in client.params
+    assert client.params["outtmpl"]["default"] == "%(title)s.%(ext)s"
+    assert client._num_downloads == 0
+
+
+def test_profiles_are_isolated():
+    pool = YoutubeDLPool(max_idle=1)
+    client = pool.acquire("default", options)
+    pool.release("default", client)
+
+    assert pool.acquire("metered", options) is not client
+
+
+def test_release_drops_added_postprocessors():
+    pool = YoutubeDLPool(max_idle=1)
+    client = pool.acquire("default", options)
+    client.add_post_processor(PostProcessor(), when="after_move")
+
+    pool.release("default", client)
+    client = pool.acquire("default", options)
+
+    assert client._pps["after_move"] == []
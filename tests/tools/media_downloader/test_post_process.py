@@ -0,0 +1,61 @@
+import hashlib
+
+import pytest
+
+from tools.media_downloader.proccesing.post import PostProcessOptions, PostProcessor, process_file
+
+pytestmark = pytest.mark.unit
+
+PROBE = {
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "12.5"},
+    "streams": [{"codec_type": "audio", "codec_name": "aac"}],
+}
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "audio.m4a"
+    path.write_bytes(b"not really audio")
+    return path
+
+
+def test_process_file_hashes_and_probes(media, mocker):
+    mocker.patch("tools.media_downloader.proccesing.post.pipeline.probe", return_value=PROBE)
+
+    result = process_file(str(media), PostProcessOptions(ffmpeg="ffmpeg", ffprobe="ffprobe"))
+
+    assert result.sha256 == hashlib.sha256(b"not really audio").hexdigest()
+    assert result.size == len(b"not really audio")
+    assert result.duration == 12.5
+    assert result.audio_codec == "aac"
+    assert result.video_codec is None
+    assert result.thumbnail is None
+    assert result.errors == []
+
+
+def test_process_file_records_failed_steps(media, tmp_path):
+    missing = str(tmp_path / "missing-binary")
+
+    result = process_file(str(media), PostProcessOptions(ffmpeg=missing, ffprobe=missing, remux="mp4"))
+
+    assert result.sha256 is not None
+    assert [error.split(":")[0] for error in result.errors] == ["remux", "probe"]
+
+
+def test_process_file_records_missing_file(tmp_path):
+    missing = str(tmp_path / "missing-binary")
+
+    result = process_file(str(tmp_path / "gone.m4a"), PostProcessOptions(ffmpeg=missing, ffprobe=missing))
+
+    assert result.size is None
+    assert result.sha256 is None
+    assert [error.split(":")[0] for error in result.errors] == ["stat", "hash", "probe"]
+
+
+def test_post_processor_runs_in_order(media, tmp_path):
+    missing = str(tmp_path / "missing-binary")
+    processor = PostProcessor(options=PostProcessOptions(ffmpeg=missing, ffprobe=missing))
+
+    results = processor.run([media, media])
+
+    assert [result.path for result in results] == [str(media), str(media)]
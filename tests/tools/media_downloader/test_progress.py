@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from tools.media_downloader.progress_hooks import ProgressSink, ThroughputHook
+
+pytestmark = pytest.mark.unit
+
+
+class FakePublisher:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, json.loads(message)))
+
+
+def progress(status: str, downloaded_bytes: int, filename: str = "video.mp4") -> dict:
+    return {"status": status, "filename": filename, "downloaded_bytes": downloaded_bytes, "total_bytes": 1000}
+
+
+def test_sink_samples_downloading_updates():
+    publisher = FakePublisher()
+    sink = ProgressSink("task", max_rate=0.001, client=publisher, channel="progress")
+
+    for downloaded_bytes in range(0, 1000, 100):
+        sink(progress("downloading", downloaded_bytes))
+    sink(progress("finished", 1000))
+
+    assert [message["status"] for _, message in publisher.messages] == ["downloading", "finished"]
+    assert publisher.messages[-1] == (
+        "progress",
+        {
+            "task_id": "task",
+            "filename": "video.mp4",
+            "status": "finished",
+            "downloaded_bytes": 1000,
+            "total_bytes": 1000,
+            "speed": None,
+            "eta": None,
+            "fragment_index": None,
+            "fragment_count": None,
+        },
+    )
+
+
+def test_sink_samples_each_file_separately():
+    publisher = FakePublisher()
+    sink = ProgressSink("task", max_rate=0.001, client=publisher, channel="progress")
+
+    sink(progress("downloading", 100, "video.f137.mp4"))
+    sink(progress("downloading", 100, "video.f140.m4a"))
+    sink(progress("downloading", 200, "video.f137.mp4"))
+
+    assert [message["filename"] for _, message in publisher.messages] == ["video.f137.mp4", "video.f140.m4a"]
+
+
+class RecordingRecorder:
+    def __init__(self):
+        self.amounts = []
+
+    def record(self, amount):
+        self.amounts.append(amount)
+
+
+def test_throughput_hook_batches_deltas():
+    recorder = RecordingRecorder()
+    hook = ThroughputHook(recorder, interval=60)
+
+    for downloaded_bytes in (100, 300, 600):
+        hook(progress("downloading", downloaded_bytes))
+    hook(progress("finished", 1000))
+    hook(progress("downloading", 200, filename="audio.m4a"))
+    hook.flush()
+
+    assert recorder.amounts == [1000, 200]
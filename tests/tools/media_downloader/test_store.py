@@ -0,0 +1,80 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from tools.media_downloader.store import MediaStore
+
+pytestmark = pytest.mark.unit
+
+CONTENT = b"same video"
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path) -> MediaStore:
+    return MediaStore(tmp_path)
+
+
+def incoming(store: MediaStore, name: str) -> Path:
+    store.incoming.mkdir(parents=True, exist_ok=True)
+    path = store.incoming / name
+    path.write_bytes(CONTENT)
+    return path
+
+
+def test_ingest_shards_and_deduplicates(store):
+    first = store.ingest(incoming(store, "Title [a].mp4"), SHA256)
+    second = store.ingest(incoming(store, "Other title [a].mp4"), SHA256)
+
+    assert first == second == store.blobs / SHA256[:2] / SHA256[2:4] / f"{SHA256}.mp4"
+    assert store.contains(SHA256, ".mp4")
+    assert list(store.incoming.iterdir()) == []
+
+
+def test_link_shares_blob_between_owners(store):
+    blob = store.ingest(incoming(store, "Title [a].mp4"), SHA256)
+
+    alice = store.link(blob, "alice", "Title [a].mp4")
+    bob = store.link(blob, "bob", "Title [a].mp4")
+
+    assert alice.samefile(blob) and bob.samefile(blob)
+    assert store.link(blob, "alice", "Title [a].mp4") == alice
+    assert blob.stat().st_nlink == 3
+
+
+def test_link_keeps_entries_with_same_name(store):
+    blob = store.ingest(incoming(store, "Title [a].mp4"), SHA256)
+    (store.users / "alice").mkdir(parents=True)
+    (store.users / "alice" / "Title [a].mp4").write_bytes(b"something else")
+
+    link = store.link(blob, "alice", "Title [a].mp4")
+
+    assert link.name == "Title [a] (1).mp4"
+
+
+def test_incoming_folder_is_dropped_once_empty(store):
+    folder = store.incoming_folder("task")
+    folder.mkdir(parents=True)
+    (folder / "Title [a].mp4.part").write_bytes(CONTENT)
+
+    assert not store.drop_incoming_folder("task")
+
+    (folder / "Title [a].mp4.part").unlink()
+    assert store.drop_incoming_folder("task")
+    assert not folder.exists()
+
+
+def test_cancelled_download_removes_only_its_folder(store):
+    folder = store.incoming_folder("task")
+    (folder / "fragments").mkdir(parents=True)
+    for name in ("Title [a].mp4.part", "Title [a].mp4.ytdl", "fragments/Title [a].mp4.part-Frag3"):
+        (folder / name).write_bytes(CONTENT)
+    other = store.incoming_folder("other")
+    other.mkdir(parents=True)
+    (other / "Title [a].mp4.part").write_bytes(CONTENT)
+
+    assert store.remove_incoming_folder("task") == 3
+    assert not folder.exists()
+    assert (other / "Title [a].mp4.part").exists()
+    assert store.remove_incoming_folder("task") == 0
@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tools.media_downloader.structs import YTListingCompact, YTVideoCompact
+
+pytestmark = pytest.mark.unit
+
+FIXTURE = Path(__file__).parent.parent.parent / "fixtures" / "yt_video_info.json"
+
+
+@pytest.fixture
+def video_info() -> dict:
+    return json.loads(FIXTURE.read_text())
+
+
+def test_video_compact_drops_heavy_fields(video_info):
+    compact = YTVideoCompact.from_info(video_info)
+    data = compact.to_dict()
+
+    assert data["id"] == video_info["id"]
+    assert data["filesize"] == video_info["filesize"]
+    assert not {"formats", "thumbnails", "automatic_captions", "http_headers", "heatmap"} & data.keys()
+    assert not hasattr(compact, "__dict__")
+
+
+def test_listing_compact_skips_unavailable_entries(video_info):
+    listing = YTListingCompact.from_info({
+        "id": "PL1",
+        "title": "Playlist",
+        "entries": [video_info, None, video_info],
+    })
+
+    assert [entry.id for entry in listing.entries] == [video_info["id"]] * 2
+
+
+def test_listing_compact_flattens_nested_listings(video_info):
+    listing = YTListingCompact.from_info({
+        "id": "UC1",
+        "title": "Channel",
+        "entries": [
+            {"_type": "playlist", "id": "UC1", "title": "Channel - Videos", "entries": [video_info]},
+            {"_type": "playlist", "id": "UC1", "title": "Channel - Shorts", "entries": [None, video_info]},
+        ],
+    })
+
+    assert [entry.id for entry in listing.entries] == [video_info["id"]] * 2
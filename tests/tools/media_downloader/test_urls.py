@@ -0,0 +1,46 @@
+import pytest
+
+from tools.media_downloader.downloader import Url
+from tools.media_downloader.urls import canonicalize_url
+
+pytestmark = pytest.mark.unit
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://youtu.be/dQw4w9WgXcQ?si=abc123",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+        "https://youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube.com/live/dQw4w9WgXcQ?feature=shared",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+        "http://www.youtube.com/watch?feature=youtu.be&v=dQw4w9WgXcQ#comments",
+    ],
+)
+def test_canonicalize_youtube_video(url):
+    assert canonicalize_url(url) == VIDEO
+
+
+def test_canonicalize_youtube_listings():
+    assert canonicalize_url("https://m.youtube.com/@SomeHandle/videos/") == "https://www.youtube.com/@somehandle/videos"
+    assert (
+        canonicalize_url("https://www.youtube.com/playlist?list=PL123&si=x")
+        == "https://www.youtube.com/playlist?list=PL123"
+    )
+    assert (
+        canonicalize_url("https://youtu.be/dQw4w9WgXcQ?list=PL123&index=2")
+        == "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123"
+    )
+
+
+def test_canonicalize_other_hosts():
+    assert canonicalize_url("HTTPS://Example.com/path/?b=2&utm_source=x&a=1#top") == "https://example.com/path?a=1&b=2"
+
+
+def test_url_kinds():
+    assert Url("https://youtu.be/dQw4w9WgXcQ").is_video
+    assert Url("https://www.youtube.com/@handle").is_channel
+    assert Url("https://m.youtube.com/playlist?list=PL123").is_playlist